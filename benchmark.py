@@ -0,0 +1,1070 @@
+"""
+Benchmarks of the data pipeline against synthetic dblp data, so that no network access or cached pickle is needed.
+Run e.g. `python benchmark.py fetch`
+"""
+import collections
+import datetime
+import hashlib
+import os
+import pickle
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Tuple
+from xml.sax.saxutils import escape, quoteattr
+
+import networkx as nx
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+import xmltodict
+from scipy.sparse import csgraph
+
+import centrality
+import preprocessing
+from data import DATA_PATH
+from faculty import Analyzer
+from node_index import where
+from colab_stats import CollaborationStats
+from collaborators import CollaboratorTable
+from dblp_parser import parse_profile
+from diameter import component_diameter, graph_diameter
+from pub_store import PublicationStore
+from sparse_graph import SparseTimeline
+from temporal_graph import window_papers
+from temporal_metrics import TemporalMetrics
+from venue_cube import VenueCube, cached_venue_cube
+
+VENUES = [('inproceedings', 'booktitle', v) for v in
+          ['SIGMOD Conference', 'KDD', 'SIGIR', 'CVPR', 'NeurIPS', 'SIGCOMM', 'CCS', 'ICSE', 'ISCA', 'CHI', 'PODC',
+           'SIGGRAPH', 'RECOMB', 'ACM Multimedia', 'ICDE', 'ICCV', 'AAAI', 'IJCAI', 'WWW', 'INFOCOM']] + \
+         [('article', 'journal', v) for v in
+          ['IEEE Trans. Knowl. Data Eng.', 'Proc. VLDB Endow.', 'IEEE Trans. Image Process.', 'CoRR',
+           'IEEE Trans. Parallel Distributed Syst.', 'ACM Comput. Surv.']]
+AREAS = ['Computer Networks', 'Computer Graphics', 'Computer Architecture', 'Distributed Systems', 'Data Management',
+         'AI/ML', 'Computer Vision', 'Multimedia', 'Data Mining', 'HCI', 'Information Retrieval', 'Bioinformatics',
+         'Cyber Security', 'Software Engg']
+POSITIONS = ['Professor', 'Associate Professor', 'Assistant Professor', 'Senior Lecturer', 'Lecturer']
+
+
+def make_synthetic_dblp(n_faculty=85, n_external=3000, n_papers=6000, n_external_papers=20000, seed=0,
+                        base_url='https://dblp.org') -> Tuple[pd.DataFrame, Dict[str, bytes]]:
+    """
+    generate a faculty name list and dblp person profiles shaped like the real ones
+    :param n_faculty: number of faculty members
+    :param n_external: number of non-faculty authors
+    :param n_papers: number of papers with at least one faculty author
+    :param n_external_papers: number of papers written by non-faculty authors only
+    :param seed: random seed
+    :param base_url: host used in the DBLP column of the name list
+    :return: faculty name list in the format of Faculty.xlsx, and pid to profile in xml format
+    """
+    rng = random.Random(seed)
+    faculty = [(f'{i}/{1000 + i}', f'Faculty Member {i}') for i in range(n_faculty)]
+    external = [(f'e{i % 97}/{i}', f'External Author {i}') for i in range(n_external)]
+    ext_weights = [1 / (i + 1) ** 0.8 for i in range(n_external)]
+
+    papers = []
+    for i in range(n_papers + n_external_papers):
+        if i < n_papers:
+            authors = rng.sample(faculty, rng.choice([1, 1, 1, 2, 2, 3]))
+            authors += rng.choices(external, weights=ext_weights, k=rng.choice([0, 1, 2, 3, 4]))
+        else:
+            authors = rng.choices(external, weights=ext_weights, k=rng.choice([1, 2, 3, 4]))
+        authors = list(dict.fromkeys(authors))
+        rng.shuffle(authors)
+        kind, venue_tag, venue = rng.choice(VENUES)
+        papers.append(dict(key=f'{"conf" if kind == "inproceedings" else "journals"}/x/P{i}', kind=kind,
+                           venue_tag=venue_tag, venue=venue, year=rng.randint(1995, 2021), authors=authors,
+                           role='editor' if rng.random() < 0.01 else 'author'))
+
+    by_pid = dict()
+    for p in papers:
+        for pid, _ in p['authors']:
+            by_pid.setdefault(pid, []).append(p)
+
+    profiles = dict()
+    for pid, name in faculty + external:
+        records = []
+        for p in by_pid.get(pid, []):
+            authors = ''.join(f'<{p["role"]} pid={quoteattr(a_pid)}>{escape(a_name)}</{p["role"]}>'
+                              for a_pid, a_name in p['authors'])
+            records.append(f'<r><{p["kind"]} key={quoteattr(p["key"])} mdate="2021-01-01">{authors}'
+                           f'<title>Paper {escape(p["key"])}.</title><pages>1-10</pages><year>{p["year"]}</year>'
+                           f'<{p["venue_tag"]}>{escape(p["venue"])}</{p["venue_tag"]}>'
+                           f'<ee>https://doi.org/10.0/{escape(p["key"])}</ee></{p["kind"]}></r>')
+        profiles[pid] = (f'<?xml version="1.0" encoding="US-ASCII"?>\n'
+                         f'<dblpperson name={quoteattr(name)} pid={quoteattr(pid)} n="{len(records)}">'
+                         f'<person key="homepages/{pid}" mdate="2021-01-01"><author pid={quoteattr(pid)}>'
+                         f'{escape(name)}</author></person>{"".join(records)}'
+                         f'<coauthors n="0"></coauthors></dblpperson>').encode()
+
+    name_data = pd.DataFrame([[name, rng.choice(POSITIONS), rng.choice('MF'), rng.choice('NNNY'),
+                               f'{base_url}/pers/{pid}.html', rng.choice(AREAS)] for pid, name in faculty],
+                             columns=['Faculty', 'Position', 'Gender', 'Management', 'DBLP', 'Area'])
+    return name_data, profiles
+
+
+class StandInDBLPServer:
+    """
+    local http server imitating dblp: /pers/<pid>.html redirects to /pid/<pid>.html, and /pid/<pid>.xml is served
+    with an ETag, answering 304 to a matching If-None-Match
+    """
+
+    def __init__(self, profiles: Dict[str, bytes], latency=0.02, throttle_rate=0.0, seed=0):
+        """
+        :param profiles: pid to profile in xml format
+        :param latency: seconds spent on every request
+        :param throttle_rate: probability of answering 429 Too Many Requests
+        """
+        server = self
+        self.profiles = profiles
+        self.latency = latency
+        self.throttle_rate = throttle_rate
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.connections = 0
+        self.bytes_sent = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                server.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b'', headers=None):
+                self.send_response(status)
+                for k, v in (headers or dict()).items():
+                    self.send_header(k, v)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.bytes_sent += len(body)
+
+            def do_GET(self):
+                server.requests += 1
+                time.sleep(server.latency)
+                if server.rng.random() < server.throttle_rate:
+                    return self._reply(429, headers={'Retry-After': '0'})
+                path = self.path.split('?')[0]
+                if path.startswith('/pers/'):
+                    return self._reply(302, headers={'Location': '/pid/' + path[len('/pers/'):]})
+                pid, _, ext = path[len('/pid/'):].rpartition('.')
+                if not path.startswith('/pid/') or pid not in server.profiles:
+                    return self._reply(404)
+                if ext == 'xml':
+                    etag = '"{}"'.format(hashlib.md5(server.profiles[pid]).hexdigest())
+                    if self.headers.get('If-None-Match') == etag:
+                        return self._reply(304, headers={'ETag': etag})
+                    return self._reply(200, server.profiles[pid], {'Content-Type': 'application/xml', 'ETag': etag})
+                return self._reply(200, b'<html></html>', {'Content-Type': 'text/html'})
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.httpd.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_fetch(n_profiles=300, latency=0.02, throttle_rate=0.05):
+    """
+    serial fetching v.s. concurrent fetching against the stand-in dblp server
+    """
+    _, profiles = make_synthetic_dblp(n_faculty=n_profiles, n_external=500, n_papers=2000, n_external_papers=0)
+    with StandInDBLPServer(profiles, latency=latency, throttle_rate=throttle_rate) as server:
+        name_data, _ = make_synthetic_dblp(n_faculty=n_profiles, n_external=500, n_papers=2000, n_external_papers=0,
+                                           base_url=server.url)
+        expected = {name: xmltodict.parse(profiles[url[len(server.url + '/pers/'):-len('.html')]],
+                                          dict_constructor=dict)
+                    for name, url in zip(name_data.Faculty, name_data.DBLP)}
+        print(f'{n_profiles} profiles, {latency * 1000:.0f}ms latency, {throttle_rate:.0%} answered with 429')
+        for workers in [None, 1, 4, 8, 16, 32]:
+            server.requests = server.connections = 0
+            result, elapsed = _timed(preprocessing.fetch_dblp_profile, name_data, target_pickle_name='_bench',
+                                     workers=workers, max_retries=5)
+            print(f'workers={str(workers):>4}: {elapsed:7.2f}s, {server.requests} requests, '
+                  f'{server.connections} connections, {len(result)}/{n_profiles} profiles, '
+                  f'correct={all(result[k] == expected[k] for k in result)}')
+    for suffix in ['pickle', 'meta.pickle']:
+        os.remove(os.path.join(DATA_PATH, f'_bench.{suffix}'))
+
+
+def bench_refresh(n_profiles=300, change_rate=0.05, latency=0.02, workers=8):
+    """
+    full re-fetching v.s. conditional refreshing after a small part of the profiles changed
+    """
+    _, profiles = make_synthetic_dblp(n_faculty=n_profiles, n_external=500, n_papers=2000, n_external_papers=0)
+    with StandInDBLPServer(profiles, latency=latency) as server:
+        name_data, _ = make_synthetic_dblp(n_faculty=n_profiles, n_external=500, n_papers=2000, n_external_papers=0,
+                                           base_url=server.url)
+        print(f'{n_profiles} profiles, {int(n_profiles * change_rate)} changed, {latency * 1000:.0f}ms latency, '
+              f'{workers} workers')
+        _, elapsed = _timed(preprocessing.fetch_dblp_profile, name_data, target_pickle_name='_bench', workers=workers)
+        print(f'full fetch: {elapsed:6.2f}s, {server.requests} requests, {server.bytes_sent / 1e6:.2f}MB received')
+
+        rng = random.Random(1)
+        fetched_pids = [url[len(server.url + '/pers/'):-len('.html')] for url in name_data.DBLP]
+        for pid in rng.sample(fetched_pids, int(n_profiles * change_rate)):
+            profiles[pid] = profiles[pid].replace(b'<coauthors n="0">', b'<coauthors n="1">')
+
+        server.requests = server.bytes_sent = 0
+        (_, changed_names), elapsed = _timed(preprocessing.refresh_dblp_profile, name_data,
+                                             target_pickle_name='_bench', workers=workers)
+        print(f'refresh:    {elapsed:6.2f}s, {server.requests} requests, {server.bytes_sent / 1e6:.2f}MB received, '
+              f'{len(changed_names)} reported changed')
+    for suffix in ['pickle', 'meta.pickle']:
+        os.remove(os.path.join(DATA_PATH, f'_bench.{suffix}'))
+
+
+def _measured(func, *args, **kwargs):
+    """
+    :return: result, seconds spent, and bytes still allocated by the result
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, retained
+
+
+def bench_parse(n_faculty=85, n_external=2000):
+    """
+    xmltodict trees v.s. compact records: parse time, memory held, pickle size and pickle load time
+    """
+    _, profiles = make_synthetic_dblp(n_faculty=n_faculty, n_external=n_external, n_papers=6000,
+                                      n_external_papers=40000)
+    contents = list(profiles.values())
+    print(f'{len(contents)} profiles, {sum(len(c) for c in contents) / 1e6:.1f}MB of xml')
+    for label, parse in [('xmltodict', _parse_xmltodict),
+                         ('compact', parse_profile)]:
+        _, parse_time = _timed(lambda: [parse(c) for c in contents])
+        parsed, _, memory = _measured(lambda: [parse(c) for c in contents])
+        dumped = pickle.dumps(parsed)
+        _, load_time = _timed(pickle.loads, dumped)
+        print(f'{label:>9}: parse {parse_time:6.2f}s, {memory / 1e6:7.1f}MB in memory, '
+              f'pickle {len(dumped) / 1e6:6.1f}MB loaded in {load_time:5.2f}s')
+
+
+_LOAD_IN_CHILD = '''
+import pickle, sys, time
+import preprocessing
+from pub_store import PublicationStore
+
+def rss():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) * 1024 for line in f if line.startswith('VmRSS'))
+
+name_data = pickle.load(open(sys.argv[1], 'rb'))
+before, start = rss(), time.perf_counter()
+if sys.argv[2] == 'pickle':
+    profiles, external = [pickle.load(open(f'{path}.pickle', 'rb')) for path in sys.argv[3:]]
+else:
+    profiles, external = [PublicationStore.open(f'{path}_store').profiles() for path in sys.argv[3:]]
+loaded, load_time = rss(), time.perf_counter() - start
+start = time.perf_counter()
+preprocessing.generate_graph(name_data, profiles)
+print(load_time, loaded - before, time.perf_counter() - start, rss() - before)
+'''
+
+
+_GUI_GRAPHS_IN_CHILD = '''
+import pickle, sys, time
+from graph_cache import GraphCache, cached_graph, cached_temporal_graph
+from pub_store import PublicationStore
+
+start = time.perf_counter()
+name_data = pickle.load(open(sys.argv[1], 'rb'))
+profiles, external = [PublicationStore.open(f'{path}_store').profiles() for path in sys.argv[3:5]]
+external = external.subset(list(external)[:int(sys.argv[5])])  # as get_new_member_profile
+cache = GraphCache(sys.argv[2])
+cached_temporal_graph(name_data, profiles, cache=cache).snapshots()
+cached_graph(name_data, profiles, by_year=2020, cache=cache)
+cached_graph(name_data, profiles, by_year=2021, cache=cache)
+cached_graph(name_data, profiles, external_profile_data=external, cache=cache)
+print(time.perf_counter() - start)
+'''
+
+
+def bench_store(n_faculty=85, n_external=2000):
+    """
+    profile pickles v.s. memory-mapped publication stores: time and RSS of a fresh process loading the faculty and
+    external profiles and building the faculty graph, as every new Analyzer does (Linux only, RSS read from /proc)
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_external_papers=40000,
+                                                                 parse=_parse_xmltodict)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        name_data_path = os.path.join(tmp, 'names.pickle')
+        with open(name_data_path, 'wb') as f:
+            pickle.dump(name_data, f)
+        paths = [os.path.join(tmp, 'profiles'), os.path.join(tmp, 'external')]
+        pickle_size = store_size = build_time = 0
+        for data, path in zip([profile_data, external_data], paths):
+            with open(f'{path}.pickle', 'wb') as f:
+                pickle.dump(data, f)
+            pickle_size += os.path.getsize(f'{path}.pickle')
+            _, elapsed = _timed(PublicationStore.build, data, f'{path}_store')
+            build_time += elapsed
+            store_size += sum(os.path.getsize(os.path.join(f'{path}_store', f)) for f in os.listdir(f'{path}_store'))
+        print(f'{len(profile_data)} + {len(external_data)} profiles; pickles {pickle_size / 1e6:.1f}MB, '
+              f'stores {store_size / 1e6:.1f}MB built in {build_time:.2f}s')
+
+        for label in ['pickle', 'store']:
+            output = subprocess.run([sys.executable, '-c', _LOAD_IN_CHILD, name_data_path, label] + paths,
+                                    stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.decode().split()
+            load_time, load_rss, graph_time, graph_rss = map(float, output[-4:])
+            print(f'{label:>6}: load {load_time:6.3f}s +{load_rss / 1e6:6.1f}MB RSS, '
+                  f'faculty graph {graph_time:5.2f}s, +{graph_rss / 1e6:6.1f}MB RSS in total')
+
+
+def _parse_xmltodict(content: bytes) -> dict:
+    return xmltodict.parse(content, dict_constructor=dict)
+
+
+def _synthetic_profiles(n_faculty, n_external, n_top_external=None, n_papers=6000, n_external_papers=20000,
+                        parse=parse_profile):
+    """
+    :param n_top_external: (optional) number of external profiles kept; all by default
+    :param parse: parser of the xml profiles, parse_profile for compact profiles or _parse_xmltodict for the
+     xmltodict ones
+    :return: name list, parsed profiles of the faculty members and of the n_top_external most prolific external
+     authors (generated first) of a synthetic dblp, see make_synthetic_dblp
+    """
+    name_data, profiles = make_synthetic_dblp(n_faculty=n_faculty, n_external=n_external, n_papers=n_papers,
+                                              n_external_papers=n_external_papers)
+    pid_of = {name: url[len('https://dblp.org/pers/'):-len('.html')] for name, url in zip(name_data.Faculty,
+                                                                                          name_data.DBLP)}
+    faculty_pids = set(pid_of.values())
+    profile_data = {name: parse(profiles[pid]) for name, pid in pid_of.items()}
+    external_data = {f'External {pid}': parse(xml) for pid, xml in profiles.items() if pid not in faculty_pids}
+    return name_data, profile_data, dict(list(external_data.items())[:n_top_external])
+
+
+def _generate_graph_by_edge_lookups(name_data, profile_data, by_year=None, external_profile_data=None):
+    """
+    generate_graph as it was before CoAuthorEdges, searching the edge list for every co-author, for comparison
+    """
+    graph = preprocessing.generate_graph(name_data, profile_data, by_year=-1,  # nodes only
+                                         external_profile_data=external_profile_data)
+    sources = {name: profile_data for name in profile_data}
+    sources.update({name: external_profile_data for name in external_profile_data or dict()})
+    pid_to_name = {preprocessing.profile_pid(source, name): name for name, source in sources.items()
+                   if name in graph}
+    for k, source in sources.items():
+        pid = preprocessing.profile_pid(source, k)
+        for key, venue, _, author_pids, _ in preprocessing.coauthored_papers(source, k, by_year=by_year):
+            for co_pid in author_pids:
+                if co_pid == pid or co_pid not in pid_to_name:
+                    continue
+                co_name = pid_to_name[co_pid]
+                if (k, co_name) in list(graph.edges):
+                    graph[k][co_name]['paper'][key] = venue
+                elif (co_name, k) in list(graph.edges):
+                    graph[co_name][k]['paper'][key] = venue
+                else:
+                    graph.add_edge(k, co_name, paper={key: venue})
+    for _, _, a in graph.edges(data=True):
+        a['weight'] = len(a['paper'])
+    return graph
+
+
+def bench_graph(n_faculty=85, n_external=3000, n_top_external=150):
+    """
+    edge list lookups v.s. CoAuthorEdges, on the faculty graph and the graph augmented with external profiles
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        new, new_time = _timed(preprocessing.generate_graph, name_data, profile_data, external_profile_data=external)
+        old, old_time = _timed(_generate_graph_by_edge_lookups, name_data, profile_data,
+                               external_profile_data=external)
+        identical = list(new.nodes(data=True)) == list(old.nodes(data=True)) and \
+            {frozenset(e[:2]): e[2] for e in new.edges(data=True)} == \
+            {frozenset(e[:2]): e[2] for e in old.edges(data=True)}
+        print(f'{label}: {new.number_of_nodes()} nodes, {new.number_of_edges()} edges; '
+              f'edge lookups {old_time:6.2f}s, CoAuthorEdges {new_time:6.2f}s, identical={identical}')
+
+
+def bench_graphs(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    one graph per year built from scratch v.s. the incremental generate_graphs, compared with a single full graph
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        _, full_time = _timed(preprocessing.generate_graph, name_data, profile_data, external_profile_data=external)
+        rebuilt, rebuilt_time = _timed(lambda: [preprocessing.generate_graph(name_data, profile_data, by_year=year,
+                                                                             external_profile_data=external)
+                                                for year in range(2000, till_year)])
+        (_, graphs), incremental_time = _timed(preprocessing.generate_graphs, name_data, profile_data,
+                                               till_year=till_year, external_profile_data=external)
+        identical = all(list(a.nodes(data=True)) == list(b.nodes(data=True)) and
+                        {frozenset(e[:2]): e[2] for e in a.edges(data=True)} ==
+                        {frozenset(e[:2]): e[2] for e in b.edges(data=True)} for a, b in zip(rebuilt, graphs))
+        print(f'{label}: {len(graphs)} yearly graphs; one full graph {full_time:5.2f}s, rebuilt every year '
+              f'{rebuilt_time:5.2f}s, incremental {incremental_time:5.2f}s, identical={identical}')
+
+
+def bench_temporal(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    yearly graph copies from generate_graphs v.s. views of a temporal graph: memory held after computing the average
+    degree and clustering coefficient of every year, and the time spent
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    def analyze(graphs):
+        return [(Analyzer.get_avg_degree(g), Analyzer.get_clustering_coeff(g)) for g in graphs]
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        (_, graphs), build_time, memory = _measured(preprocessing.generate_graphs, name_data, profile_data,
+                                                    till_year=till_year, external_profile_data=external)
+        expected, analyze_time = _timed(analyze, graphs)
+        del graphs
+        print(f'{label}:')
+        print(f'     generate_graphs: {memory / 1e6:6.1f}MB, built in {build_time:5.2f}s, analyzed in {analyze_time:5.2f}s')
+
+        def build_views():
+            temporal = preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external)
+            views = temporal.snapshots(till_year=till_year)[1]
+            return views, analyze(views)
+
+        (views, result), elapsed, memory = _measured(build_views)
+        # the views, and subgraphs of them, are also to have the edges of the copies, with their papers of the year
+        tags, graphs = preprocessing.generate_graphs(name_data, profile_data, till_year=till_year,
+                                                     external_profile_data=external)
+        half = list(name_data.Faculty)[::2]
+        same_edges = all(list(a.nodes(data=True)) == list(b.nodes(data=True)) and
+                         {frozenset(e[:2]): window_papers(e[2], till=int(tag)) for e in a.edges(data=True)} ==
+                         {frozenset(e[:2]): e[2]['paper'] for e in b.edges(data=True)}
+                         for tag, a, b in list(zip(tags, views, graphs)) +
+                         [(tag, a.subgraph(half), b.subgraph(half)) for tag, a, b in zip(tags, views, graphs)])
+        print(f'      temporal views: {memory / 1e6:6.1f}MB, built and analyzed in {elapsed:5.2f}s, '
+              f'identical={result == expected and same_edges}')
+
+
+def bench_nodes(n_faculty=3000, n_builds=21):
+    """
+    node attributes read with a DataFrame scan per name v.s. faculty_node_attributes, for a year-by-year build
+    """
+    name_data, _ = make_synthetic_dblp(n_faculty=n_faculty, n_external=100, n_papers=0, n_external_papers=0)
+
+    def scan_per_name():
+        return {name: name_data.loc[name_data['Faculty'] == name].drop(columns="Faculty").squeeze().to_dict()
+                for name in name_data.Faculty.unique()}
+
+    expected, scan_time = _timed(scan_per_name)
+    preprocessing._node_attributes_cache.clear()
+    first, first_time = _timed(preprocessing.faculty_node_attributes, name_data)
+    _, cached_time = _timed(lambda: [preprocessing.faculty_node_attributes(name_data) for _ in range(n_builds)])
+    print(f'{n_faculty} faculty members, {n_builds} graph builds: scan per name {scan_time * n_builds:6.2f}s, '
+          f'faculty_node_attributes {first_time + cached_time:6.3f}s, identical={first == expected}')
+
+
+def bench_sparse(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    average degree, clustering coefficient, degree increase and preferential attachment of every year computed on the
+    networkx graphs by Analyzer v.s. on a SparseTimeline of the temporal graph
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        temporal = preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external)
+        graphs = temporal.snapshots(till_year=till_year)[1]
+
+        def analyze(graphs):
+            return ([Analyzer.get_avg_degree(g) for g in graphs], [Analyzer.get_clustering_coeff(g) for g in graphs],
+                    Analyzer.get_degree_increase(graphs), Analyzer.detect_preferential_attachment(graphs))
+
+        def analyze_sparse():
+            timeline = SparseTimeline.from_temporal_graph(temporal, till_year=till_year)
+            return (timeline.avg_degrees().tolist(), timeline.avg_clustering().tolist(), timeline.degree_increase(),
+                    timeline.preferential_attachment())
+
+        expected, graph_time = _timed(analyze, graphs)
+        result, sparse_time = _timed(analyze_sparse)
+        identical = all(abs(a - b) < 1e-12 for i in range(2) for a, b in zip(result[i], expected[i])) and \
+            result[2:] == expected[2:]
+        print(f'{label}: {len(graphs)} years, {temporal.graph.number_of_edges()} edges; networkx {graph_time:5.2f}s, '
+              f'SparseTimeline {sparse_time:5.2f}s, identical={identical}')
+
+
+def bench_papers(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    duplicate work removed by the paper index: papers read profile by profile v.s. once per dblp key, edge updates
+    per profile v.s. per co-author pair, and the paper counts of get_colab_properties
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    def read_profiles(sources):
+        return [paper for name, source in sources.items()
+                for paper in preprocessing.coauthored_papers(source, name)]
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        sources = {name: profile_data for name in profile_data}
+        sources.update({name: external_data for name in external or dict()})
+        preprocessing.invalidate_paper_index()
+        _, read_time = _timed(read_profiles, sources)
+        index, index_time = _timed(preprocessing.paper_index, profile_data, external)
+
+        pid_to_name = preprocessing._add_nodes(preprocessing.nx.Graph(), name_data, profile_data, external)
+        updates_per_profile = updates_per_pair = 0
+        for paper in index:
+            pairs = set()
+            for name, pid in paper.owners:
+                co_names = [pid_to_name[p] for p in paper.author_pids if p != pid and p in pid_to_name]
+                updates_per_profile += len(co_names)
+                pairs.update(frozenset((name, co_name)) for co_name in co_names)
+            updates_per_pair += len(pairs)
+        print(f'{label}: {index.num_listings} papers listed in the profiles, {len(index)} unique '
+              f'({index.num_listings / len(index):.2f} listings per paper); edge updates {updates_per_profile} '
+              f'per profile, {updates_per_pair} per pair')
+        print(f'    profiles read in {read_time:5.2f}s for every graph built, indexed once in {index_time:5.2f}s')
+
+        _, graphs = preprocessing.generate_graphs(name_data, profile_data, till_year=till_year,
+                                                  external_profile_data=external)
+
+        def papers_by_key_sets():
+            counts = []
+            for graph in graphs:
+                total_papers = set()
+                for _, _, a in graph.edges(data=True):
+                    total_papers |= set(a["paper"].keys())
+                counts.append(len(total_papers))
+            return counts
+
+        expected, sets_time = _timed(papers_by_key_sets)
+        result, colab_time = _timed(Analyzer.get_colab_properties, graphs)
+        print(f'    get_colab_properties on {len(graphs)} graphs: paper key sets alone {sets_time:5.2f}s, '
+              f'all properties in one pass {colab_time:5.2f}s, identical={result[1] == expected}')
+
+
+def bench_cache(n_faculty=85, n_external=2000, n_top_external=300):
+    """
+    time for a fresh process, as a GUI dialog, to open the stores and get the graphs the dialogs show (the temporal
+    graph, the graphs by 2020 and 2021, and the graph with external profiles) from an empty v.s. a warm graph cache
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_external_papers=40000)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        name_data_path = os.path.join(tmp, 'names.pickle')
+        with open(name_data_path, 'wb') as f:
+            pickle.dump(name_data, f)
+        paths = [os.path.join(tmp, 'profiles'), os.path.join(tmp, 'external')]
+        for data, path in zip([profile_data, external_data], paths):
+            PublicationStore.build(data, f'{path}_store')
+        cache_path = os.path.join(tmp, 'graph_cache')
+
+        for label in ['empty cache', 'warm cache']:
+            output = subprocess.run([sys.executable, '-c', _GUI_GRAPHS_IN_CHILD, name_data_path, cache_path] +
+                                    paths + [str(n_top_external)], stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                    check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.decode().split()
+            print(f'{label:>11}: {float(output[-1]):6.3f}s')
+
+
+def bench_parallel(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021, max_workers=None):
+    """
+    generate_graphs in this process v.s. split among worker processes opening the publication stores, for an
+    increasing number of workers (up to the number of CPUs)
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external)
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_store = PublicationStore.build(profile_data, os.path.join(tmp, 'profiles_store')).profiles()
+        external_store = PublicationStore.build(external_data, os.path.join(tmp, 'external_store')).profiles()
+        external_store = external_store.subset(list(external_store)[:n_top_external])
+
+        max_workers = max_workers if max_workers is not None else os.cpu_count()
+        counts = [1] + [w for w in [2, 4, 8, 16] if w <= max_workers]
+        print(f'{os.cpu_count()} CPU(s)')
+        for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_store)]:
+            preprocessing.invalidate_paper_index()
+            (_, expected), serial_time = _timed(preprocessing.generate_graphs, name_data, profile_store,
+                                                till_year=till_year, external_profile_data=external)
+            timings = []
+            for workers in counts[1:]:
+                (_, graphs), elapsed = _timed(preprocessing.generate_graphs, name_data, profile_store,
+                                              till_year=till_year, external_profile_data=external, workers=workers)
+                identical = all({frozenset(e[:2]): e[2] for e in a.edges(data=True)} ==
+                                {frozenset(e[:2]): e[2] for e in b.edges(data=True)}
+                                for a, b in zip(graphs, expected))
+                timings.append(f'{workers} workers {elapsed:5.2f}s (x{serial_time / elapsed:.2f}, '
+                               f'identical={identical})')
+            print(f'{label}: serial {serial_time:5.2f}s; ' + '; '.join(timings))
+
+
+class _SyntheticAnalyzer(Analyzer):
+    """
+    Analyzer on given profiles instead of the files under the data directory, the top conferences of every area
+    being the synthetic venue of the same position
+    """
+
+    def __init__(self, name_data, profile_data, external_profile_data):
+        self.auth_name_data = name_data
+        self.auth_profiles = profile_data
+        self.area_to_top_booktitle = dict(zip(AREAS, Analyzer.venue_to_booktitle.values()))
+        self._lock = threading.RLock()
+        self._auth_excellence = None
+        self._external_collaborators = None
+        self._venue_classifier = None
+        self._indexed_graphs = dict()
+        self.external_collaborators_profiles = external_profile_data
+        self.external_collaborators_excellence = None
+
+
+def _auth_excellence_by_regex(analyzer, external=False):
+    """
+    _get_auth_excellence as it was: the regular expression of the area compiled and matched for every profile and
+    every publication (xmltodict profiles only), a single publication being counted as well
+    """
+    last_ten_year = datetime.datetime.now().year - 10
+    general_reg = re.compile(f"({'|'.join([f'({r})' for r in analyzer.area_to_top_booktitle.values()])})$")
+    profile = analyzer.external_collaborators_profiles if external else analyzer.auth_profiles
+    excellence = dict()
+    for k, v in profile.items():
+        area = preprocessing.faculty_node_attributes(analyzer.auth_name_data).get(k, dict()).get('Area')
+        if external or area not in analyzer.area_to_top_booktitle:
+            reg = general_reg
+        else:
+            reg = re.compile(f"{analyzer.area_to_top_booktitle[area]}$")
+        excellence[k] = 0
+        publications = v['dblpperson']['r']
+        for pub in publications if type(publications) is list else [publications]:
+            article = pub[next(iter(pub))]
+            if 'booktitle' in article and reg.match(article['booktitle']) and int(
+                    article['year']) >= last_ten_year:
+                excellence[k] += 1
+    return excellence
+
+
+def bench_excellence(n_faculty=85, n_external=2000):
+    """
+    excellence scoring of the faculty and the external profiles: regular expressions matched per profile and
+    publication v.s. the venue classifier and one vectorized pass, on xmltodict profiles and a publication store
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_external_papers=40000,
+                                                                 parse=_parse_xmltodict)
+    with tempfile.TemporaryDirectory() as tmp:
+        profile_store = PublicationStore.build(profile_data, os.path.join(tmp, 'profiles_store')).profiles()
+        external_store = PublicationStore.build(external_data, os.path.join(tmp, 'external_store')).profiles()
+
+        legacy = _SyntheticAnalyzer(name_data, profile_data, external_data)
+        for label, external in [('faculty', False), (f'{len(external_data)} external', True)]:
+            expected, regex_time = _timed(_auth_excellence_by_regex, legacy, external)
+            timings = []
+            for source, analyzer in [('dicts', _SyntheticAnalyzer(name_data, profile_data, external_data)),
+                                     ('store', _SyntheticAnalyzer(name_data, profile_store, external_store))]:
+                result, elapsed = _timed(analyzer._get_auth_excellence, external)
+                timings.append(f'{source} {elapsed:6.3f}s (x{regex_time / elapsed:.1f}, '
+                               f'identical={result == expected})')
+            print(f'{label}: regex per publication {regex_time:6.3f}s; classified ' + '; '.join(timings))
+
+
+def bench_metrics(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    the property dialog series (average degree, clustering coefficient and largest component diameter of every
+    year) computed graph by graph with Analyzer v.s. by TemporalMetrics in one pass, and read again from it
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    def analyze(graphs):
+        return ([Analyzer.get_avg_degree(g) for g in graphs], [Analyzer.get_clustering_coeff(g) for g in graphs],
+                [Analyzer.get_largest_component_diameter(g) for g in graphs])
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        temporal = preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external)
+        graphs = temporal.snapshots(till_year=till_year)[1]
+        timeline = SparseTimeline.from_temporal_graph(temporal, till_year=till_year)
+        expected, graph_time = _timed(analyze, graphs)
+        metrics = TemporalMetrics(timeline)
+        table, metrics_time = _timed(metrics.table)
+        _, reopen_time = _timed(metrics.table)
+        identical = all(abs(a - b) < 1e-12 for a, b in zip(table.avg_degree, expected[0])) and \
+            all(abs(a - b) < 1e-12 for a, b in zip(table.avg_clustering, expected[1])) and \
+            table.diameter.tolist() == expected[2]
+        print(f'{label}: {len(graphs)} years; networkx {graph_time:6.2f}s, TemporalMetrics {metrics_time:6.3f}s, '
+              f'again {reopen_time:6.4f}s, identical={identical}')
+
+
+def bench_diameter(n_nodes=10000, n_years=10, seed=0):
+    """
+    diameter of synthetic connected graphs: nx.diameter v.s. component_diameter, exact and within a tolerance, and
+    over graphs gaining edges year by year, without and with the bound of the year before as a warm start (only used
+    when the component keeps the same nodes)
+    """
+    graphs = [('preferential attachment', nx.barabasi_albert_graph(n_nodes, 2, seed=seed)),
+              ('small world', nx.connected_watts_strogatz_graph(n_nodes, 4, 0.01, seed=seed))]
+    for label, graph in graphs:
+        expected, nx_time = _timed(nx.diameter, graph)
+        timings = []
+        for tolerance in [0, 2]:
+            result, elapsed = _timed(graph_diameter, graph, tolerance)
+            timings.append(f'tolerance {tolerance} {elapsed:6.3f}s ({result.lower}..{result.upper}, '
+                           f'x{nx_time / elapsed:.0f})')
+        print(f'{label}: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges, diameter {expected}; '
+              f'nx.diameter {nx_time:6.2f}s; ' + '; '.join(timings))
+
+    rng = random.Random(seed)
+    edges = list(nx.barabasi_albert_graph(n_nodes, 2, seed=seed).edges)
+    extra_edges = list(nx.barabasi_albert_graph(n_nodes, 1, seed=seed + 1).edges)
+    rng.shuffle(edges)
+    rng.shuffle(extra_edges)
+    # a component growing year by year, and one of the same nodes gaining edges year by year
+    for label, yearly_edges in [('growing component', lambda year: edges[:len(edges) * year // n_years]),
+                                ('same nodes, more edges',
+                                 lambda year: edges + extra_edges[:len(extra_edges) * (year - 1) // n_years])]:
+        matrices, components = [], []
+        for year in range(1, n_years + 1):
+            yearly = yearly_edges(year)
+            rows = [u for u, v in yearly] + [v for u, v in yearly]
+            cols = [v for u, v in yearly] + [u for u, v in yearly]
+            matrices.append(sp.csr_matrix(([1] * len(rows), (rows, cols)), shape=(n_nodes, n_nodes)))
+            labels = csgraph.connected_components(matrices[-1], directed=False)[1]
+            components.append(np.flatnonzero(labels == np.argmax(np.bincount(labels))))
+
+        def series(warm):
+            diameters, previous = [], None
+            for t, (matrix, component) in enumerate(zip(matrices, components)):
+                same_nodes = t > 0 and np.array_equal(component, components[t - 1])
+                previous = component_diameter(matrix, component, warm_start=previous if warm and same_nodes else None)
+                diameters.append(previous.lower)
+            return diameters
+
+        cold, cold_time = _timed(series, False)
+        warm, warm_time = _timed(series, True)
+        print(f'{n_years} years, {label}: diameters {cold}; cold {cold_time:6.3f}s, warm start {warm_time:6.3f}s, '
+              f'identical={cold == warm}')
+
+
+def bench_centrality(n_faculty=85, n_external=3000, n_top_external=300, ks=(50, 200), max_workers=None):
+    """
+    centrality of the main component of the graph with external profiles: exact nx.betweenness_centrality and
+    closeness_centrality v.s. split among processes, and betweenness estimated from k pivots
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+    graph = preprocessing.generate_graph(name_data, profile_data, external_profile_data=external_data)
+    graph = graph.subgraph(max(nx.connected_components(graph), key=len))
+
+    max_workers = max_workers if max_workers is not None else os.cpu_count()
+    print(f'{os.cpu_count()} CPU(s); main component of {graph.number_of_nodes()} nodes, '
+          f'{graph.number_of_edges()} edges')
+    expected, betweenness_time = _timed(nx.betweenness_centrality, graph)
+    expected_closeness, closeness_time = _timed(nx.closeness_centrality, graph)
+    timings = []
+    for workers in [None] + [w for w in [2, 4, 8, 16] if w <= max(max_workers, 2)]:
+        result, elapsed = _timed(centrality.betweenness_centrality, graph, workers)
+        closeness, closeness_elapsed = _timed(centrality.closeness_centrality, graph, workers)
+        identical = all(abs(result[v] - expected[v]) < 1e-12 for v in graph) and closeness == expected_closeness
+        timings.append(f'{workers or "no"} workers {elapsed:6.2f}s + {closeness_elapsed:6.2f}s '
+                       f'(identical={identical})')
+    print(f'exact betweenness + closeness: networkx on the component {betweenness_time:6.2f}s + '
+          f'{closeness_time:6.2f}s; ' + '; '.join(timings))
+    for k in ks:
+        (estimate, errors), elapsed = _timed(centrality.sampled_betweenness_centrality, graph, k, 0)
+        deviation = max(abs(estimate[v] - expected[v]) for v in graph)
+        top = [v for v, _ in sorted(expected.items(), key=lambda x: x[1], reverse=True)[:10]]
+        top_estimated = [v for v, _ in sorted(estimate.items(), key=lambda x: x[1], reverse=True)[:10]]
+        print(f'{k:4d} pivots: {elapsed:6.2f}s (x{betweenness_time / elapsed:.1f}), largest standard error '
+              f'{max(errors.values()):.5f}, largest deviation {deviation:.5f}, top 10 nodes found '
+              f'{len(set(top) & set(top_estimated))}/10')
+
+
+def bench_eigenvector(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    eigenvector and closeness centrality of the main component of every yearly graph: networkx v.s. the sparse
+    matrix backend, the power iteration started from the centrality of the year before or not
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+
+    for label, external in [('faculty', None), (f'faculty + {n_top_external} external', external_data)]:
+        temporal = preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external)
+        components = [nx.Graph(g.subgraph(max(nx.connected_components(g), key=len)))
+                      for g in temporal.snapshots(till_year=till_year)[1]]
+
+        def networkx_series():
+            return [(nx.eigenvector_centrality(g), nx.closeness_centrality(g)) for g in components]
+
+        def sparse_series(warm):
+            results, previous = [], None
+            for g in components:
+                previous = centrality.eigenvector_centrality(g, nstart=previous if warm else None)
+                results.append((previous, centrality.closeness_centrality(g)))
+            return results
+
+        expected, networkx_time = _timed(networkx_series)
+        timings = []
+        for warm in [False, True]:
+            result, elapsed = _timed(sparse_series, warm)
+            deviation = max(abs(r[i][v] - e[i][v]) for r, e in zip(result, expected) for i in range(2) for v in e[i])
+            timings.append(f'{"warm" if warm else "cold"} {elapsed:6.3f}s (x{networkx_time / elapsed:.0f}, '
+                           f'largest deviation {deviation:.1e})')
+        print(f'{label}: {len(components)} years, largest component {components[-1].number_of_nodes()} nodes; '
+              f'networkx {networkx_time:6.2f}s; sparse ' + '; '.join(timings))
+
+
+def bench_filter(n_faculty=3000, n_papers=20000, till_year=2021, n_rounds=5):
+    """
+    the yearly graphs filtered by rank, area and management role, as the GUI does again and again: a scan of the node
+    attributes and a subgraph per year for every filter v.s. the attribute index and the filtered graphs kept per query
+    """
+    name_data, profiles = make_synthetic_dblp(n_faculty=n_faculty, n_external=100, n_papers=n_papers,
+                                              n_external_papers=0)
+    profile_data = {name: parse_profile(profiles[url[len('https://dblp.org/pers/'):-len('.html')]])
+                    for name, url in zip(name_data.Faculty, name_data.DBLP)}
+    _, graphs = preprocessing.generate_temporal_graph(name_data, profile_data).snapshots(till_year=till_year)
+    filters = [('Position', {'Professor', 'Associate Professor'}), ('Area', {'AI/ML', 'Computer Vision'}),
+               ('Management', {'Y'})]
+
+    def scan():
+        results = []
+        for attribute, values in filters:
+            names = {name for name, attributes in graphs[-1].nodes(data=True) if attributes[attribute] in values}
+            results.append([nx.subgraph(g, names) for g in graphs])
+        return results
+
+    analyzer = _SyntheticAnalyzer(name_data, profile_data, None)
+
+    def indexed():
+        return [analyzer.filter_graphs(graphs, where(attribute, values)) for attribute, values in filters]
+
+    def views(results):
+        return [list(filtered) for filtered in results]
+
+    def edges(results):
+        return [[g.number_of_edges() for g in filtered] for filtered in results]
+
+    _, scan_time = _timed(lambda: views(scan()))
+    _, first_time = _timed(lambda: views(indexed()))
+    _, repeated_time = _timed(lambda: [views(indexed()) for _ in range(n_rounds)])
+    identical = edges(indexed()) == edges(scan())
+    combined, combined_time = _timed(analyzer.filter_graphs, graphs, where('Area', {'AI/ML', 'Computer Vision'}) &
+                                     where('Position', {'Professor', 'Associate Professor'}))
+    print(f'{n_faculty} faculty members, {len(graphs)} years, {len(filters)} filters: '
+          f'scan {scan_time:6.4f}s each round; index first {first_time:6.4f}s, then {repeated_time / n_rounds:6.6f}s '
+          f'each round, identical={identical}; area and rank combined {combined_time:6.4f}s, '
+          f'{len(combined.nodes)} members')
+
+
+def bench_colab(n_faculty=85, n_external=3000, n_top_external=300, till_year=2021):
+    """
+    collaboration properties and relative weights of the yearly graphs of every area, as the GUI shows them: the
+    properties of subgraphs of every year v.s. CollaborationStats, the properties of all nodes computed once
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+    temporal = preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external_data)
+    tags, graphs = temporal.snapshots(till_year=till_year)
+    groups = [set(name_data.Faculty[name_data.Area == area]) for area in AREAS]
+
+    def by_subgraphs():
+        results = []
+        for group in groups:
+            subgraphs = [nx.subgraph(g, group) for g in graphs]
+            years = [int(tag) for tag in tags]
+            results.append((Analyzer.get_colab_properties(subgraphs, years=years)[:3],
+                            Analyzer.get_relative_colab_weight(subgraphs, graphs, years=years)))
+        return results
+
+    def by_stats():
+        stats = CollaborationStats(temporal, [int(tag) for tag in tags])
+        return [(Analyzer.get_colab_properties(stats, group)[:3], Analyzer.get_relative_colab_weight(group, stats))
+                for group in groups]
+
+    expected, subgraphs_time = _timed(by_subgraphs)
+    result, stats_time = _timed(by_stats)
+    print(f'{len(groups)} areas, {len(graphs)} years, {temporal.graph.number_of_edges()} edges: subgraphs '
+          f'{subgraphs_time:6.2f}s; CollaborationStats {stats_time:6.3f}s (x{subgraphs_time / stats_time:.0f}), '
+          f'identical={result == expected}')
+
+
+def bench_cube(n_faculty=85, n_external=3000, till_year=2021):
+    """
+    most frequent venues of the faculty members of every area, as the GUI shows them, and the top venues of every area
+    in every year: counted over the yearly subgraphs and the edges of the graph v.s. the venue cube, built once,
+    saved, and brought up to date after a profile changes
+    """
+    name_data, profile_data, _ = _synthetic_profiles(n_faculty, n_external, 0)
+    temporal = preprocessing.generate_temporal_graph(name_data, profile_data)
+    tags, graphs = temporal.snapshots(till_year=till_year)
+    years = [int(tag) for tag in tags]
+    groups = [set(name_data.Faculty[name_data.Area == area]) for area in AREAS]
+    queries = [(area, year) for area in AREAS for year in years]
+
+    def by_subgraphs():
+        return [Analyzer.get_colab_properties([nx.subgraph(g, group) for g in graphs], years=years)[3]
+                for group in groups]
+
+    def by_edges():
+        results = []
+        for area, year in queries:
+            group = set(name_data.Faculty[name_data.Area == area])
+            papers = dict()
+            for _, _, data in temporal.graph.subgraph(group).edges(data=True):
+                papers.update(window_papers(data, since=year, till=year))
+            results.append(sorted(collections.Counter(papers.values()).items(), key=lambda x: (-x[1], x[0])))
+        return results
+
+    expected, subgraphs_time = _timed(by_subgraphs)
+    expected_top, edges_time = _timed(by_edges)
+    stats = CollaborationStats(temporal, years)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'venue_cube.npz')
+        cube, build_time = _timed(cached_venue_cube, name_data, profile_data, path)
+        result, query_time = _timed(lambda: [cube.most_frequent_venues(group, years) for group in groups])
+        result_top, top_time = _timed(lambda: [cube.top_venues(areas=[area], since=year, till=year)
+                                               for area, year in queries])
+        _, load_time = _timed(cached_venue_cube, name_data, profile_data, path)
+        changed = next(iter(profile_data))
+        profile = profile_data[changed]
+        profile_data[changed] = type(profile)(profile.pid, profile.name, profile.publications[1:])
+        updated, update_time = _timed(cached_venue_cube, name_data, profile_data, path, [changed])
+    rebuilt = VenueCube.build(name_data, profile_data)
+    identical = all([dict(venues) for venues in r] == [dict(venues) for venues in e] and
+                    r == stats.properties(group)[3] for r, e, group in zip(result, expected, groups)) and \
+        result_top == expected_top and \
+        all(updated.most_frequent_venues(group, years) == rebuilt.most_frequent_venues(group, years)
+            for group in groups)
+    print(f'{len(groups)} areas, {len(years)} years: subgraphs {subgraphs_time:6.2f}s, cube {query_time:6.3f}s; '
+          f'{len(queries)} area-year queries: edges {edges_time:6.2f}s, cube {top_time:6.3f}s '
+          f'({top_time / len(queries) * 1000:.2f}ms per query); identical={identical}')
+    print(f'    cube built and saved {build_time:6.3f}s, loaded and checked {load_time:6.3f}s, '
+          f'updated after a profile change {update_time:6.3f}s')
+
+
+def bench_degrees(n_faculty=85, n_external=3000, n_top_external=3000, till_year=2021):
+    """
+    degree increase and preferential attachment of the graph with the external authors, and of the faculty members of
+    every area: Analyzer on the networkx graphs v.s. the degree matrix of a SparseTimeline and its subsets
+    """
+    name_data, profile_data, external_data = _synthetic_profiles(n_faculty, n_external, n_top_external)
+    temporal = preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external_data)
+    graphs = temporal.snapshots(till_year=till_year)[1]
+    groups = [set(name_data.Faculty[name_data.Area == area]) for area in AREAS]
+
+    def by_graphs():
+        return [(Analyzer.get_degree_increase(g), Analyzer.detect_preferential_attachment(g)) for g in
+                [graphs] + [Analyzer.filter_graph_by_names(graphs, group) for group in groups]]
+
+    timeline, build_time = _timed(SparseTimeline.from_temporal_graph, temporal, till_year=till_year)
+
+    def by_timeline():
+        return [(Analyzer.get_degree_increase(t), Analyzer.detect_preferential_attachment(t)) for t in
+                [timeline] + [timeline.subset(group) for group in groups]]
+
+    def unordered(results):  # the nodes of a subgraph view are not in the order of the graph
+        return [([{d: sorted(v) for d, v in year.items()} for year in increase], attachment)
+                for increase, attachment in results]
+
+    expected, graphs_time = _timed(by_graphs)
+    result, timeline_time = _timed(by_timeline)
+    print(f'{temporal.graph.number_of_nodes()} nodes, {temporal.graph.number_of_edges()} edges, {len(graphs)} years, '
+          f'whole graph and {len(groups)} areas: networkx {graphs_time:6.2f}s; degree matrix {timeline_time:6.3f}s '
+          f'(x{graphs_time / timeline_time:.0f}) once the timeline is built in {build_time:6.3f}s, identical={unordered(result) == unordered(expected)}')
+
+
+class _Collaborator:
+    def __init__(self, pid: str, name: str):
+        self.pid = pid
+        self.name = name
+        self.partner = set()
+        self.collab_paper = set()
+        self.score = 0
+
+
+def _external_collaborators_by_objects(profile_data, faculty_pids):
+    """
+    _get_all_external_collaborators as it was: an object with two sets per collaborator, all of them sorted
+    """
+    collaborator_list = dict()
+    for paper in preprocessing.paper_index(profile_data):
+        partners = [k for k, _ in paper.owners]
+        for co_pid, co_name in zip(paper.author_pids, paper.author_names):
+            if co_pid in faculty_pids:
+                continue
+            if co_pid not in collaborator_list:
+                collaborator_list[co_pid] = _Collaborator(co_pid, co_name)
+            collaborator_list[co_pid].partner.update(partners)
+            collaborator_list[co_pid].collab_paper.add(paper.key)
+    avg_paper_per_partner = sum([len(c.collab_paper) / len(c.partner) for c in collaborator_list.values()]) \
+        / len(collaborator_list)
+    for c in collaborator_list.values():
+        c.score = len(c.collab_paper) + avg_paper_per_partner * len(c.partner)
+    return sorted(collaborator_list.values(), key=lambda e: e.score, reverse=True)
+
+
+def bench_collaborators(n_faculty=85, n_external=12000, n_papers=30000, top=2000):
+    """
+    external collaborators ranked for the top candidates: an object with two sets per collaborator and a full sort
+    v.s. CollaboratorTable and a partial sort of the top; time and memory retained by the result
+    """
+    name_data, profiles = make_synthetic_dblp(n_faculty=n_faculty, n_external=n_external, n_papers=n_papers,
+                                              n_external_papers=0)
+    profile_data = {name: parse_profile(profiles[url[len('https://dblp.org/pers/'):-len('.html')]])
+                    for name, url in zip(name_data.Faculty, name_data.DBLP)}
+    faculty_pids = {preprocessing.profile_pid(profile_data, name) for name in profile_data}
+    preprocessing.paper_index(profile_data)  # shared by both, not measured
+
+    expected, objects_time, objects_bytes = _measured(
+        lambda: _external_collaborators_by_objects(profile_data, faculty_pids))
+    table, table_time, table_bytes = _measured(
+        lambda: CollaboratorTable.from_papers(preprocessing.paper_index(profile_data), faculty_pids))
+    result, top_time = _timed(lambda: table[:top])
+    identical = [(c.pid, c.name, round(c.score, 9)) for c in result] == \
+        [(c.pid, c.name, round(c.score, 9)) for c in expected[:top]]
+    print(f'{len(table)} collaborators: objects {objects_time:6.3f}s, {objects_bytes / 2 ** 20:6.2f}MB; table '
+          f'{table_time:6.3f}s, {table_bytes / 2 ** 20:6.2f}MB, top {top} in {top_time * 1000:.1f}ms, '
+          f'identical={identical}')
+
+
+BENCHMARKS = dict(
+    fetch=bench_fetch,
+    refresh=bench_refresh,
+    parse=bench_parse,
+    store=bench_store,
+    graph=bench_graph,
+    graphs=bench_graphs,
+    temporal=bench_temporal,
+    nodes=bench_nodes,
+    sparse=bench_sparse,
+    papers=bench_papers,
+    cache=bench_cache,
+    parallel=bench_parallel,
+    excellence=bench_excellence,
+    metrics=bench_metrics,
+    diameter=bench_diameter,
+    centrality=bench_centrality,
+    eigenvector=bench_eigenvector,
+    filter=bench_filter,
+    colab=bench_colab,
+    cube=bench_cube,
+    degrees=bench_degrees,
+    collaborators=bench_collaborators,
+)
+
+if __name__ == '__main__':
+    for name in sys.argv[1:] or BENCHMARKS.keys():
+        print(f'===== {name} =====')
+        BENCHMARKS[name]()
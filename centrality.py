@@ -0,0 +1,163 @@
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Union
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from sparse_graph import adjacency, bfs_distances
+
+
+def _structure(graph: nx.Graph) -> Tuple[list, list]:
+    """
+    nodes and edges of the graph without their attributes, all that the processes need to rebuild it. The rebuilt
+    graph is also much faster to traverse than a subgraph view, e.g. of the main component
+    """
+    return list(graph.nodes), list(graph.edges)
+
+
+def _rebuild(structure: Tuple[list, list]) -> nx.Graph:
+    graph = nx.Graph()
+    graph.add_nodes_from(structure[0])
+    graph.add_edges_from(structure[1])
+    return graph
+
+
+def _betweenness_of_sources(structure: Tuple[list, list], sources: list, per_source: bool) -> np.ndarray:
+    """
+    normalized betweenness of the nodes counting the shortest paths from the sources only, in node order
+    :param per_source: True for a row per source, False for their sum
+    """
+    graph = _rebuild(structure)
+    nodes = structure[0]
+    rows = []
+    for chunk in ([[s] for s in sources] if per_source else [sources]):
+        values = nx.betweenness_centrality_subset(graph, chunk, nodes, normalized=True)
+        rows.append([values[node] for node in nodes])
+    return np.array(rows, dtype=float).reshape(-1, len(nodes))
+
+
+def _closeness_of_sources(matrix: sp.csr_matrix, sources: np.ndarray, chunk_size: int = 256) -> np.ndarray:
+    """
+    closeness of the sources, as nx.closeness_centrality computes it, by breadth-first searches of chunks of
+    sources at a time
+    """
+    n = matrix.shape[0]
+    closeness = []
+    for start in range(0, len(sources), chunk_size):
+        distances = bfs_distances(matrix, sources[start:start + chunk_size])
+        reachable = np.isfinite(distances)
+        others = reachable.sum(axis=1) - 1.0
+        total = np.where(reachable, distances, 0).sum(axis=1)
+        values = np.divide(others, total, out=np.zeros(len(total)), where=total > 0)
+        if n > 1:
+            values *= others / (n - 1)  # scaled by the part of the graph reached
+        closeness.append(values)
+    return np.concatenate(closeness) if closeness else np.zeros(0)
+
+
+def _split(items: list, workers: int) -> List[list]:
+    size = -(-len(items) // workers)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _run(func, data, items, workers: Union[int, None], *args) -> list:
+    """
+    func(data, part, *args) of every part of the items, in as many processes as the workers; in this process if
+    workers is None or 1
+    """
+    if workers is None or workers <= 1 or len(items) <= 1:
+        return [func(data, items, *args)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, data, part, *args) for part in _split(items, workers)]
+        return [future.result() for future in futures]
+
+
+def betweenness_centrality(graph: nx.Graph, workers: int = None) -> Dict:
+    """
+    nx.betweenness_centrality, with the source nodes split among processes
+    :param graph: graph
+    :param workers: (optional) number of processes; None to compute in this process
+    :return: dictionary with node as key and normalized betweenness as value
+    """
+    structure = _structure(graph)
+    if workers is None or workers <= 1:
+        return nx.betweenness_centrality(_rebuild(structure))
+    parts = _run(_betweenness_of_sources, structure, structure[0], workers, False)
+    return dict(zip(structure[0], np.sum(parts, axis=0).reshape(-1).tolist()))
+
+
+def sampled_betweenness_centrality(graph: nx.Graph, k: int, seed: int = None, workers: int = None) \
+        -> Tuple[Dict, Dict]:
+    """
+    betweenness estimated from the shortest paths of k pivots, as nx.betweenness_centrality(graph, k=k, seed=seed)
+    picks them. The estimate of a node is the mean of its betweenness from each pivot, scaled to all nodes, so its
+    standard error (one standard deviation of the estimate) follows from the spread of the pivots. Most pivots add
+    nothing to a node on few shortest paths, so the error of such nodes tends to be underestimated
+    :param graph: graph
+    :param k: number of pivots; all nodes if k is not less than the number of nodes
+    :param seed: (optional) random seed of the pivots, for reproducible results
+    :param workers: (optional) number of processes to split the pivots among; None to compute in this process
+    :return: dictionaries with node as key, and the estimated betweenness and its standard error as value
+    """
+    structure = _structure(graph)
+    nodes = structure[0]
+    n = len(nodes)
+    if k >= n:
+        return betweenness_centrality(graph, workers), dict.fromkeys(nodes, 0.0)
+    pivots = random.Random(seed).sample(nodes, k)
+    contributions = np.vstack(_run(_betweenness_of_sources, structure, pivots, workers, True)) * n
+    estimates = contributions.mean(axis=0)
+    if k > 1:  # sampled without replacement, hence the finite population correction
+        errors = contributions.std(axis=0, ddof=1) / math.sqrt(k) * math.sqrt((n - k) / (n - 1))
+    else:
+        errors = np.full(n, np.nan)
+    return dict(zip(nodes, estimates.tolist())), dict(zip(nodes, errors.tolist()))
+
+
+def closeness_centrality(graph: nx.Graph, workers: int = None) -> Dict:
+    """
+    nx.closeness_centrality by sparse matrix breadth-first searches, optionally with the nodes split among processes
+    :param graph: graph
+    :param workers: (optional) number of processes; None to compute in this process
+    :return: dictionary with node as key and closeness as value
+    """
+    nodes, matrix = adjacency(graph)
+    parts = _run(_closeness_of_sources, matrix, np.arange(len(nodes), dtype=np.int32), workers)
+    return dict(zip(nodes, np.concatenate(parts).tolist()))
+
+
+def eigenvector_centrality(graph: nx.Graph, nstart: Dict = None, max_iter: int = 100, tol: float = 1.0e-6) -> Dict:
+    """
+    nx.eigenvector_centrality by power iteration with scipy.sparse matrix products; as networkx, raises
+    nx.PowerIterationFailedConvergence if it does not converge in max_iter iterations
+    :param graph: graph
+    :param nstart: (optional) starting value of the nodes, e.g. the centrality of the year before as a warm start;
+     nodes without one start from the mean of the others
+    :param max_iter: maximum number of iterations
+    :param tol: error tolerance used to check convergence, as networkx
+    :return: dictionary with node as key and eigenvector centrality as value
+    """
+    nodes, matrix = adjacency(graph)
+    n = len(nodes)
+    if n == 0:
+        return dict()
+    matrix = matrix.astype(float)
+    if nstart:
+        known = [nstart[node] for node in nodes if node in nstart]
+        default = sum(known) / len(known) if known else 1.0
+        x = np.array([nstart.get(node, default) for node in nodes], dtype=float)
+    else:
+        x = np.ones(n)
+    x = x / x.sum() if x.sum() > 0 else np.full(n, 1.0 / n)
+
+    for _ in range(max_iter):
+        x_last = x
+        x = x_last + matrix @ x_last  # the shift by the identity keeps bipartite graphs from oscillating
+        x = x / (np.linalg.norm(x) or 1)
+        if np.abs(x - x_last).sum() < n * tol:
+            return dict(zip(nodes, x.tolist()))
+
+    raise nx.PowerIterationFailedConvergence(max_iter)
@@ -0,0 +1,100 @@
+import threading
+from typing import Iterable, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from temporal_graph import TemporalGraph
+
+
+class CollaborationStats:
+    """
+    collaboration properties of the graph by every year, for all nodes or any subset of them, see
+    Analyzer.get_colab_properties. Every paper is indexed once with its year, venue and edges, so that the properties
+    of a subset are cumulative counts over the years of the papers on its edges, without building any subgraph. The
+    properties of all nodes, the baseline of every relative weight, are kept once computed.
+    """
+
+    def __init__(self, temporal: TemporalGraph, years: Sequence[int]):
+        """
+        :param temporal: collaboration graph of all years, see TemporalGraph
+        :param years: years of the graphs, each counting the papers till that year (included), as
+         TemporalGraph.snapshot
+        """
+        graph = temporal.graph
+        self.years = [int(year) for year in years]
+        self._node_index = {node: i for i, node in enumerate(graph.nodes)}
+        paper_index, venue_index = dict(), dict()
+        paper_years, paper_venues = [], []
+        edge_ends, edge_years, incidence_papers, incidence_edges = [], [], [], []
+        for e, (u, v, data) in enumerate(graph.edges(data=True)):
+            edge_ends.append((self._node_index[u], self._node_index[v]))
+            edge_years.append(min(data['year'].values()))
+            for key, venue in data['paper'].items():
+                p = paper_index.get(key)
+                if p is None:
+                    p = paper_index[key] = len(paper_years)
+                    paper_years.append(data['year'][key])
+                    paper_venues.append(venue_index.setdefault(venue, len(venue_index)))
+                incidence_papers.append(p)
+                incidence_edges.append(e)
+        self.venues = list(venue_index)
+        edge_ends = np.array(edge_ends, dtype=np.int64).reshape(-1, 2)
+        self._edge_u, self._edge_v = edge_ends[:, 0], edge_ends[:, 1]
+        self._edge_bins = self._bins(edge_years)
+        self._paper_bins = self._bins(paper_years)
+        self._paper_years = np.array(paper_years, dtype=np.int64)
+        self._paper_venues = np.array(paper_venues, dtype=np.int64)
+        self._incidence_papers = np.array(incidence_papers, dtype=np.int64)
+        self._incidence_edges = np.array(incidence_edges, dtype=np.int64)
+        self._baseline = None
+        self._lock = threading.Lock()
+
+    def _bins(self, years: List[int]) -> np.ndarray:
+        """
+        :return: index of the first of the years counting each year, len(self.years) for those after the last
+        """
+        return np.searchsorted(self.years, np.array(years, dtype=np.int64), side='left')
+
+    def _cumulative(self, bins: np.ndarray) -> List[int]:
+        return np.cumsum(np.bincount(bins, minlength=len(self.years) + 1)[:-1]).tolist()
+
+    def properties(self, nodes: Union[Iterable, None] = None) -> Tuple[List[int], List[int], List[int], List[list]]:
+        """
+        :param nodes: (optional) nodes of the subgraphs, names not in the graph being ignored; all nodes by default
+        :return: in sequence: number of partners, total number of collab papers, total number of published venues,
+         most frequent venues (all year-wise), as Analyzer.get_colab_properties of the graphs by every year. Venues as
+         frequent are ordered by their first year, then by name, instead of the order the edges of the graph happen
+         to be iterated in
+        """
+        if nodes is None:
+            with self._lock:
+                if self._baseline is None:
+                    self._baseline = self._properties(np.ones(len(self._node_index), dtype=bool))
+                return self._baseline
+        mask = np.zeros(len(self._node_index), dtype=bool)
+        mask[[self._node_index[node] for node in nodes if node in self._node_index]] = True
+        return self._properties(mask)
+
+    def _properties(self, mask: np.ndarray) -> Tuple[List[int], List[int], List[int], List[list]]:
+        n_years, n_venues = len(self.years), len(self.venues)
+        edges = mask[self._edge_u] & mask[self._edge_v]
+        papers = np.zeros(len(self._paper_bins), dtype=bool)
+        papers[self._incidence_papers[edges[self._incidence_edges]]] = True
+        paper_bins, paper_venues = self._paper_bins[papers], self._paper_venues[papers]
+
+        first_bins = np.full(n_venues, n_years, dtype=np.int64)
+        np.minimum.at(first_bins, paper_venues, paper_bins)
+        first_years = np.full(n_venues, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_years, paper_venues, self._paper_years[papers])
+        counts = np.bincount(paper_bins * n_venues + paper_venues, minlength=(n_years + 1) * n_venues)
+        counts = np.cumsum(counts.reshape(n_years + 1, n_venues)[:-1], axis=0)
+        most_frequent_venues = []
+        for row in counts:
+            published = np.flatnonzero(row)
+            names = [self.venues[v] for v in published.tolist()]
+            order = sorted(range(len(published)), key=lambda i: (-row[published[i]], first_years[published[i]],
+                                                                 str(names[i])))
+            most_frequent_venues.append([(names[i], int(row[published[i]])) for i in order])
+
+        return self._cumulative(self._edge_bins[edges]), self._cumulative(paper_bins), \
+            self._cumulative(first_bins[first_bins < n_years]), most_frequent_venues
@@ -0,0 +1,131 @@
+from collections.abc import Sequence
+from typing import Iterable, List, Set
+
+import numpy as np
+
+
+class Collaborator:
+    __slots__ = ('pid', 'name', 'num_partners', 'num_papers', 'score')
+
+    def __init__(self, pid: str, name: str, num_partners: int = 0, num_papers: int = 0, score: float = 0):
+        self.pid = pid
+        self.name = name
+        self.num_partners = num_partners  # faculty members collaborated with
+        self.num_papers = num_papers  # papers co-authored with them
+        self.score = score
+
+    def __repr__(self):
+        return f'Collaborator({self.pid!r}, {self.name!r}, {self.num_partners} partners, {self.num_papers} papers, ' \
+               f'score {self.score:.3f})'
+
+
+class CollaboratorTable(Sequence):
+    """
+    external collaborators of the faculty members as arrays over interned ids, in order of score (highest first) as a
+    sequence: collaborators are made on access only, and a slice of the best ones, e.g. table[:2000], selects them by
+    a partial sort instead of sorting the whole table. Collaborators of the same score keep the order of their first
+    paper.
+    """
+
+    def __init__(self, pids: List[str], names: List[str], num_partners: np.ndarray, num_papers: np.ndarray):
+        """
+        :param pids: dblp pid of every collaborator
+        :param names: name of every collaborator
+        :param num_partners: number of faculty members every collaborator has co-authored with
+        :param num_papers: number of papers every collaborator has co-authored with them
+        """
+        self.pids = pids
+        self.names = names
+        self.num_partners = num_partners
+        self.num_papers = num_papers
+        avg_paper_per_partner = float(np.mean(num_papers / num_partners)) if len(pids) else 0.0
+        self.score = num_papers + avg_paper_per_partner * num_partners
+        self._ranking = None
+
+    @classmethod
+    def from_papers(cls, papers: Iterable, faculty_pids: Set[str]) -> 'CollaboratorTable':
+        """
+        :param papers: co-authored papers of the faculty members, e.g. a PaperIndex
+        :param faculty_pids: pids of the faculty members, who are not collaborators
+        :return: table of the other authors of the papers
+        """
+        collaborator_ids, partner_ids = dict(), dict()
+        pids, names = [], []
+        paper_collaborators, paper_counts, owners, owner_counts = [], [], [], []
+        for paper in papers:  # a single scan: every paper's collaborators and owners as ids
+            count = 0
+            for co_pid, co_name in zip(paper.author_pids, paper.author_names):
+                if co_pid in faculty_pids:
+                    continue
+                i = collaborator_ids.get(co_pid)
+                if i is None:
+                    i = collaborator_ids[co_pid] = len(pids)
+                    pids.append(co_pid)
+                    names.append(co_name)
+                paper_collaborators.append(i)
+                count += 1
+            if count:
+                paper_counts.append(count)
+                owners.extend(partner_ids.setdefault(name, len(partner_ids)) for name, _ in paper.owners)
+                owner_counts.append(len(paper.owners))
+
+        n = len(pids)
+        paper_collaborators = np.array(paper_collaborators, dtype=np.int64)
+        paper_counts, owner_counts = np.array(paper_counts, dtype=np.int64), np.array(owner_counts, dtype=np.int64)
+        papers_of = np.repeat(np.arange(len(paper_counts)), paper_counts)
+        num_papers = np.bincount(np.unique(paper_collaborators * len(paper_counts) + papers_of) // len(paper_counts),
+                                 minlength=n) if n else np.zeros(0, dtype=np.int64)
+
+        # every collaborator of a paper with every owner of it, once per pair
+        owner_starts = np.cumsum(owner_counts) - owner_counts
+        pair_counts = np.repeat(owner_counts, paper_counts)
+        pair_collaborators = np.repeat(paper_collaborators, pair_counts)
+        pair_owners = np.array(owners, dtype=np.int64)[
+            np.repeat(np.repeat(owner_starts, paper_counts), pair_counts) +
+            np.arange(len(pair_collaborators)) - np.repeat(np.cumsum(pair_counts) - pair_counts, pair_counts)]
+        num_partners = np.bincount(np.unique(pair_collaborators * len(partner_ids) + pair_owners) // len(partner_ids),
+                                   minlength=n) if n else np.zeros(0, dtype=np.int64)
+        return cls(pids, names, num_partners, num_papers)
+
+    def __len__(self):
+        return len(self.pids)
+
+    def _record(self, i: int) -> Collaborator:
+        return Collaborator(self.pids[i], self.names[i], int(self.num_partners[i]), int(self.num_papers[i]),
+                            float(self.score[i]))
+
+    def ranking(self, k: int = None) -> np.ndarray:
+        """
+        :param k: (optional) number of the best collaborators; all by default
+        :return: ids of the best k collaborators, highest score first
+        """
+        n = len(self)
+        k = n if k is None else max(0, min(k, n))
+        if self._ranking is not None or k == n:
+            if self._ranking is None:
+                self._ranking = np.argsort(-self.score, kind='stable')
+            return self._ranking[:k]
+        if k == 0:
+            return np.zeros(0, dtype=np.int64)
+        threshold = np.partition(-self.score, k - 1)[k - 1]
+        candidates = np.flatnonzero(-self.score <= threshold)  # those tied at the threshold included, in id order
+        return candidates[np.argsort(-self.score[candidates], kind='stable')][:k]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            prefix = stop if step > 0 else start + 1
+            return [self._record(j) for j in self.ranking(prefix)[i].tolist()]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError('collaborator index out of range')
+        return self._record(int(self.ranking(i + 1)[i]))
+
+    @property
+    def nbytes(self) -> int:
+        """
+        :return: approximate memory of the table, the strings of the pids and names included
+        """
+        return self.num_partners.nbytes + self.num_papers.nbytes + self.score.nbytes + \
+            sum(len(s) for s in self.pids) + sum(len(s) for s in self.names)
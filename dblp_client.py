@@ -0,0 +1,200 @@
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Iterator, List, Tuple, Union
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    thread-safe limiter spacing out requests to the same host
+    """
+
+    def __init__(self, rate: Union[float, None]):
+        """
+        :param rate: maximum number of requests per second per host; None for no limit
+        """
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next_slot = dict()
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        """
+        block until a request to the host of the url is allowed
+        :param url: url to be requested
+        :return:
+        """
+        if self.interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class ProfileResponse(namedtuple('ProfileResponse', ['url', 'content', 'etag', 'last_modified'])):
+    """
+    xml profile with its validators; content is None when the profile is not modified since the last fetch
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_response(cls, response: requests.Response):
+        return cls(response.url, response.content, response.headers.get('ETag'),
+                   response.headers.get('Last-Modified'))
+
+    @property
+    def not_modified(self) -> bool:
+        return self.content is None
+
+    def meta(self, previous: Union[dict, None] = None) -> dict:
+        """
+        validators to be stored for the next conditional request
+        :param previous: meta stored by the last fetch, whose digest is kept when the profile is not modified
+        :return: dictionary of the resolved xml url, etag, last-modified and content digest
+        """
+        if self.not_modified:
+            digest = previous['digest'] if previous is not None else None
+        else:
+            digest = hashlib.sha1(self.content).hexdigest()
+        return dict(url=self.url, etag=self.etag, last_modified=self.last_modified, digest=digest)
+
+
+class DBLPClient:
+    """
+    fetch dblp profiles through a pool of keep-alive connections shared by all worker threads
+    """
+
+    def __init__(self, workers: int = 8, rate_limit: Union[float, None] = None, max_retries: int = 3,
+                 backoff: float = 0.5, timeout: float = 30, max_backoff: float = 60):
+        """
+        :param workers: number of concurrent requests
+        :param rate_limit: maximum number of requests per second per host; None for no limit
+        :param max_retries: number of retries on 429/5xx responses and connection errors
+        :param backoff: base delay in seconds, doubled after every retry
+        :param timeout: timeout of a single request in seconds
+        :param max_backoff: longest delay in seconds before a retry, Retry-After of the server included
+        """
+        assert workers >= 1, 'At least one worker is required!'
+        self.workers = workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate_limit)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=workers, pool_maxsize=workers, pool_block=True)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _retry_delay(self, attempt: int, response: Union[requests.Response, None]) -> float:
+        if response is not None and response.headers.get('Retry-After', '').isdigit():
+            return min(float(response.headers['Retry-After']), self.max_backoff)
+        return min(self.backoff * (2 ** attempt) * (1 + random.random() / 2), self.max_backoff)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """
+        GET the url, retrying with exponential backoff on 429/5xx and connection errors
+        :param url: url to be requested
+        :param kwargs: other arguments passed to requests
+        :return: the successful response
+        """
+        for attempt in range(self.max_retries + 1):
+            self.limiter.wait(url)
+            try:
+                response = self.session.get(url, timeout=self.timeout, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self._retry_delay(attempt, None))
+                continue
+
+            if response.status_code in RETRY_STATUS and attempt < self.max_retries:
+                response.close()
+                time.sleep(self._retry_delay(attempt, response))
+                continue
+            response.raise_for_status()
+            return response
+
+    def fetch_profile(self, url: str, validators: Union[dict, None] = None) -> ProfileResponse:
+        """
+        fetch the xml profile behind a dblp person url
+        :param url: dblp url, either .html or .xml
+        :param validators: (optional) meta stored by the last fetch; the resolved xml url is then requested directly
+         with If-None-Match/If-Modified-Since
+        :return: the profile, with content None if not modified
+        """
+        if validators is not None and validators.get('url'):
+            headers = dict()
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+            try:
+                response = self.get(validators['url'], headers=headers)
+            except requests.HTTPError:  # e.g. the pid is moved; resolve the person url again
+                response = None
+            if response is not None and response.status_code == 304:
+                return ProfileResponse(validators['url'], None, response.headers.get('ETag', validators.get('etag')),
+                                       response.headers.get('Last-Modified', validators.get('last_modified')))
+            if response is not None:
+                return ProfileResponse.from_response(response)
+
+        response = self.get(url)
+        true_url = response.url  # sometimes .xml will be converted to .html after redirection
+        if true_url.endswith('.xml'):
+            return ProfileResponse.from_response(response)  # already the profile, no need for a second request
+        true_url = re.sub(r'(?<=\.)html$', 'xml', true_url)
+        return ProfileResponse.from_response(self.get(true_url))
+
+    def fetch_profile_xml(self, url: str) -> bytes:
+        """
+        fetch the xml profile behind a dblp person url
+        :param url: dblp url, either .html or .xml
+        :return: profile in xml format
+        """
+        return self.fetch_profile(url).content
+
+    def fetch_all(self, url_list: List[str], validators: Union[List[Union[dict, None]], None] = None) \
+            -> Iterator[Tuple[int, Union[ProfileResponse, Exception]]]:
+        """
+        fetch all profiles concurrently
+        :param url_list: dblp urls
+        :param validators: (optional) meta stored by the last fetch for each url, to send conditional requests
+        :return: iterator of (index in url_list, profile or the exception raised), in order of completion
+        """
+        if validators is None:
+            validators = [None] * len(url_list)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {executor.submit(self.fetch_profile, url, v): i
+                       for i, (url, v) in enumerate(zip(url_list, validators))}
+            try:
+                for future in as_completed(futures):
+                    try:
+                        yield futures[future], future.result()
+                    except Exception as e:
+                        yield futures[future], e
+            finally:  # e.g. KeyboardInterrupt, do not wait for the queued urls
+                for future in futures:
+                    future.cancel()
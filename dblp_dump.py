@@ -0,0 +1,237 @@
+"""
+Offline source of dblp profiles: the official dblp.xml.gz dump is streamed once into an on-disk sqlite index, from which
+the profiles of any person can then be assembled without network access.
+Run `python dblp_dump.py PATH_TO/dblp.xml.gz` to rebuild the faculty and external collaborator profiles in one batch.
+"""
+import gzip
+import html.entities
+import itertools
+import os
+import os.path as osp
+import re
+import sqlite3
+import sys
+import xml.etree.ElementTree as ET
+from typing import Dict, List, Union
+
+from tqdm import tqdm
+
+from data import DATA_PATH
+from dblp_parser import Profile, Publication, publication_from_element
+
+DEFAULT_INDEX_PATH = osp.join(DATA_PATH, 'dblp_index.sqlite')
+_BATCH_SIZE = 50000
+_SQLITE_MAX_VARIABLES = 900
+
+
+def build_dump_index(dump_path: str, index_path: str = DEFAULT_INDEX_PATH) -> str:
+    """
+    stream the dblp dump once and store every publication with its authors, and every person with the name variants
+    listed on the homepage record, in an sqlite index. Memory is bounded by one batch of records.
+    :param dump_path: path of dblp.xml.gz (or the uncompressed dblp.xml)
+    :param index_path: path of the index to be written
+    :return: index_path
+    """
+    tmp_path = f'{index_path}.tmp'
+    if osp.exists(tmp_path):
+        os.remove(tmp_path)
+    con = sqlite3.connect(tmp_path)
+    con.executescript('''
+        PRAGMA journal_mode = OFF;
+        PRAGMA synchronous = OFF;
+        CREATE TABLE publication (id INTEGER PRIMARY KEY, key TEXT, kind TEXT, year INTEGER, booktitle TEXT,
+                                  journal TEXT, role TEXT);
+        CREATE TABLE authorship (name TEXT, pub_id INTEGER, position INTEGER);
+        CREATE TABLE person (name TEXT, pid TEXT, position INTEGER);
+    ''')
+
+    parser = ET.XMLParser()
+    parser.entity.update({k: chr(v) for k, v in html.entities.name2codepoint.items()})  # entities from dblp.dtd
+
+    publications, authorships, persons = [], [], []
+
+    def flush():
+        con.executemany('INSERT INTO publication VALUES (?, ?, ?, ?, ?, ?, ?)', publications)
+        con.executemany('INSERT INTO authorship VALUES (?, ?, ?)', authorships)
+        con.executemany('INSERT INTO person VALUES (?, ?, ?)', persons)
+        con.commit()
+        publications.clear()
+        authorships.clear()
+        persons.clear()
+
+    opener = gzip.open if dump_path.endswith('.gz') else open
+    depth = 0
+    root = None
+    n_records = 0
+    with opener(dump_path, 'rb') as f, tqdm(unit=' records') as pbar:
+        for event, elem in ET.iterparse(f, events=('start', 'end'), parser=parser):
+            if event == 'start':
+                depth += 1
+                if root is None:
+                    root = elem
+                continue
+            depth -= 1
+            if depth != 1:  # only complete records directly under <dblp>
+                continue
+
+            if elem.tag == 'www':
+                key = elem.get('key', '')
+                disambiguation = any(n.get('type') == 'disambiguation' for n in elem.iterfind('note'))
+                if key.startswith('homepages/') and not disambiguation:
+                    pid = key[len('homepages/'):]
+                    persons.extend((''.join(a.itertext()), pid, i) for i, a in enumerate(elem.iterfind('author')))
+            else:
+                pub = publication_from_element(elem)
+                publications.append((n_records, pub.key, pub.kind, pub.year, pub.booktitle, pub.journal, pub.role))
+                authorships.extend((name, n_records, i) for i, name in enumerate(pub.author_names))
+            root.clear()
+            n_records += 1
+            pbar.update(1)
+
+            if len(authorships) + len(persons) >= _BATCH_SIZE:
+                flush()
+    flush()
+
+    print("Indexing...")
+    con.executescript('''
+        CREATE INDEX authorship_name ON authorship (name);
+        CREATE INDEX authorship_pub ON authorship (pub_id);
+        CREATE INDEX person_name ON person (name);
+        CREATE INDEX person_pid ON person (pid);
+    ''')
+    con.close()
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+def _chunks(items: list, size: int = _SQLITE_MAX_VARIABLES):
+    it = iter(items)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _name_candidates(encoded: str) -> List[str]:
+    """
+    decode the name in a dblp person url, e.g. 'Cham:Tat=Jen' -> 'Tat-Jen Cham', 'Madhukumar:A=_S=' -> 'A. S. Madhukumar'
+    '=' stands for either '.' or '-', so all combinations are returned
+    """
+    encoded = re.sub(r'=([a-zA-Z]+)=',
+                     lambda m: chr(html.entities.name2codepoint[m.group(1)])
+                     if m.group(1) in html.entities.name2codepoint else m.group(0), encoded)
+    last, _, first = encoded.partition(':')
+    name = f'{first} {last}' if first else last
+    name = name.replace('_', ' ')
+    parts = name.split('=')
+    return [''.join(itertools.chain.from_iterable(itertools.zip_longest(parts, seps, fillvalue='')))
+            for seps in itertools.product('.-', repeat=len(parts) - 1)]
+
+
+class DumpIndex:
+    """
+    read-only access to an index built by build_dump_index
+    """
+
+    def __init__(self, index_path: str = DEFAULT_INDEX_PATH):
+        if not osp.exists(index_path):
+            raise FileNotFoundError(f"the dump index {index_path} does not exist! Build it with build_dump_index first")
+        self.con = sqlite3.connect(index_path)
+        self._pid_cache = dict()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def resolve_url(self, url: str) -> Union[str, None]:
+        """
+        :param url: dblp person url, either https://dblp.org/pid/<pid>.html or https://dblp.org/pers/<x>/<Last:First>
+        :return: pid of the person; None if not found in the dump
+        """
+        m = re.search(r'/pid/(.+?)(\.html|\.xml)?$', url)
+        if m is not None:
+            return m.group(1)
+        m = re.search(r'/pers/(?:hd/|xx/)?[^/]+/([^/]+?)(\.html|\.xml)?$', url)
+        if m is None:
+            return None
+        candidates = _name_candidates(m.group(1))
+        row = self.con.execute(f'SELECT pid FROM person WHERE name IN ({",".join("?" * len(candidates))}) LIMIT 1',
+                               candidates).fetchone()
+        return row[0] if row is not None else None
+
+    def _pid_of(self, name: str) -> str:
+        if name not in self._pid_cache:
+            row = self.con.execute('SELECT pid FROM person WHERE name = ? LIMIT 1', (name,)).fetchone()
+            self._pid_cache[name] = row[0] if row is not None else name  # names are unique in dblp
+        return self._pid_cache[name]
+
+    def profile(self, pid: str) -> Union[Profile, None]:
+        """
+        assemble the profile of a person from all publications under any of his/her name variants
+        :param pid: pid of the person, or the name of an author without homepage record
+        :return: compact profile; None if the pid is not in the dump
+        """
+        names = [r[0] for r in self.con.execute('SELECT name FROM person WHERE pid = ? ORDER BY position', (pid,))]
+        if not names:
+            if self.con.execute('SELECT 1 FROM authorship WHERE name = ? LIMIT 1', (pid,)).fetchone() is None:
+                return None
+            names = [pid]
+        for name in names:
+            self._pid_cache[name] = pid
+
+        pub_ids = set()
+        for chunk in _chunks(names):
+            pub_ids.update(r[0] for r in self.con.execute(
+                f'SELECT pub_id FROM authorship WHERE name IN ({",".join("?" * len(chunk))})', chunk))
+
+        publications = []
+        for chunk in _chunks(sorted(pub_ids)):
+            marks = ",".join("?" * len(chunk))
+            authors = dict()
+            for pub_id, name in self.con.execute(
+                    f'SELECT pub_id, name FROM authorship WHERE pub_id IN ({marks}) ORDER BY pub_id, position', chunk):
+                authors.setdefault(pub_id, []).append(name)
+            for pub_id, key, kind, year, booktitle, journal, role in self.con.execute(
+                    f'SELECT * FROM publication WHERE id IN ({marks}) ORDER BY id', chunk):
+                author_names = tuple(authors.get(pub_id, []))
+                publications.append(Publication(key=key, kind=kind, year=year, booktitle=booktitle, journal=journal,
+                                                role=role, author_pids=tuple(self._pid_of(n) for n in author_names),
+                                                author_names=author_names))
+        publications.sort(key=lambda p: -(p.year or 0))  # newest first, as on dblp
+        return Profile(pid=pid, name=names[0], publications=publications)
+
+
+def profiles_from_dump(url_list: List[str], name_list: List[str], index_path: str = DEFAULT_INDEX_PATH) \
+        -> Dict[str, Profile]:
+    """
+    build the profiles of the given persons from the dump index, in place of fetching them from dblp
+    :param url_list: dblp person urls
+    :param name_list: names in the same order as url_list
+    :param index_path: path of the index built by build_dump_index
+    :return: dictionary with name as key, in the same order as name_list
+    """
+    profile_data = dict()
+    with DumpIndex(index_path) as index:
+        for url, name in tqdm(list(zip(url_list, name_list))):
+            pid = index.resolve_url(url)
+            profile = index.profile(pid) if pid is not None else None
+            if profile is None:
+                print(f'url {url} not found in the dump!')
+                continue
+            profile_data[name] = profile
+    return profile_data
+
+
+if __name__ == '__main__':
+    from faculty import Analyzer
+
+    if not osp.exists(DEFAULT_INDEX_PATH):
+        build_dump_index(sys.argv[1])
+    analyzer = Analyzer(reuse_cache=False, dump_index=DEFAULT_INDEX_PATH)
+    analyzer.use_external_collaborators_profiles(reuse=False, dump_index=DEFAULT_INDEX_PATH)
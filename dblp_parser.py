@@ -0,0 +1,189 @@
+import sys
+import xml.etree.ElementTree as ET
+from io import BytesIO
+from typing import List, Union
+
+
+class Publication:
+    """
+    compact record of one dblp publication, holding only what the analysis reads
+    """
+    __slots__ = ('key', 'kind', 'year', 'booktitle', 'journal', 'role', 'author_pids', 'author_names')
+
+    def __init__(self, key: str, kind: str, year: Union[int, None], booktitle: Union[str, None],
+                 journal: Union[str, None], role: Union[str, None], author_pids: tuple, author_names: tuple):
+        """
+        :param key: dblp key of the publication
+        :param kind: type of the record, e.g. article or inproceedings
+        :param year: publication year
+        :param booktitle: (optional) conference of the publication
+        :param journal: (optional) journal of the publication
+        :param role: 'author' or 'editor', whichever the person list is made of
+        :param author_pids: pids of the authors (editors) in order
+        :param author_names: names of the authors (editors) in order
+        """
+        self.key = key
+        self.kind = kind
+        self.year = year
+        self.booktitle = booktitle
+        self.journal = journal
+        self.role = role
+        self.author_pids = author_pids
+        self.author_names = author_names
+
+    @property
+    def venue(self) -> str:
+        """
+        venue as used on the graph edges
+        """
+        if self.booktitle is not None:
+            return self.booktitle
+        elif self.journal is not None:
+            return self.journal
+        return "Others"
+
+    def as_legacy(self) -> dict:
+        """
+        the publication in the format of xmltodict, e.g. {'article': {'@key': ..., 'author': [...], 'year': ...}}
+        """
+        article = {'@key': self.key}
+        authors = [{'@pid': pid, '#text': name} for pid, name in zip(self.author_pids, self.author_names)]
+        article[self.role if self.role is not None else 'author'] = authors[0] if len(authors) == 1 else authors
+        if self.year is not None:
+            article['year'] = str(self.year)
+        if self.booktitle is not None:
+            article['booktitle'] = self.booktitle
+        if self.journal is not None:
+            article['journal'] = self.journal
+        return {self.kind: article}
+
+    def __eq__(self, other):
+        return isinstance(other, Publication) and all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    def __repr__(self):
+        return f'Publication({self.key!r}, {self.year!r}, {self.venue!r}, {len(self.author_pids)} {self.role}s)'
+
+
+class Profile:
+    """
+    compact dblp person profile
+    works as a drop-in replacement of the xmltodict profile: profile['dblpperson'] gives the legacy format, restricted
+    to the fields used by the analysis, built on first access and kept (neither pickled nor to be modified)
+    """
+    __slots__ = ('pid', 'name', 'publications', '_legacy')
+
+    def __init__(self, pid: str, name: str, publications: List[Publication]):
+        self.pid = pid
+        self.name = name
+        self.publications = publications
+        self._legacy = None
+
+    def __getitem__(self, item):
+        if item != 'dblpperson':
+            raise KeyError(item)
+        legacy = getattr(self, '_legacy', None)  # unset in profiles unpickled from before it was kept
+        if legacy is None:
+            pubs = [p.as_legacy() for p in self.publications]
+            legacy = self._legacy = {'@name': self.name, '@pid': self.pid, 'r': pubs[0] if len(pubs) == 1 else pubs}
+        return legacy
+
+    def __getstate__(self):
+        return None, {'pid': self.pid, 'name': self.name, 'publications': self.publications}
+
+    def __contains__(self, item):
+        return item == 'dblpperson'
+
+    def __eq__(self, other):
+        return isinstance(other, Profile) and (self.pid, self.name, self.publications) == \
+            (other.pid, other.name, other.publications)
+
+    def __repr__(self):
+        return f'Profile({self.pid!r}, {self.name!r}, {len(self.publications)} publications)'
+
+
+def _intern(s: Union[str, dict, None]) -> Union[str, None]:
+    if isinstance(s, dict):  # xmltodict text with attributes or markup
+        s = s.get('#text')
+    return sys.intern(s) if s is not None else None
+
+
+def publication_from_element(elem: ET.Element) -> Publication:
+    """
+    :param elem: a publication element, e.g. <article>, with its children parsed
+    :return: compact record of the publication
+    """
+    authors = [a for a in elem if a.tag == 'author']
+    role = 'author'
+    if not authors:
+        authors = [a for a in elem if a.tag == 'editor']
+        role = 'editor' if authors else None
+    year = elem.findtext('year')
+    return Publication(key=elem.get('key'),
+                       kind=_intern(elem.tag),
+                       year=int(year) if year is not None else None,
+                       booktitle=_intern(elem.findtext('booktitle')),
+                       journal=_intern(elem.findtext('journal')),
+                       role=role,
+                       author_pids=tuple(_intern(a.get('pid')) for a in authors),
+                       author_names=tuple(_intern(''.join(a.itertext())) for a in authors))
+
+
+def parse_profile(source: Union[bytes, str]) -> Profile:
+    """
+    parse a dblp person xml as a stream, keeping only one publication in memory at a time
+    :param source: xml content in bytes, or path of an xml file
+    :return: compact profile
+    """
+    if isinstance(source, bytes):
+        source = BytesIO(source)
+
+    pid = name = root = None
+    publications = []
+    for event, elem in ET.iterparse(source, events=('start', 'end')):
+        if event == 'start':
+            if root is None:
+                root = elem
+                pid, name = elem.get('pid'), elem.get('name')
+            continue
+        if elem.tag == 'r' and len(elem):
+            publications.append(publication_from_element(elem[0]))
+            root.clear()  # drop the parsed publications
+        elif elem.tag in ('person', 'coauthors'):
+            root.clear()
+
+    if root is None or root.tag != 'dblpperson':
+        raise ValueError('Not a dblp person profile!')
+    return Profile(pid=pid, name=name, publications=publications)
+
+
+def as_profile(profile) -> Profile:
+    """
+    convert a profile in the xmltodict format to a compact one
+    :param profile: xmltodict profile; a compact profile is returned as it is
+    :return: compact profile
+    """
+    if isinstance(profile, Profile):
+        return profile
+    person = profile['dblpperson']
+    records = person.get('r', [])
+    if type(records) is not list:
+        records = [records]
+
+    publications = []
+    for pub in records:
+        kind = next(iter(pub))
+        article = pub[kind]
+        role = 'author' if 'author' in article else ('editor' if 'editor' in article else None)
+        authors = article[role] if role is not None else []
+        if type(authors) is not list:
+            authors = [authors]
+        authors = [a if isinstance(a, dict) else {'#text': a} for a in authors]
+        publications.append(Publication(key=article['@key'],
+                                        kind=_intern(kind),
+                                        year=int(article['year']) if 'year' in article else None,
+                                        booktitle=_intern(article.get('booktitle')),
+                                        journal=_intern(article.get('journal')),
+                                        role=role,
+                                        author_pids=tuple(_intern(a.get('@pid')) for a in authors),
+                                        author_names=tuple(_intern(a.get('#text')) for a in authors)))
+    return Profile(pid=person['@pid'], name=person.get('@name'), publications=publications)
@@ -0,0 +1,86 @@
+from collections import namedtuple
+from typing import Union
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse import csgraph
+
+from sparse_graph import adjacency
+
+
+class Diameter(namedtuple('Diameter', ['lower', 'upper', 'nodes'])):
+    """
+    bounds of the diameter of a connected graph of the nodes. Passed to component_diameter of the same nodes with more
+    edges as a warm start
+    """
+    __slots__ = ()
+
+    @property
+    def exact(self) -> bool:
+        return self.lower == self.upper
+
+
+def _distances(matrix: sp.csr_matrix, source: int) -> np.ndarray:
+    """
+    :return: distance of every node from the source, by a breadth-first search
+    """
+    return csgraph.shortest_path(matrix, directed=False, unweighted=True, indices=[source])[0]
+
+
+def component_diameter(matrix: sp.csr_matrix, component: Union[np.ndarray, None] = None, tolerance: int = 0,
+                       warm_start: Union[Diameter, None] = None) -> Diameter:
+    """
+    diameter of a connected graph by bounding the eccentricities of the nodes (Takes and Kosters, 2011). Every
+    breadth-first search bounds the eccentricity of all nodes from below and above, searches go alternately from the
+    node with the largest upper bound and the one with the smallest lower bound, and nodes whose bounds cannot change
+    the diameter any more are dropped. Collaboration graphs need a few dozens of searches instead of one per node
+    :param matrix: symmetric adjacency matrix
+    :param component: (optional) nodes of a connected component to be measured; all nodes by default
+    :param tolerance: 0 for the exact diameter; otherwise the search stops once the diameter is known within the
+     tolerance, i.e. upper - lower <= tolerance
+    :param warm_start: (optional) Diameter of the same nodes with fewer edges, e.g. of the year before when the
+     component has only gained edges since; the diameter can only have shrunk, so its upper bound holds, and the
+     search stops as soon as a path that long is found instead of proving the bound again. It is ignored for other
+     nodes
+    :return: bounds of the diameter, lower being the diameter in the exact mode
+    """
+    if component is None:
+        component = np.arange(matrix.shape[0])
+    component = np.asarray(component, dtype=np.int64)
+    matrix = sp.csr_matrix(matrix[component][:, component])
+    matrix.indices, matrix.indptr = matrix.indices.astype(np.int32), matrix.indptr.astype(np.int32)
+    degrees = matrix.getnnz(axis=1)
+
+    lower_bounds, upper_bounds = np.zeros(len(component)), np.full(len(component), np.inf)
+    candidates = np.ones(len(component), dtype=bool)
+    lower, upper = 0, np.inf
+    # only ends the search earlier, the searches run being those without the warm start
+    known_upper = warm_start.upper if warm_start is not None and np.array_equal(warm_start.nodes, component) \
+        else np.inf
+    from_largest = True
+    while min(upper, known_upper) - lower > tolerance and candidates.any():
+        indices = np.flatnonzero(candidates)
+        if from_largest:  # ties broken by the highest degree, the first search being from the highest degree
+            source = indices[np.lexsort((-degrees[indices], -upper_bounds[indices]))[0]]
+        else:
+            source = indices[np.lexsort((-degrees[indices], lower_bounds[indices]))[0]]
+        from_largest = not from_largest
+
+        distances = _distances(matrix, int(source))
+        eccentricity = distances.max()
+        lower_bounds = np.maximum(lower_bounds, np.maximum(eccentricity - distances, distances))
+        upper_bounds = np.minimum(upper_bounds, eccentricity + distances)
+        lower_bounds[source] = upper_bounds[source] = eccentricity
+        lower, upper = max(lower, lower_bounds.max()), min(upper, upper_bounds.max())
+        # nodes that can neither raise the lower bound nor lower the upper bound
+        candidates &= (lower_bounds != upper_bounds) & ~((upper_bounds <= lower) & (lower_bounds >= upper / 2))
+    upper = min(upper, known_upper) if candidates.any() else lower  # no eccentricity exceeds lower
+    return Diameter(int(lower), int(max(upper, lower)), component)
+
+
+def graph_diameter(graph: nx.Graph, tolerance: int = 0) -> Diameter:
+    """
+    component_diameter of a connected networkx graph
+    """
+    return component_diameter(adjacency(graph)[1], tolerance=tolerance)
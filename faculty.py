@@ -1,5 +1,6 @@
+import threading
 import time
-from typing import Set
+from typing import Dict, List, Set, Tuple, Union
 from collections import Counter
 import matplotlib.pyplot as plt
 import networkx as nx
@@ -7,15 +8,66 @@ import numpy as np
 
 from preprocessing import *
 from pictures import PICTURE_PATH
+from centrality import betweenness_centrality, closeness_centrality, eigenvector_centrality, \
+    sampled_betweenness_centrality
+from colab_stats import CollaborationStats
+from collaborators import CollaboratorTable
+from diameter import graph_diameter
+from node_index import FilteredGraphs, IndexedGraphs, Query, where
+from sparse_graph import SparseTimeline
+from temporal_graph import window_papers
+from temporal_metrics import TemporalMetrics
+
+
+class VenueClassifier:
+    """
+    regular expressions of the top conferences of every area, compiled once. Every distinct booktitle is matched
+    once, and the areas it belongs to are kept for all later lookups
+    """
+
+    def __init__(self, area_to_reg: Dict[str, str]):
+        """
+        :param area_to_reg: regular expression of the top conferences of each area, see
+         Analyzer._area_name_to_booktitle
+        """
+        self.areas = list(area_to_reg)
+        self._regs = [re.compile(f"{reg}$") for reg in area_to_reg.values()]
+        self._general_reg = re.compile(f"({'|'.join([f'({r})' for r in area_to_reg.values()])})$")
+        self._memo = dict()  # booktitle -> boolean row over the columns: the areas, then all top conferences
 
+    @property
+    def num_columns(self) -> int:
+        return len(self.areas) + 1
 
-class Collaborator:
-    def __init__(self, pid: str, name: str):
-        self.pid = pid
-        self.name = name
-        self.partner = set()
-        self.collab_paper = set()
-        self.score = 0
+    def column(self, area: Union[str, None]) -> int:
+        """
+        :param area: an area; None for all top conferences
+        :return: column of the area in the rows of matches
+        """
+        return self.areas.index(area) if area is not None else len(self.areas)
+
+    def _row(self, booktitle: str) -> np.ndarray:
+        row = self._memo.get(booktitle)
+        if row is None:
+            row = np.array([reg.match(booktitle) is not None for reg in self._regs] +
+                           [self._general_reg.match(booktitle) is not None], dtype=bool)
+            self._memo[booktitle] = row
+        return row
+
+    def classify(self, booktitle: str) -> Set[str]:
+        """
+        :return: areas whose top conferences include the booktitle
+        """
+        return {area for area, match in zip(self.areas, self._row(booktitle)) if match}
+
+    def matches(self, booktitles: List[str]) -> np.ndarray:
+        """
+        :return: boolean array (booktitles x columns), whether each booktitle is a top conference of each area, and
+         of any area in the last column
+        """
+        if not booktitles:
+            return np.zeros((0, self.num_columns), dtype=bool)
+        return np.array([self._row(b) for b in booktitles], dtype=bool)
 
 
 class Analyzer:
@@ -44,6 +96,8 @@ class Analyzer:
                  top_conf_sheet_name='Sheet1',
                  reuse_cache=True,
                  target_cache_name='profiles',
+                 dump_index=None,
+                 use_store=False,
                  ):
         self.data_path = data_path
         self.faculty_filename = faculty_filename
@@ -52,21 +106,62 @@ class Analyzer:
         self.top_conf_sheet_name = top_conf_sheet_name
         self.reuse_cache = reuse_cache
         self.target_cache_name = target_cache_name
+        self.use_store = use_store
         self.auth_name_data = read_faculty(path=self.data_path,
                                            filename=self.faculty_filename,
                                            sheet_name=self.faculty_sheet_name)
         self.auth_profiles = fetch_dblp_profile(auth_name_data=self.auth_name_data,
                                                 reuse=self.reuse_cache,
-                                                target_pickle_name=self.target_cache_name)
+                                                target_pickle_name=self.target_cache_name,
+                                                dump_index=dump_index,
+                                                store=self.use_store)
         self.top_conf_data = read_top_conferences(path=self.data_path,
                                                   filename=self.top_conf_filename,
                                                   sheet_name=self.top_conf_sheet_name)
         self.area_to_top_booktitle = self._area_name_to_booktitle()
-        self.auth_excellence = self._get_auth_excellence()
-        self.external_collaborators = self._get_all_external_collaborators()
+        self._lock = threading.RLock()
+        self._auth_excellence = None
+        self._external_collaborators = None
+        self._venue_classifier = None
+        self._indexed_graphs = dict()
         self.external_collaborators_profiles = None
         self.external_collaborators_excellence = None
 
+    def _memoized(self, attribute: str, compute):
+        """
+        value of the attribute, computed on first access; other threads wait for it instead of computing it again
+        """
+        value = getattr(self, attribute)
+        if value is None:
+            with self._lock:
+                value = getattr(self, attribute)
+                if value is None:
+                    value = compute()
+                    setattr(self, attribute, value)
+        return value
+
+    @property
+    def auth_excellence(self) -> dict:
+        """
+        excellence of the faculty members, see _get_auth_excellence; computed on first access
+        """
+        return self._memoized('_auth_excellence', self._get_auth_excellence)
+
+    @auth_excellence.setter
+    def auth_excellence(self, value: dict):
+        self._auth_excellence = value
+
+    @property
+    def external_collaborators(self) -> CollaboratorTable:
+        """
+        external collaborators, see _get_all_external_collaborators; computed on first access
+        """
+        return self._memoized('_external_collaborators', self._get_all_external_collaborators)
+
+    @external_collaborators.setter
+    def external_collaborators(self, value: CollaboratorTable):
+        self._external_collaborators = value
+
     def _area_name_to_booktitle(self):
         """
         return the the regular expression code of the top conferences
@@ -104,6 +199,14 @@ class Analyzer:
         else:
             raise ValueError(f'Unexpected Conference Name {venue_name} Encountered!')
 
+    @property
+    def venue_classifier(self) -> 'VenueClassifier':
+        """
+        classifier of the booktitles by the top conferences of each area, shared by the faculty and the external
+        profiles; created on first access
+        """
+        return self._memoized('_venue_classifier', lambda: VenueClassifier(self.area_to_top_booktitle))
+
     def _get_auth_excellence(self, external=False) -> dict:
         """
         count the number of paper published in the respective top conferences
@@ -112,39 +215,88 @@ class Analyzer:
         """
         last_ten_year = datetime.datetime.now().year - 10  # in the last 10 years
 
-        general_reg = re.compile(f"({'|'.join([f'({r})' for r in self.area_to_top_booktitle.values()])})$")
-
-        excellence = dict()
-
         if external:
             profile = self.external_collaborators_profiles
         else:
             profile = self.auth_profiles
 
-        for k, v in profile.items():
-            if external:
-                reg = general_reg
-            else:
-                area = self.auth_name_data[self.auth_name_data.Faculty == k].Area.to_string(index=False)
-                if area not in self.area_to_top_booktitle:
-                    print(f"Unexpected Area {area} Encountered! Matching All Top Conferences Instead...")
-                    reg = general_reg
-                else:
-                    reg = re.compile(f"{self.area_to_top_booktitle[area]}$")  # in his/her respective area
-
-            excellence[k] = 0
-            publications = v['dblpperson']['r']
-            if type(publications) is not list:
-                article = publications[next(iter(publications))]
-                if hasattr(article, 'booktitle') and reg.match(article.booktitle) and article.year >= last_ten_year:
-                    excellence[k] += 1
+        names = list(profile)
+        classifier = self.venue_classifier
+        node_attributes = faculty_node_attributes(self.auth_name_data) if not external else dict()
+        columns = np.array([classifier.column(self._get_excellence_area(k, node_attributes, external)) for k in names],
+                           dtype=np.int64)
+        if isinstance(profile, StoreProfiles):
+            pub_profile, pub_booktitle, pub_year, booktitles = self._store_publications(profile)
+        else:
+            pub_profile, pub_booktitle, pub_year, booktitles = self._dict_publications(profile)
+
+        # one pass over all publications: booktitle in the area of the profile, within the last 10 years
+        matches = np.vstack([classifier.matches(booktitles), np.zeros((1, classifier.num_columns), dtype=bool)])
+        counted = matches[pub_booktitle, columns[pub_profile]] & (pub_year >= last_ten_year)
+        excellence = np.bincount(pub_profile[counted], minlength=len(names))
+        return dict(zip(names, excellence.tolist()))
+
+    def _get_excellence_area(self, name: str, node_attributes: dict, external: bool) -> Union[str, None]:
+        """
+        :param node_attributes: attributes of the faculty members, see faculty_node_attributes
+        :return: area whose top conferences count for the excellence of the profile; None for all top conferences
+        """
+        if external:
+            return None
+        area = node_attributes.get(name, dict()).get('Area')
+        if area not in self.area_to_top_booktitle:
+            print(f"Unexpected Area {area} Encountered! Matching All Top Conferences Instead...")
+            return None
+        return area  # in his/her respective area
+
+    @staticmethod
+    def _dict_publications(profile: dict) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """
+        :return: for every publication of the profiles its profile and booktitle (ids into the returned booktitles;
+         -1 if none) and year (-1 if unknown)
+        """
+        booktitle_ids = dict()
+        pub_profile, pub_booktitle, pub_year = [], [], []
+        for i, v in enumerate(profile.values()):
+            if isinstance(v, Profile):
+                pubs = [(p.booktitle, p.year) for p in v.publications]
             else:
-                for pub in publications:
+                records = v['dblpperson'].get('r', [])
+                records = records if type(records) is list else [records]
+                pubs = []
+                for pub in records:
                     article = pub[next(iter(pub))]
-                    if 'booktitle' in article and reg.match(article['booktitle']) and int(
-                            article['year']) >= last_ten_year:
-                        excellence[k] += 1
-        return excellence
+                    pubs.append((article.get('booktitle'), int(article['year']) if 'year' in article else None))
+            for booktitle, year in pubs:
+                pub_profile.append(i)
+                pub_booktitle.append(booktitle_ids.setdefault(booktitle, len(booktitle_ids))
+                                     if booktitle is not None else -1)
+                pub_year.append(year if year is not None else -1)
+        return np.array(pub_profile, dtype=np.int64), np.array(pub_booktitle, dtype=np.int64), \
+            np.array(pub_year, dtype=np.int64), list(booktitle_ids)
+
+    @staticmethod
+    def _store_publications(profile: StoreProfiles) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """
+        _dict_publications read from the arrays of a publication store
+        """
+        store = profile.store
+        indices = np.array([profile.index(k) for k in profile], dtype=np.int64)
+        offsets = np.asarray(store.profile_pub_offsets)
+        starts, num_publications = offsets[indices], offsets[indices + 1] - offsets[indices]
+        pub_profile = np.repeat(np.arange(len(indices)), num_publications)
+        # position of every publication in profile_pubs: its profile's start plus its rank within the profile
+        ranks = np.arange(len(pub_profile)) - np.repeat(np.cumsum(num_publications) - num_publications,
+                                                        num_publications)
+        pub_ids = np.asarray(store.profile_pubs)[np.repeat(starts, num_publications) + ranks]
+        # only the booktitles in use are returned, most venue ids of the store are journals
+        venue_ids, pub_booktitle = np.unique(np.asarray(store.pub_booktitle)[pub_ids], return_inverse=True)
+        if len(venue_ids) and venue_ids[0] < 0:  # no booktitle
+            pub_booktitle, venue_ids = pub_booktitle - 1, venue_ids[1:]
+        venues = store.venue.tolist()
+        return pub_profile, pub_booktitle.astype(np.int64), np.asarray(store.pub_year)[pub_ids].astype(np.int64), \
+            [venues[i] for i in venue_ids.tolist()]
 
     @classmethod
     def filter_graph_by_names(cls, source_graphs: Union[nx.Graph, List[nx.Graph]],
@@ -158,47 +310,56 @@ class Analyzer:
         if type(faculty_names) is not set:
             faculty_names = set(faculty_names)
 
-        if type(source_graphs) is list:
+        if not isinstance(source_graphs, nx.Graph):  # a list, or a sequence such as the result of filter_graphs
             return [cls._get_subgraph(source_graph=g, node_names=faculty_names) for g in source_graphs]
         else:
             return cls._get_subgraph(source_graphs, faculty_names)
 
+    def indexed_graphs(self, source_graphs: Union[nx.Graph, List[nx.Graph]]) -> IndexedGraphs:
+        """
+        :param source_graphs: the original complete graph(s)
+        :return: the graph(s) with the index of their node attributes, built on the first filter of the same graph(s)
+        """
+        # keyed by the graphs themselves, which the key keeps alive: a list changed in place is a new key
+        key = (source_graphs,) if isinstance(source_graphs, nx.Graph) else tuple(source_graphs)
+        with self._lock:
+            indexed = self._indexed_graphs.pop(key, None)
+            if indexed is None:
+                indexed = IndexedGraphs(source_graphs)
+                if len(self._indexed_graphs) >= 4:  # least recently used first
+                    del self._indexed_graphs[next(iter(self._indexed_graphs))]
+            self._indexed_graphs[key] = indexed
+            return indexed
+
+    def filter_graphs(self, source_graphs: Union[nx.Graph, List[nx.Graph]],
+                      query: Query) -> Union[nx.Graph, List[nx.Graph]]:
+        """
+        Get subgraph(s) that filter the nodes by a query on their attributes (those of the last graph), e.g.
+         where('Area', {'AI/ML', 'Computer Vision'}) & where('Position', {'Professor'})
+        Subgraphs of a list of graphs are created on first access, and kept per query
+        :param source_graphs: the original complete graph(s)
+        :param query: query on the node attributes, see node_index.where
+        :return: networkx graph or sequence of graphs, depending on the number or source graph passed
+        """
+        filtered = self.indexed_graphs(source_graphs).filter(query)
+        return filtered[0] if isinstance(source_graphs, nx.Graph) else filtered
+
     def filter_graph_by_rank(self, source_graphs: Union[nx.Graph, List[nx.Graph]],
                              ranks: Union[Set[str], List[str]]) -> Union[nx.Graph, List[nx.Graph]]:
         """
         Get subgraph(s) that filter the nodes with the designated ranks
         :param source_graphs: the original complete graph(s)
         :param ranks: list of the faculty ranks, e.g.["Professor", "Assistant Professor"]
-        :return: networkx graph or list of graphs, depending on the number or source graph passed
+        :return: networkx graph or sequence of graphs, depending on the number or source graph passed
         """
-        if type(ranks) is not set:
-            ranks = set(ranks)
-        faculty_names = set()
-        nodes_from_graph = source_graphs[-1] if (type(source_graphs) is list) else source_graphs
-        for name, attribute in nodes_from_graph.nodes(data=True):
-            if attribute["Position"] in ranks:
-                faculty_names.add(name)
-        if type(source_graphs) is list:
-            return [self._get_subgraph(source_graph=g, node_names=faculty_names) for g in source_graphs]
-        else:
-            return self._get_subgraph(source_graphs, faculty_names)
+        return self.filter_graphs(source_graphs, where("Position", set(ranks)))
 
     def filter_graph_by_area(self, source_graphs: Union[nx.Graph, List[nx.Graph]],
                              areas: Union[Set[str], List[str]]) -> Union[nx.Graph, List[nx.Graph]]:
         """
         Get subgraph(s) that filter the nodes with the designated areas
         """
-        if type(areas) is not set:
-            areas = set(areas)
-        faculty_names = set()
-        nodes_from_graph = source_graphs[-1] if (type(source_graphs) is list) else source_graphs
-        for name, attribute in nodes_from_graph.nodes(data=True):
-            if attribute["Area"] in areas:
-                faculty_names.add(name)
-        if type(source_graphs) is list:
-            return [self._get_subgraph(source_graph=g, node_names=faculty_names) for g in source_graphs]
-        else:
-            return self._get_subgraph(source_graphs, faculty_names)
+        return self.filter_graphs(source_graphs, where("Area", set(areas)))
 
     def filter_graph_by_managerole(self, source_graphs: Union[nx.Graph, List[nx.Graph]],
                              is_management: bool) -> Union[nx.Graph, List[nx.Graph]]:
@@ -206,21 +367,9 @@ class Analyzer:
         Get subgraph(s) that filter the nodes for managerial role faculty
         :param source_graphs: the original complete graph(s)
         :param is_management: specify the subgraoh would only contain management role faculty or not
-        :return: networkx graph or list of graphs, depending on the number or source graph passed
+        :return: networkx graph or sequence of graphs, depending on the number or source graph passed
         """
-        faculty_names = set()
-        nodes_from_graph = source_graphs[-1] if (type(source_graphs) is list) else source_graphs
-        for name, attribute in nodes_from_graph.nodes(data=True):
-            if is_management:
-                if attribute["Management"] == 'Y':
-                    faculty_names.add(name)
-            else:
-                if attribute["Management"] == 'N':
-                    faculty_names.add(name)
-        if type(source_graphs) is list:
-            return [self._get_subgraph(source_graph=g, node_names=faculty_names) for g in source_graphs]
-        else:
-            return self._get_subgraph(source_graphs, faculty_names)
+        return self.filter_graphs(source_graphs, where("Management", 'Y' if is_management else 'N'))
 
     @staticmethod
     def _get_subgraph(source_graph: nx.Graph, node_names: Set[str]) -> nx.Graph:
@@ -255,7 +404,7 @@ class Analyzer:
         largest_component = max(components, key=len)
         # construct a subgraph of largest component
         subgraph = graph.subgraph(largest_component)
-        diameter = nx.diameter(subgraph)
+        diameter = graph_diameter(subgraph).lower
         return diameter
 
     @staticmethod
@@ -269,32 +418,44 @@ class Analyzer:
         return clust_coeff
 
     @classmethod
-    def plot_avg_degree_hist(cls, graphs: List[nx.Graph], tags: List[str], name=None) -> str:
+    def plot_avg_degree_hist(cls, graphs: Union[List[nx.Graph], SparseTimeline, TemporalMetrics], tags: List[str],
+                             name=None) -> str:
         """
         Plot average degree by year
-        :param graphs:
+        :param graphs: graphs, or their SparseTimeline to compute all years at once, or their TemporalMetrics
         :param tags: year in sequence
         :param name:
         :return: file name of the saved picture
         """
         fig, ax = plt.subplots()
-        y = [cls.get_avg_degree(graph) for graph in graphs]
+        if isinstance(graphs, TemporalMetrics):
+            y = graphs.series('avg_degree')
+        elif isinstance(graphs, SparseTimeline):
+            y = graphs.avg_degrees().tolist()
+        else:
+            y = [cls.get_avg_degree(graph) for graph in graphs]
         x = range(len(tags))
         return cls._plot_line(x, y, tags, "Year", "Average Node Degree", "Average Node Degree by Year",
                               name if name is not None else f'avg_degree_plot_{"{:.5f}".format(time.time())}',
                               ax, plt)
 
     @classmethod
-    def plot_avg_clust_coeff_hist(cls, graphs: List[nx.Graph], tags: List[str], name=None) -> str:
+    def plot_avg_clust_coeff_hist(cls, graphs: Union[List[nx.Graph], SparseTimeline, TemporalMetrics],
+                                  tags: List[str], name=None) -> str:
         """
         Plot average clustering coefficient by year
-        :param graphs:
+        :param graphs: graphs, or their SparseTimeline to compute all years at once, or their TemporalMetrics
         :param tags: year in sequence
         :param name:
         :return: file name of the saved picture
         """
         fig, ax = plt.subplots()
-        y = [cls.get_clustering_coeff(graph) for graph in graphs]
+        if isinstance(graphs, TemporalMetrics):
+            y = graphs.series('avg_clustering')
+        elif isinstance(graphs, SparseTimeline):
+            y = graphs.avg_clustering().tolist()
+        else:
+            y = [cls.get_clustering_coeff(graph) for graph in graphs]
         x = range(len(tags))
         return cls._plot_line(x, y, tags, "Year", "Average Clustering Coefficient",
                               "Average Clustering Coefficient by Year",
@@ -302,16 +463,19 @@ class Analyzer:
                               ax, plt)
 
     @classmethod
-    def plot_diameter_hist(cls, graphs: List[nx.Graph], tags: List[str], name=None) -> str:
+    def plot_diameter_hist(cls, graphs: Union[List[nx.Graph], TemporalMetrics], tags: List[str], name=None) -> str:
         """
         Plot the diameter of the largest component of the graph by year
-        :param graphs:
+        :param graphs: graphs, or their TemporalMetrics
         :param tags: year in sequence
         :param name:
         :return: file name of the saved picture
         """
         fig, ax = plt.subplots()
-        y = [cls.get_largest_component_diameter(graph) for graph in graphs]
+        if isinstance(graphs, TemporalMetrics):
+            y = graphs.series('diameter')
+        else:
+            y = [cls.get_largest_component_diameter(graph) for graph in graphs]
         x = range(len(tags))
         return cls._plot_line(x, y, tags, "Year", "Diameter (Largest Component)",
                               "Diameter (Largest Component) by Year",
@@ -398,11 +562,19 @@ class Analyzer:
         # Create ordered tuple of centrality data
         return sorted(list(cent_dict.items()), key=lambda x: x[1], reverse=True)
 
-    def analyze_centrality_of_main_component(self, g: nx.Graph) -> dict:
+    def analyze_centrality_of_main_component(self, g: nx.Graph, k: int = None, seed: int = None,
+                                             workers: int = None, warm_start: dict = None) -> dict:
         """
         Compute node centrality measures after extracting the main connected component.
         :param g: graph
-        :return: dictionary with type of centrality as key and sorted result as value
+        :param k: (optional) number of pivots to estimate the betweenness centrality from; exact by default
+        :param seed: (optional) random seed of the pivots, for reproducible estimates
+        :param workers: (optional) number of processes to split the exact betweenness and closeness centrality
+         (source nodes) or the pivots among; None to compute in this process
+        :param warm_start: (optional) result of the graph of the year before, whose eigenvector centrality starts
+         the power iteration
+        :return: dictionary with type of centrality as key and sorted result as value; with k, also the largest
+         standard error of the estimated betweenness centrality as betweenness_centrality_error
         """
         g_ud = g.to_undirected()
         components = nx.connected_components(g_ud)
@@ -410,20 +582,29 @@ class Analyzer:
         graph_mc = g_ud.subgraph(max_component)
 
         # Betweenness centrality
-        bet_cen = nx.betweenness_centrality(graph_mc)
+        if k is not None:
+            bet_cen, bet_err = sampled_betweenness_centrality(graph_mc, k, seed=seed, workers=workers)
+        else:
+            bet_cen = betweenness_centrality(graph_mc, workers=workers)
         # Closeness centrality
-        clo_cen = nx.closeness_centrality(graph_mc)
+        clo_cen = closeness_centrality(graph_mc, workers=workers)
         # Eigenvector centrality
-        eig_cen = nx.eigenvector_centrality(graph_mc)
+        eig_cen = eigenvector_centrality(graph_mc, nstart=dict(warm_start['eigenvector_centrality'])
+                                         if warm_start is not None else None)
 
-        return dict(
+        centralities = dict(
             betweenness_centrality=self._sort_centrality(bet_cen),
             closeness_centrality=self._sort_centrality(clo_cen),
             eigenvector_centrality=self._sort_centrality(eig_cen),
         )
+        if k is not None:
+            centralities['betweenness_centrality_error'] = max(bet_err.values())
+        return centralities
 
     @staticmethod
-    def get_degree_increase(graphs: List[nx.Graph]):
+    def get_degree_increase(graphs: Union[List[nx.Graph], SparseTimeline]):
+        if isinstance(graphs, SparseTimeline):
+            return graphs.degree_increase()
         ptr = 0
         length = len(graphs)
         delta_degrees = []
@@ -445,7 +626,9 @@ class Analyzer:
         return delta_degrees
 
     @staticmethod
-    def detect_preferential_attachment(graphs: List[nx.Graph], average=False):
+    def detect_preferential_attachment(graphs: Union[List[nx.Graph], SparseTimeline], average=False):
+        if isinstance(graphs, SparseTimeline):
+            return graphs.preferential_attachment()
         ptr = 0
         length = len(graphs)
         delta_degrees = []
@@ -522,48 +705,72 @@ class Analyzer:
         return filename
 
     @staticmethod
-    def get_colab_properties(graphs: List[nx.Graph]):
+    def get_colab_properties(graphs: Union[List[nx.Graph], CollaborationStats], nodes=None, years: List[int] = None):
         """
         Given a list of graphs, return multiple collaboration related properties
-        :param graphs:
+        :param graphs: list of graphs, or the CollaborationStats of the graphs by every year
+        :param nodes: (optional) with CollaborationStats, nodes of the subgraphs; all nodes by default
+        :param years: (optional) with views of a TemporalGraph (or their subgraphs), the year of each graph, so that
+         only the papers till that year are counted
         :return: in sequence: number of partners, total number of collab papers, total number of published venues,
          most frequent venues (all graph-wise)
         """
+        if isinstance(graphs, CollaborationStats):
+            return graphs.properties(nodes)
         total_num_of_partners = [graph.number_of_edges() for graph in graphs]
         total_num_of_papers = []
-        for graph in graphs:
-            total_papers = set()
-            for _, _, a in graph.edges(data=True):
-                total_papers |= set(a["paper"].keys())
-            total_num_of_papers.append(len(total_papers))
         total_num_of_venues = []
         most_frequent_venues = []
-        for graph in graphs:
-            total_venues = dict()
+        for i, graph in enumerate(graphs):
+            till = years[i] if years is not None else None
+            total_venues = dict()  # every paper once, with its venue
             for _, _, attributes in graph.edges(data=True):
-                total_venues.update(attributes["paper"])
+                total_venues.update(window_papers(attributes, till=till))
 
+            total_num_of_papers.append(len(total_venues))
             total_num_of_venues.append(len(set(total_venues.values())))
             most_frequent_venues.append(sorted(list(Counter(total_venues.values()).items()), key=lambda x: x[1],
                                                reverse=True))
         return total_num_of_partners, total_num_of_papers, total_num_of_venues, most_frequent_venues
 
     @classmethod
-    def get_relative_colab_weight(cls, sub_graphs: List[nx.Graph], complete_graphs: List[nx.Graph]):
+    def get_relative_colab_weight(cls, sub_graphs: Union[List[nx.Graph], Set[str]],
+                                  complete_graphs: Union[List[nx.Graph], CollaborationStats], years: List[int] = None):
         """
         Given a list of sub-graphs and complete graphs, return the weight of sub-graphs
          in complete graphs on multiple collaboration related properties
-        :param complete_graphs:
-        :param sub_graphs:
+        :param complete_graphs: list of graphs, or their CollaborationStats, whose properties are computed once
+        :param sub_graphs: list of sub-graphs; with CollaborationStats, (induced) sub-graphs such as those of
+         filter_graphs, or their nodes
+        :param years: (optional) with lists of views of a TemporalGraph, see get_colab_properties
         :return: in sequence: relative number of partners, relative number of collab papers,
          relative number of published venues
         """
-        sub_graphs_colab_properties = cls.get_colab_properties(sub_graphs)
-        complete_graphs_colab_properties = cls.get_colab_properties(complete_graphs)
+        if isinstance(complete_graphs, CollaborationStats):
+            sub_graphs_colab_properties = complete_graphs.properties(cls._subgraph_nodes(sub_graphs))
+        else:
+            sub_graphs_colab_properties = cls.get_colab_properties(sub_graphs, years=years)
+        complete_graphs_colab_properties = cls.get_colab_properties(complete_graphs, years=years)
 
         return [[sub / total for sub, total in zip(sub_graphs_colab_properties[i],
                                                    complete_graphs_colab_properties[i])] for i in range(0, 3)]
 
+    @staticmethod
+    def _subgraph_nodes(sub_graphs) -> Set:
+        """
+        :param sub_graphs: a graph, graphs (e.g. the yearly sub-graphs, or those of filter_graphs) or nodes
+        :return: nodes of the graph(s), or the nodes themselves
+        """
+        if isinstance(sub_graphs, nx.Graph):
+            return set(sub_graphs.nodes)
+        if isinstance(sub_graphs, FilteredGraphs):
+            return set(sub_graphs.nodes)
+        items = list(sub_graphs)
+        graphs = [item for item in items if isinstance(item, nx.Graph)]
+        if graphs and len(graphs) != len(items):
+            raise TypeError('Sub-graphs are to be either all graphs or all nodes!')
+        return set().union(*(graph.nodes for graph in graphs)) if graphs else set(items)
+
     def get_correlation(self, a: Union[list, dict], b: Union[list, dict], method: str = 'pearson'):
         """
         get the correlation between two criteria (e.g. betweeness centrality v.s. node excellence)
@@ -611,52 +818,24 @@ class Analyzer:
         return ['{:.2f}%'.format((data[i] - data[i-1]) / data[i-1] * 100) if i >= 1 and data[i-1] != 0 else '-'
                 for i in range(0, len(data))]
 
-    def _get_all_external_collaborators(self) -> list:
+    def _get_all_external_collaborators(self) -> CollaboratorTable:
         """
         get the name list of all external collaborators of faculty members
-        :return: sorted list of Collaborators object based on the hard-coded algorithm
+        :return: Collaborators sorted based on the hard-coded algorithm, see CollaboratorTable
         """
-        faculty_pids = set({v['dblpperson']['@pid'] for v in self.auth_profiles.values()})
-
-        collaborator_list = dict()
-
-        for k, v in self.auth_profiles.items():
-            publications = v['dblpperson']['r']
-            if type(publications) is not list:
-                publications = [publications]
-
-            for pub in publications:
-                article = pub[next(iter(pub))]
-                authors = article['author'] if 'author' in article.keys() else article['editor']
-
-                if type(authors) is not list:
-                    continue
-
-                for co_auther in authors:
-                    co_pid = co_auther['@pid']
-                    if co_pid in faculty_pids:
-                        continue
-                    else:
-                        if co_pid not in collaborator_list:
-                            collaborator_list[co_pid] = Collaborator(co_pid, co_auther["#text"])
-
-                        collaborator_list[co_pid].partner.add(k)
-                        collaborator_list[co_pid].collab_paper.add(article["@key"])
-
-        avg_paper_per_partner = sum([len(c.collab_paper) / len(c.partner) for c in collaborator_list.values()]) \
-                                / len(collaborator_list)
-
-        for c in collaborator_list.values():
-            c.score = len(c.collab_paper) + avg_paper_per_partner * len(c.partner)
-
-        return sorted(collaborator_list.values(), key=lambda e: e.score, reverse=True)
+        faculty_pids = set({profile_pid(self.auth_profiles, k) for k in self.auth_profiles})
+        return CollaboratorTable.from_papers(paper_index(self.auth_profiles), faculty_pids)
 
-    def _get_external_collaborators_profile(self, top: int, reuse: bool, target_pickle_name: str) -> dict:
+    def _get_external_collaborators_profile(self, top: int, reuse: bool, target_pickle_name: str,
+                                            workers=8, rate_limit=10, dump_index=None) -> dict:
         """
         fetch the candidate collaborator profiles from dblp
         :param top: number of top candidates to be fetched
         :param reuse: reusing old ceche data
         :param target_pickle_name: target cache data name
+        :param workers: number of concurrent requests; None to fetch one by one
+        :param rate_limit: maximum requests per second sent to dblp
+        :param dump_index: (optional) path of the offline dblp dump index to read the profiles from
         :return: external collaborator profiles in dictionary format; the same as faculty profile
         """
         if top is not None:
@@ -669,25 +848,34 @@ class Analyzer:
         for c in candidate_collaborators:
             name_data.append([c.name, f"http://dblp.org/pid/{c.pid}.xml"])
         name_data = pd.DataFrame(name_data, columns=["Faculty", "DBLP"])
-        profile_data = fetch_dblp_profile(auth_name_data=name_data, reuse=reuse, target_pickle_name=target_pickle_name)
+        profile_data = fetch_dblp_profile(auth_name_data=name_data, reuse=reuse, target_pickle_name=target_pickle_name,
+                                          workers=workers, rate_limit=rate_limit, dump_index=dump_index,
+                                          store=self.use_store)
 
         return profile_data
 
-    def use_external_collaborators_profiles(self, top=2000, reuse=True, target_pickle_name="external_profiles"):
+    def use_external_collaborators_profiles(self, top=2000, reuse=True, target_pickle_name="external_profiles",
+                                            workers=8, rate_limit=10, dump_index=None):
         """
         load the external collaborators profiles; used when the adding new faculty member function is needed
         :param top: number of top candidates to be fetched
         :param reuse: reusing old ceche data
         :param target_pickle_name: target cache data name
+        :param workers: number of concurrent requests; None to fetch one by one
+        :param rate_limit: maximum requests per second sent to dblp
+        :param dump_index: (optional) path of the offline dblp dump index to read the profiles from
         :return: None; stored in the analyzer object
         """
         assert top >= 1000, "At least 1000 is required!"
 
-        if self.external_collaborators_profiles is None:
-            self.external_collaborators_profiles = self._get_external_collaborators_profile(top, reuse,
-                                                                                            target_pickle_name)
-        if self.external_collaborators_excellence is None:
-            self.external_collaborators_excellence = self._get_auth_excellence(external=True)
+        with self._lock:
+            if self.external_collaborators_profiles is None:
+                self.external_collaborators_profiles = self._get_external_collaborators_profile(top, reuse,
+                                                                                                target_pickle_name,
+                                                                                                workers, rate_limit,
+                                                                                                dump_index)
+            if self.external_collaborators_excellence is None:
+                self.external_collaborators_excellence = self._get_auth_excellence(external=True)
 
     def get_new_member_profile(self, based_on_excellece=True):
         """
@@ -704,6 +892,8 @@ class Analyzer:
         else:
             name_list = [c.name for c in self.external_collaborators[:1000]]
 
+        if isinstance(self.external_collaborators_profiles, StoreProfiles):
+            return name_list, self.external_collaborators_profiles.subset(name_list)
         return name_list, {n: self.external_collaborators_profiles[n] for n in name_list}
 
 
@@ -0,0 +1,209 @@
+import hashlib
+import os
+import os.path as osp
+import pickle
+import threading
+from typing import Union
+
+import networkx as nx
+import pandas as pd
+
+from data import DATA_PATH
+from dblp_parser import Profile
+from preprocessing import generate_graph, generate_temporal_graph, name_data_fingerprint, profiles_version
+from pub_store import StoreProfiles
+from temporal_graph import TemporalGraph
+
+GRAPH_FORMAT = 1  # to be increased whenever the graphs built from the same inputs change
+
+
+_fingerprint_cache = dict()  # id of the profiles -> (profiles, their version, digest)
+
+
+def profiles_fingerprint(profile_data) -> str:
+    """
+    :param profile_data: profiles in any format returned by fetch_dblp_profile, or None
+    :return: digest of the profiles; for a publication store, of its files (path, size and modification time) and
+     the names in the view, so that it is computed without reading the profiles. The digest of in-memory profiles is
+     kept, and computed again only once a profile is added, removed or replaced (see preprocessing.profiles_version);
+     call invalidate_fingerprint after modifying a profile in place
+    """
+    if profile_data is None:
+        return 'none'
+    if isinstance(profile_data, StoreProfiles):
+        path = profile_data.store.path
+        stats = [(f, os.stat(osp.join(path, f)).st_size, os.stat(osp.join(path, f)).st_mtime_ns)
+                 for f in sorted(os.listdir(path))]
+        return hashlib.sha1(repr((osp.abspath(path), stats, list(profile_data))).encode()).hexdigest()
+
+    version = profiles_version(profile_data)
+    cached = _fingerprint_cache.get(id(profile_data))
+    # the profiles are kept with the digest, so their ids are not reused while it is cached
+    if cached is not None and cached[0] is profile_data and cached[1] == version:
+        return cached[2]
+    digest = hashlib.sha1()
+    for name, profile in profile_data.items():
+        digest.update(repr((name, profile_content(profile))).encode())
+    if len(_fingerprint_cache) >= 4:
+        _fingerprint_cache.clear()
+    _fingerprint_cache[id(profile_data)] = (profile_data, version, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def invalidate_fingerprint(profile_data=None) -> None:
+    """
+    drop the kept digests, to be called after a profile is modified in place, as preprocessing.invalidate_paper_index
+    :param profile_data: (optional) profiles whose digest is dropped; all by default
+    """
+    if profile_data is None:
+        _fingerprint_cache.clear()
+    else:
+        _fingerprint_cache.pop(id(profile_data), None)
+
+
+def profile_content(profile):
+    """
+    :param profile: profile in any format returned by fetch_dblp_profile
+    :return: the profile, or the content of a compact profile, whose repr changes with the profile
+    """
+    if isinstance(profile, Profile):
+        return (profile.pid, profile.name, [(p.key, p.kind, p.year, p.booktitle, p.journal, p.role,
+                                             p.author_pids, p.author_names) for p in profile.publications])
+    return profile
+
+
+class GraphCache:
+    """
+    on-disk cache of built graphs, keyed by a digest of everything they are built from: the faculty name list, the
+    profiles, the external profiles and the year. A change of any of them gives a new key, so outdated graphs are
+    never read; they are evicted with the least recently used ones once the cache grows beyond its size cap.
+    Graphs are stored as pickles written atomically; the modification time of a file is its last use.
+    """
+
+    def __init__(self, path: str = osp.join(DATA_PATH, 'graph_cache'), max_bytes: int = 512 * 2 ** 20):
+        """
+        :param path: directory of the cache
+        :param max_bytes: size cap of the cache directory
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def key(kind: str, name_data: pd.DataFrame, profile_data, external_profile_data=None,
+            by_year: Union[int, None] = None) -> str:
+        """
+        :param kind: kind of the graph, e.g. 'graph' or 'temporal'
+        :return: key of the graph built from the inputs
+        """
+        digest = hashlib.sha1(repr((GRAPH_FORMAT, kind, by_year, name_data_fingerprint(name_data),
+                                    profiles_fingerprint(profile_data),
+                                    profiles_fingerprint(external_profile_data))).encode()).hexdigest()
+        return f'{kind}_{digest}'
+
+    def _file(self, key: str) -> str:
+        return osp.join(self.path, f'{key}.pickle')
+
+    def get(self, key: str) -> Union[nx.Graph, None]:
+        """
+        :return: the cached graph, or None if not cached
+        """
+        path = self._file(key)
+        try:
+            with open(path, 'rb') as f:
+                graph = pickle.load(f)
+            os.utime(path)
+            return graph
+        except FileNotFoundError:
+            return None
+        except (pickle.UnpicklingError, EOFError, ValueError, TypeError, AttributeError) as e:
+            print(f'Corrupted graph cache {path} dropped! {str(e)}')
+            self._remove(path)
+            return None
+
+    def put(self, key: str, graph: nx.Graph) -> None:
+        tmp_path = f'{self._file(key)}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(graph, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._file(key))
+        self._evict()
+
+    def _evict(self) -> None:
+        """
+        remove the least recently used graphs until the cache fits in its size cap
+        """
+        with self._lock:
+            entries = []
+            for f in os.listdir(self.path):
+                if f.endswith('.pickle'):
+                    try:
+                        stat = os.stat(osp.join(self.path, f))
+                    except FileNotFoundError:  # evicted by another process
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, f))
+            total = sum(size for _, size, _ in entries)
+            for _, size, f in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                self._remove(osp.join(self.path, f))
+                total -= size
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for f in os.listdir(self.path):
+            self._remove(osp.join(self.path, f))
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def default_cache() -> GraphCache:
+    """
+    :return: the cache under the data directory, shared by the whole process
+    """
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = GraphCache()
+    return _default_cache
+
+
+def cached_graph(name_data: pd.DataFrame, profile_data, by_year: int = None, external_profile_data=None,
+                 cache: GraphCache = None) -> nx.Graph:
+    """
+    generate_graph, read from the cache when it has been built from the same inputs before
+    :param cache: (optional) cache to be used; the default one under the data directory by default
+    :return: graph
+    """
+    cache = cache if cache is not None else default_cache()
+    key = cache.key('graph', name_data, profile_data, external_profile_data, by_year)
+    graph = cache.get(key)
+    if graph is None:
+        graph = generate_graph(name_data, profile_data, by_year=by_year, external_profile_data=external_profile_data)
+        cache.put(key, graph)
+    return graph
+
+
+def cached_temporal_graph(name_data: pd.DataFrame, profile_data, external_profile_data=None,
+                          cache: GraphCache = None) -> TemporalGraph:
+    """
+    generate_temporal_graph, read from the cache when it has been built from the same inputs before
+    :param cache: (optional) cache to be used; the default one under the data directory by default
+    :return: temporal graph
+    """
+    cache = cache if cache is not None else default_cache()
+    key = cache.key('temporal', name_data, profile_data, external_profile_data)
+    graph = cache.get(key)
+    if graph is None:
+        temporal = generate_temporal_graph(name_data, profile_data, external_profile_data=external_profile_data)
+        cache.put(key, temporal.graph)
+        return temporal
+    return TemporalGraph(graph)
@@ -5,8 +5,12 @@ from PyQt5.QtCore import *
 import pandas as pd
 from preprocessing import *
 from faculty import *
+from session import get_session
 import threading
 
+# most frequent venues come from CollaborationStats, where venues of the same count are ordered deterministically
+VENUE_ORDER_TIP = "most frequent first; venues as frequent by the year of their first paper, then by name"
+
 
 class Ui_MainWindow(object):
     def setupUi(self, MainWindow):
@@ -233,10 +237,10 @@ self.gridLayout.addLayout(self.horizontalLayout_{}, {}, 0, 1, 1)
         return ret
 
     def callApi(self,ret,p):
-        analyzer = Analyzer()
-        T, G = generate_graphs(name_data=analyzer.auth_name_data, profile_data=analyzer.auth_profiles)
-        subgraphs = analyzer.filter_graph_by_names(G, ret)
-        visualize_graphs(tags=T, graphs=subgraphs, port=p)
+        session = get_session()
+        T, G = session.yearly_graphs()
+        subgraphs = session.analyzer.filter_graph_by_names(G, ret)
+        visualize_graphs(tags=T, graphs=subgraphs, port=p, years=[int(tag) for tag in T])
 
     def getFacultyList(self):
         ret = []
@@ -284,11 +288,10 @@ class propertyDialog(object):
         self.label_2.setGeometry(QtCore.QRect(460, 90, 401, 461))
         self.label_2.setFrameShape(QtWidgets.QFrame.StyledPanel)
         self.label_2.setText("")
-        analyzer = Analyzer()
+        session = get_session()
+        analyzer = session.analyzer
         if i == 1:
-            G = generate_graph(name_data=analyzer.auth_name_data,
-                               profile_data=analyzer.auth_profiles,
-                               by_year=2020)
+            G = session.graph(by_year=2020)
             self.summary.setText(_translate("Form", "degree distribution histogram"))
             self.summary.setGeometry(QtCore.QRect(50, 50, 401, 31))
             self.graph.setText(_translate("Form", "degree distribution loglog"))
@@ -302,35 +305,38 @@ class propertyDialog(object):
                                                                                             normalized=False)))
 
         else:
-            Tag, Graphs = generate_graphs(name_data=analyzer.auth_name_data,
-                                          profile_data=analyzer.auth_profiles)
+            metrics = session.metrics()
+            Tag = metrics.timeline.tags
             if i==2:
+                avg_degrees = metrics.series('avg_degree')
                 text = ""
                 for i in range(2000, 2021):
                     t = "Average degree for year " + str(i) + ": "\
-                        + str("{:.7f}".format(analyzer.get_avg_degree(Graphs[i-2000]))) + "\n"
+                        + str("{:.7f}".format(avg_degrees[i-2000])) + "\n"
                     text += t
                 self.label.setText(text)
                 self.label_2.setPixmap(QtGui.QPixmap("pictures/"
-                                                     + analyzer.plot_avg_degree_hist(Graphs, Tag)))
+                                                     + analyzer.plot_avg_degree_hist(metrics, Tag)))
             elif i==3:
+                avg_clustering = metrics.series('avg_clustering')
                 text = ""
                 for i in range(2000, 2021):
                     t = "Clustering coefficient for year " + str(i) + ": " \
-                        + str("{:.7f}".format(analyzer.get_clustering_coeff(Graphs[i-2000]))) + "\n"
+                        + str("{:.7f}".format(avg_clustering[i-2000])) + "\n"
                     text += t
                 self.label.setText(text)
                 self.label_2.setPixmap(QtGui.QPixmap("pictures/"
-                                                     + analyzer.plot_avg_clust_coeff_hist(Graphs, Tag)))
+                                                     + analyzer.plot_avg_clust_coeff_hist(metrics, Tag)))
             elif i==4:
+                diameters = metrics.series('diameter')
                 text = ""
                 for i in range(2000, 2021):
                     t = "Diameter for year " + str(i) + ": " \
-                        + str(analyzer.get_largest_component_diameter(Graphs[i-2000])) + "\n"
+                        + str(diameters[i-2000]) + "\n"
                     text += t
                 self.label.setText(text)
                 self.label_2.setPixmap(QtGui.QPixmap("pictures/"
-                                                     + analyzer.plot_diameter_hist(Graphs, Tag)))
+                                                     + analyzer.plot_diameter_hist(metrics, Tag)))
             else:
                 self.label.setText(_translate("Form", "Nothing"))
                 self.label_2.setPixmap(QtGui.QPixmap("pictures/no_image_available.png"))
@@ -389,16 +395,13 @@ class analyzeDialog(object):
     def retranslateUi(self, Form, i):
         _translate = QtCore.QCoreApplication.translate
         Form.setWindowTitle(_translate("Form", "Form"))
-        self.analyzer = Analyzer()
-        self.T, self.G = \
-            generate_graphs(name_data=self.analyzer.auth_name_data, profile_data=self.analyzer.auth_profiles)
+        session = get_session()
+        self.analyzer = session.analyzer
+        self.T, self.G = session.yearly_graphs()
         if i==4:
             self.graphView = QtWidgets.QLabel(Form)
             excellence = self.analyzer.auth_excellence
-            G = generate_graph(name_data=self.analyzer.auth_name_data,
-                               profile_data=self.analyzer.auth_profiles,
-                               by_year=2021
-                               )
+            G = session.graph(by_year=2021)
             centralities = self.analyzer.analyze_centrality_of_main_component(G)
             text = ""
             c = ['betweenness_centrality', 'closeness_centrality','eigenvector_centrality']
@@ -454,6 +457,7 @@ class analyzeDialog(object):
                  "betweenness centrality",           "closeness_centrality",
                  "eigenvector_centrality",           "most frequent venues"]
             )
+            self.tableView.verticalHeaderItem(9).setToolTip(VENUE_ORDER_TIP)
             self.submitClicked = False
             selectYearText = ["Select one graph", "show graph 2000 ~ 2001"]
             for n in range(2001, 2020):
@@ -556,22 +560,27 @@ class analyzeDialog(object):
             self.subgraphs = self.analyzer.filter_graph_by_managerole(G, ret[0])
         else:
             self.subgraphs = self.analyzer.filter_graph_by_area(G, ret)
-        delta_k_data = self.analyzer.get_degree_increase(self.subgraphs)
+        delta_k_data = self.analyzer.get_degree_increase(get_session().timeline().subset(self.subgraphs.nodes))
         self.degree_inc_pic_names = []
         for j in range(0, len(delta_k_data)):
             if delta_k_data[j]:
                 self.degree_inc_pic_names.append(self.analyzer.visualize_degree_increase(delta_k_data[j]))
             else:
                 self.degree_inc_pic_names.append("no_image_available.jpg")
+        colab_stats = get_session().colab_stats()
         total_num_of_partners, total_num_of_papers, \
-        total_num_of_venues, most_frequent_venues \
-            = self.analyzer.get_colab_properties(graphs=self.subgraphs)
+        total_num_of_venues, _ \
+            = self.analyzer.get_colab_properties(graphs=colab_stats, nodes=self.subgraphs.nodes)
+        most_frequent_venues = get_session().venue_cube().most_frequent_venues(self.subgraphs.nodes,
+                                                                               [int(tag) for tag in T])
 
-        relative_weight = self.analyzer.get_relative_colab_weight(self.subgraphs, G)
+        relative_weight = self.analyzer.get_relative_colab_weight(self.subgraphs, colab_stats)
         centrality = []
+        previous = None
         for i in range(21):
             try:
-                centrality.append(self.analyzer.analyze_centrality_of_main_component(self.subgraphs[i]))
+                previous = self.analyzer.analyze_centrality_of_main_component(self.subgraphs[i], warm_start=previous)
+                centrality.append(previous)
                 no_comp.append(False)
             except ValueError:
                 no_comp.append(True)
@@ -587,7 +596,7 @@ class analyzeDialog(object):
                 self.tableView.setItem(7, n, QTableWidgetItem(str(centrality[1]["closeness_centrality"])))
                 self.tableView.setItem(8, n, QTableWidgetItem(str(centrality[2]["eigenvector_centrality"])))
             self.tableView.setItem(9, n, QTableWidgetItem(str(most_frequent_venues[n])))
-        visualize_graphs(tags=T, graphs=self.subgraphs, port=p)
+        visualize_graphs(tags=T, graphs=self.subgraphs, port=p, years=[int(tag) for tag in T])
 
     def updateGraph(self, i):
         if self.submitClicked and i != 0:
@@ -611,6 +620,7 @@ class facultyMemDialog(object):
         for o in range(5):
             self.property.addItem("")
             self.property.setItemText(o, properties[o])
+        self.property.setItemData(4, VENUE_ORDER_TIP, QtCore.Qt.ToolTipRole)
         self.layoutWidget = QtWidgets.QWidget(Form)
         self.layoutWidget.setGeometry(QtCore.QRect(130, 520, 571, 25))
         self.layoutWidget.setObjectName("layoutWidget")
@@ -642,20 +652,18 @@ class facultyMemDialog(object):
         self.tableView.setObjectName("tableView")
 
     def getGraph(self):
-        analyzer = Analyzer()
-        T, G = generate_graphs(name_data=analyzer.auth_name_data, profile_data=analyzer.auth_profiles)
-        return G, analyzer
+        session = get_session()
+        T, G = session.yearly_graphs()
+        return G, session.analyzer
 
     def updateGraph(self, i):
         if i == 0:
             return
-        G = self.graphs
         analyzer = self.analyzer
-        subgraphs = analyzer.filter_graph_by_names(G, self.facultyList)
-        total_num_of_partners, total_num_of_papers, \
-        total_num_of_venues, most_frequent_venues \
-            = analyzer.get_colab_properties(graphs=subgraphs)
         if i == 4:
+            T = get_session().yearly_graphs()[0]
+            most_frequent_venues = get_session().venue_cube().most_frequent_venues(self.facultyList,
+                                                                                   [int(tag) for tag in T])
             self.tableView.setColumnCount(21)
             self.tableView.setRowCount(50)
             self.tableView.setVerticalHeaderLabels([str(k) for k in range(50)])
@@ -666,6 +674,9 @@ class facultyMemDialog(object):
                         self.tableView.setItem(m, n, QTableWidgetItem(str(most_frequent_venues[n][m])))
 
         else:
+            total_num_of_partners, total_num_of_papers, \
+            total_num_of_venues, _ \
+                = analyzer.get_colab_properties(graphs=get_session().colab_stats(), nodes=self.facultyList)
             self.tableView.setColumnCount(3)
             self.tableView.setRowCount(21)
             self.tableView.setVerticalHeaderLabels([str(num) for num in range(2000, 2021)])
@@ -703,9 +714,7 @@ class newFacultyDialog(object):
         rowCount = 50
         self.new_faculty.setColumnCount(columnCount)
         self.new_faculty.setRowCount(rowCount)
-        analyzer = Analyzer()
-        analyzer.use_external_collaborators_profiles()
-        sorted_namelist, external_profiles = analyzer.get_new_member_profile(based_on_excellece=True)
+        sorted_namelist, external_profiles = get_session().new_member_profile()
         for row in range(rowCount):
             for column in range(columnCount):
                 self.new_faculty.setItem(row, column,
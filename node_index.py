@@ -0,0 +1,162 @@
+import threading
+from collections.abc import Sequence
+from typing import Dict, FrozenSet, Hashable, Iterable, List, Tuple, Union
+
+import networkx as nx
+
+
+class Query:
+    """
+    condition on the attributes of the nodes, e.g.
+     where('Area', {'AI/ML', 'Computer Vision'}) & where('Position', {'Professor'})
+    combined with & (and), | (or) and ~ (not). Queries are immutable and hashable, so that their results are kept
+    and a query asked for again is answered at once
+    """
+    __slots__ = ('_key',)
+
+    def __init__(self, key: tuple):
+        self._key = key
+
+    def __and__(self, other: 'Query') -> 'Query':
+        return Query(('and', self._key, other._key))
+
+    def __or__(self, other: 'Query') -> 'Query':
+        return Query(('or', self._key, other._key))
+
+    def __invert__(self) -> 'Query':
+        return Query(('not', self._key))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Query) and self._key == other._key
+
+    def __hash__(self) -> int:
+        return hash(self._key)
+
+    def __repr__(self) -> str:
+        return self._describe(self._key)
+
+    @classmethod
+    def _describe(cls, key: tuple) -> str:
+        if key[0] == 'in':
+            return f"{key[1]} in {set(key[2])}"
+        if key[0] == 'not':
+            return f"not ({cls._describe(key[1])})"
+        return f"({cls._describe(key[1])} {key[0]} {cls._describe(key[2])})"
+
+
+def where(attribute: str, values: Union[Hashable, Iterable[Hashable]]) -> Query:
+    """
+    :param attribute: name of the attribute, e.g. a column of Faculty.xlsx such as 'Position', 'Area' or 'Management'
+    :param values: value or values that the attribute may take
+    :return: query of the nodes with one of the values
+    """
+    if not isinstance(values, (set, frozenset, list, tuple)):
+        values = [values]
+    return Query(('in', attribute, frozenset(values)))
+
+
+class AttributeIndex:
+    """
+    inverted index of the node attributes: the nodes of every value of every attribute, built once so that a query
+    is answered by set operations instead of a scan of all nodes
+    """
+
+    def __init__(self, node_attributes: Iterable[Tuple[Hashable, dict]]):
+        """
+        :param node_attributes: pairs of node and attributes, e.g. graph.nodes(data=True); nodes without an
+         attribute, such as the external authors, never match a condition on it
+        """
+        postings = dict()
+        nodes = []
+        for node, attributes in node_attributes:
+            nodes.append(node)
+            for attribute, value in attributes.items():
+                try:
+                    postings.setdefault(attribute, dict()).setdefault(value, set()).add(node)
+                except TypeError:  # unhashable value
+                    continue
+        self.nodes = frozenset(nodes)
+        self._postings = {attribute: {value: frozenset(names) for value, names in values.items()}
+                          for attribute, values in postings.items()}
+        self._results = dict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_graph(cls, graph: nx.Graph) -> 'AttributeIndex':
+        return cls(graph.nodes(data=True))
+
+    @property
+    def attributes(self) -> List[str]:
+        return list(self._postings)
+
+    def values(self, attribute: str) -> List:
+        """
+        :return: the values that the attribute takes
+        """
+        return list(self._postings.get(attribute, dict()))
+
+    def select(self, query: Query) -> FrozenSet:
+        """
+        :return: nodes that satisfy the query
+        """
+        with self._lock:
+            if query not in self._results:
+                self._results[query] = self._evaluate(query._key)
+            return self._results[query]
+
+    def _evaluate(self, key: tuple) -> FrozenSet:
+        if key[0] == 'in':
+            postings = self._postings.get(key[1], dict())
+            return frozenset().union(*(postings.get(value, frozenset()) for value in key[2]))
+        if key[0] == 'not':
+            return self.nodes - self._evaluate(key[1])
+        if key[0] == 'and':
+            return self._evaluate(key[1]) & self._evaluate(key[2])
+        return self._evaluate(key[1]) | self._evaluate(key[2])
+
+
+class FilteredGraphs(Sequence):
+    """
+    subgraph views of a series of graphs on the same nodes, each view created on first access
+    """
+
+    def __init__(self, graphs: List[nx.Graph], nodes: FrozenSet):
+        self.graphs = graphs
+        self.nodes = nodes
+        self._views = [None] * len(graphs)
+
+    def __len__(self) -> int:
+        return len(self.graphs)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        view = self._views[i]
+        if view is None:
+            view = self._views[i] = nx.subgraph(self.graphs[i], self.nodes)
+        return view
+
+
+class IndexedGraphs:
+    """
+    series of graphs, e.g. the graph by every year, filtered by queries on the node attributes of the latest graph.
+    The filtered series are kept per query, so that filtering again by the same query is instant
+    """
+
+    def __init__(self, graphs: Union[nx.Graph, List[nx.Graph]]):
+        """
+        :param graphs: graph or graphs in sequence of years, the latest being the last
+        """
+        self.graphs = [graphs] if isinstance(graphs, nx.Graph) else list(graphs)
+        self.index = AttributeIndex.from_graph(self.graphs[-1])
+        self._filtered: Dict[Query, FilteredGraphs] = dict()
+        self._lock = threading.Lock()
+
+    def filter(self, query: Query) -> FilteredGraphs:
+        """
+        :return: subgraph views of the graphs on the nodes that satisfy the query
+        """
+        with self._lock:
+            if query not in self._filtered:
+                self._filtered[query] = FilteredGraphs(self.graphs, self.index.select(query))
+            return self._filtered[query]
@@ -1,9 +1,14 @@
 import datetime
+import hashlib
 import os.path as osp
 import pickle
 import re
 import socket
-from typing import Union, List, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, Union, List, Tuple
+from xml.etree.ElementTree import ParseError
+from xml.parsers.expat import ExpatError
 
 import dash
 import dash_core_components as dcc
@@ -16,6 +21,12 @@ import xmltodict
 from tqdm import tqdm
 
 from data import DATA_PATH
+from dblp_client import DBLPClient, ProfileResponse
+from dblp_dump import profiles_from_dump
+from dblp_parser import Profile, parse_profile
+from profile_store import ProfileCheckpoint, dump_pickle_atomically, load_pickle
+from pub_store import PublicationStore, StoreProfiles
+from temporal_graph import UNKNOWN_YEAR, TemporalGraph, window_papers
 
 
 def get_free_port():
@@ -72,14 +83,75 @@ def read_top_conferences(path=DATA_PATH, filename='Top.xlsx', sheet_name='Sheet1
                            required_fields={'Area', 'Venue', 'Comments'})
 
 
-def fetch_dblp_profile(auth_name_data, reuse=False, target_pickle_name=None) -> dict:
+_node_attributes_cache = OrderedDict()  # least recently used first
+_NODE_ATTRIBUTES_CACHE_SIZE = 4
+
+
+def name_data_fingerprint(name_data: pd.DataFrame) -> str:
+    """
+    :param name_data: a name list in the format of read_faculty
+    :return: digest of the content of the name list
+    """
+    return hashlib.sha1(pd.util.hash_pandas_object(name_data).values.tobytes() +
+                        str(list(name_data.columns)).encode()).hexdigest()
+
+
+def faculty_node_attributes(name_data: pd.DataFrame) -> Dict[str, dict]:
+    """
+    node attributes of the faculty members in a single pass over the name list; computed once per name list (by its
+    content) for the few name lists used last in the process and shared by all graph builds
+    :param name_data: a name list in the format of read_faculty
+    :return: dictionary with name as key and the other columns as attributes, in the order of the name list; a copy
+     of the cached one, which the caller may modify
+    """
+    fingerprint = name_data_fingerprint(name_data)
+    if fingerprint in _node_attributes_cache:
+        _node_attributes_cache.move_to_end(fingerprint)
+    else:
+        _node_attributes_cache[fingerprint] = \
+            name_data.drop_duplicates('Faculty').set_index('Faculty').to_dict('index')
+        if len(_node_attributes_cache) > _NODE_ATTRIBUTES_CACHE_SIZE:
+            _node_attributes_cache.popitem(last=False)
+    return {name: dict(attributes) for name, attributes in _node_attributes_cache[fingerprint].items()}
+
+
+def fetch_dblp_profile(auth_name_data, reuse=False, target_pickle_name=None, workers=None, rate_limit=None,
+                       max_retries=3, resume=False, refresh=False, compact=False, dump_index=None,
+                       store=False) -> dict:
     """
     Fetch dblp personal profiles given a name list
     :param auth_name_data: a name list containing urls with faculty information
     :param reuse: True if to read from pickle directly
     :param target_pickle_name: target pickle, used when reuse == True
-    :return: dictionary with name as key
+    :param workers: (optional) number of concurrent requests; None to fetch one by one
+    :param rate_limit: (optional) maximum requests per second per host, used when workers is set
+    :param max_retries: retries with exponential backoff on 429/5xx, used when workers is set
+    :param resume: True if to save every profile as soon as it is fetched and skip those saved by an interrupted run
+    :param refresh: True if to update the pickle with conditional requests, see refresh_dblp_profile
+    :param compact: True if to stream-parse the xml into compact dblp_parser.Profile records instead of xmltodict
+     trees; they keep only the fields used by the analysis but can be read in the same way
+    :param dump_index: (optional) path of an index built by dblp_dump.build_dump_index, to build the (compact)
+     profiles from the offline dblp dump instead of fetching them
+    :param store: True if to return the profiles from a memory-mapped pub_store.PublicationStore next to the pickle,
+     which is (re)built whenever the pickle is newer; opening an up-to-date store costs almost nothing
+    :return: dictionary with name as key (a read-only StoreProfiles mapping if store == True)
     """
+    if store:
+        pickle_name = target_pickle_name if target_pickle_name is not None else "profiles"
+        store_path = osp.join(DATA_PATH, f'{pickle_name}_store')
+        pickle_path = osp.join(DATA_PATH, f'{pickle_name}.pickle')
+        if reuse and not refresh and osp.isdir(store_path) and \
+                (not osp.exists(pickle_path) or osp.getmtime(pickle_path) <= osp.getmtime(store_path)):
+            return PublicationStore.open(store_path).profiles()
+        profile_data = fetch_dblp_profile(auth_name_data, reuse=reuse, target_pickle_name=target_pickle_name,
+                                          workers=workers, rate_limit=rate_limit, max_retries=max_retries,
+                                          resume=resume, refresh=refresh, compact=compact, dump_index=dump_index)
+        return PublicationStore.build(profile_data, store_path).profiles()
+
+    if refresh:
+        return refresh_dblp_profile(auth_name_data, target_pickle_name=target_pickle_name, workers=workers,
+                                    rate_limit=rate_limit, max_retries=max_retries, compact=compact)[0]
+
     if reuse:
         assert target_pickle_name is not None, 'Please specify a pickle to use'
         try:
@@ -92,57 +164,212 @@ def fetch_dblp_profile(auth_name_data, reuse=False, target_pickle_name=None) ->
     name_list = list(auth_name_data['Faculty'])
     assert len(set(name_list)) == len(name_list), 'Duplicated names found!'
 
-    profile_data = dict()
-    with tqdm(total=len(url_list)) as pbar:
-        for i, url in enumerate(url_list):
-            try:
-                true_url = requests.get(url).url  # sometimes .xml will be converted to .html after redirection
-                true_url = re.sub(r'(?<=\.)html$', 'xml', true_url)
-                profile_in_xml = requests.get(true_url).content
-                profile_data[name_list[i]] = xmltodict.parse(profile_in_xml, dict_constructor=dict)
-                pbar.update(1)
-            except Exception as e:
-                print(f'url {url} not fetched! {str(e)}')
-                continue
+    pickle_name = target_pickle_name if target_pickle_name is not None else "profiles"
+    if dump_index is not None:
+        profile_data = profiles_from_dump(url_list, name_list, index_path=dump_index)
+        dump_pickle_atomically(profile_data, osp.join(DATA_PATH, f'{pickle_name}.pickle'))
+        return profile_data
+
+    checkpoint = ProfileCheckpoint(osp.join(DATA_PATH, f'{pickle_name}.checkpoint')) if resume else None
+    fetched, fetched_meta = checkpoint.load() if resume else (dict(), dict())
+    if fetched:
+        print(f"Resuming from checkpoint: {len(fetched)} profile(s) fetched already")
+    pending_urls = [url for url in url_list if url not in fetched]
+
+    def on_fetched(url, response: ProfileResponse):
+        profile = _parse_profile(response.content, compact)
+        fetched[url] = profile
+        fetched_meta[url] = response.meta()
+        if checkpoint is not None:
+            checkpoint.append(url, profile, fetched_meta[url])
 
-    with open(osp.join(DATA_PATH, f'{target_pickle_name if target_pickle_name is not None else "profiles"}.pickle'),
-              'wb') as f:
-        pickle.dump(profile_data, f)
+    try:
+        if workers is not None:
+            _fetch_dblp_responses(pending_urls, on_fetched, workers=workers, rate_limit=rate_limit,
+                                  max_retries=max_retries)
+        else:
+            with tqdm(total=len(pending_urls)) as pbar:
+                for url in pending_urls:
+                    try:
+                        true_url = requests.get(url).url  # sometimes .xml will be converted to .html after redirection
+                        true_url = re.sub(r'(?<=\.)html$', 'xml', true_url)
+                        on_fetched(url, ProfileResponse.from_response(requests.get(true_url)))
+                        pbar.update(1)
+                    except Exception as e:
+                        print(f'url {url} not fetched! {str(e)}')
+                        continue
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+
+    profile_data = {name: fetched[url] for name, url in zip(name_list, url_list) if url in fetched}
+    _save_profiles(profile_data, fetched_meta, pickle_name)
+    if checkpoint is not None:
+        missing = len(set(url_list) - set(fetched))
+        if missing:
+            print(f"{missing} profile(s) not fetched, the pickle is incomplete! Checkpoint kept, run again with "
+                  f"resume=True to fetch them")
+        else:
+            checkpoint.remove()
 
     return profile_data
 
 
-def _append_co_auther_to_graph(authors: list, pid: str, pid_to_name: dict, faculty_member_name: str, graph, article) -> None:
+def refresh_dblp_profile(auth_name_data, target_pickle_name=None, workers=None, rate_limit=None,
+                         max_retries=3, compact=False) -> Tuple[dict, List[str]]:
     """
-    connect nodes or modify the weight of edges based on the co_author relationship
-    :param authors:
-    :param pid:
-    :param pid_to_name:
-    :param faculty_member_name:
-    :param graph:
+    Bring a profile pickle up to date. Profiles fetched before are requested directly at their xml url with the stored
+    ETag/Last-Modified, so an unchanged profile costs a single 304 response; a changed one is parsed only if the digest
+    of its content differs. Profiles that cannot be fetched keep their old version.
+    :param auth_name_data: a name list containing urls with faculty information
+    :param target_pickle_name: target pickle to be refreshed, "profiles" by default
+    :param workers: (optional) number of concurrent requests; None to fetch one by one
+    :param rate_limit: (optional) maximum requests per second per host
+    :param max_retries: retries with exponential backoff on 429/5xx
+    :param compact: True if changed profiles are to be parsed into compact records, see fetch_dblp_profile
+    :return: dictionary with name as key, and names whose profiles are new or changed
+    """
+    url_list = list(auth_name_data['DBLP'])
+    name_list = list(auth_name_data['Faculty'])
+    assert len(set(name_list)) == len(name_list), 'Duplicated names found!'
+
+    pickle_name = target_pickle_name if target_pickle_name is not None else "profiles"
+    old_profiles = load_pickle(osp.join(DATA_PATH, f'{pickle_name}.pickle'), default=dict())
+    old_meta = load_pickle(osp.join(DATA_PATH, f'{pickle_name}.meta.pickle'), default=dict())
+
+    fetched = {url: old_profiles[name] for name, url in zip(name_list, url_list) if name in old_profiles}
+    fetched_meta = {url: old_meta[url] for url in fetched if url in old_meta}
+    changed_urls = set()
+
+    def on_fetched(url, response: ProfileResponse):
+        previous = fetched_meta.get(url)
+        fetched_meta[url] = response.meta(previous)
+        if url in fetched and previous is not None and \
+                (response.not_modified or fetched_meta[url]['digest'] == previous['digest']):
+            return
+        fetched[url] = _parse_profile(response.content, compact)
+        changed_urls.add(url)
+
+    _fetch_dblp_responses(url_list, on_fetched, workers=workers if workers is not None else 1,
+                          rate_limit=rate_limit, max_retries=max_retries,
+                          validators=[fetched_meta.get(url) for url in url_list])
+
+    profile_data = {name: fetched[url] for name, url in zip(name_list, url_list) if url in fetched}
+    changed = [name for name, url in zip(name_list, url_list) if url in changed_urls]
+    _save_profiles(profile_data, fetched_meta, pickle_name)
+    print(f"{len(changed)} of {len(profile_data)} profile(s) changed: {changed}")
+
+    return profile_data, changed
+
+
+def _parse_profile(content: bytes, compact: bool):
+    if compact:
+        return parse_profile(content)
+    return xmltodict.parse(content, dict_constructor=dict)
+
+
+def _save_profiles(profile_data: dict, meta: dict, pickle_name: str) -> None:
+    dump_pickle_atomically(profile_data, osp.join(DATA_PATH, f'{pickle_name}.pickle'))
+    dump_pickle_atomically(meta, osp.join(DATA_PATH, f'{pickle_name}.meta.pickle'))
+
+
+def _fetch_dblp_responses(url_list: List[str], on_fetched, workers: int, rate_limit=None, max_retries=3,
+                          validators=None) -> None:
+    """
+    fetch the profiles with a pool of threads sharing keep-alive connections
+    :param url_list: dblp urls
+    :param on_fetched: callback receiving the url and the ProfileResponse, called from the calling thread
+    :param workers: number of concurrent requests
+    :param rate_limit: maximum requests per second per host
+    :param max_retries: retries with exponential backoff on 429/5xx
+    :param validators: (optional) stored meta for each url, to send conditional requests
     :return:
     """
-    if "booktitle" in article:
-        venue = article["booktitle"]
-    elif "journal" in article:
-        venue = article["journal"]
-    else:
-        venue = "Others"
+    with DBLPClient(workers=workers, rate_limit=rate_limit, max_retries=max_retries) as client, \
+            tqdm(total=len(url_list)) as pbar:
+        for i, result in client.fetch_all(url_list, validators):
+            if isinstance(result, Exception):
+                print(f'url {url_list[i]} not fetched! {str(result)}')
+                continue
+            try:
+                on_fetched(url_list[i], result)
+            except (ExpatError, ParseError, ValueError) as e:
+                print(f'url {url_list[i]} not parsed! {str(e)}')
+                continue
+            pbar.update(1)
 
-    for co_auther in authors:
-        co_pid = co_auther['@pid']
-        if co_pid == pid:  # excluding himself
-            continue
-        elif co_pid in pid_to_name.keys():
-            co_name = pid_to_name[co_pid]
 
-            # duplicated paper will be overwrited
-            if (faculty_member_name, co_name) in list(graph.edges):
-                graph[faculty_member_name][co_name]['paper'][article["@key"]] = venue
-            elif (co_name, faculty_member_name) in list(graph.edges):
-                graph[co_name][faculty_member_name]['paper'][article["@key"]] = venue
-            else:
-                graph.add_edge(faculty_member_name, co_name, paper={article["@key"]: venue})
+class CoAuthorEdges:
+    """
+    co-author edges accumulated in a dictionary keyed by the unordered pair of names, so that every paper costs one
+    lookup per co-author; the edges are added to the graph in bulk at the end, or, when the papers are added year by
+    year, only the changed edges are brought up to date in the graph after every year
+    """
+
+    def __init__(self, pid_to_name: dict, with_years: bool = False):
+        """
+        :param pid_to_name: pids of the nodes to be connected, with their names
+        :param with_years: True if the edges are to keep the year of each paper in a 'year' attribute
+        """
+        self.pid_to_name = pid_to_name
+        self.edges = dict()  # (name, name) sorted -> (name, co-author name) in order of appearance, papers
+        self.years = dict() if with_years else None  # (name, name) sorted -> paper key -> year
+        self.changed = dict()  # pairs changed since the last update, in order of change
+
+    def add_paper(self, paper: 'IndexedPaper', year: int = None) -> None:
+        """
+        connect every profile listing the paper with its co-authors, or add the paper to their existing edges; a pair
+        of co-authors listing it both is handled once
+        :param paper: paper from the PaperIndex
+        :param year: year of the paper, kept if with_years
+        :return:
+        """
+        co_authors = [(co_pid, self.pid_to_name.get(co_pid)) for co_pid in paper.author_pids]
+        pairs = set()
+        for name, pid in paper.owners:
+            for co_pid, co_name in co_authors:
+                if co_pid == pid or co_name is None:  # excluding himself
+                    continue
+                pair = (name, co_name) if name <= co_name else (co_name, name)
+                if pair in pairs:
+                    continue
+                pairs.add(pair)
+                edge = self.edges.get(pair)
+                if edge is None:
+                    self.edges[pair] = (name, co_name, {paper.key: paper.venue})
+                else:
+                    edge[2][paper.key] = paper.venue
+                if self.years is not None:
+                    self.years.setdefault(pair, dict())[paper.key] = year if year is not None else UNKNOWN_YEAR
+                self.changed[pair] = None
+
+    def _attributes(self, pair: tuple) -> dict:
+        papers = self.edges[pair][2]
+        attributes = dict(paper=dict(papers), weight=len(papers))
+        if self.years is not None:
+            attributes['year'] = dict(self.years[pair])
+        return attributes
+
+    def add_to(self, graph: nx.Graph) -> None:
+        """
+        add the edges with a copy of their papers, weighted by the number of papers
+        :param graph: graph with the nodes added already
+        :return:
+        """
+        graph.add_edges_from((u, v, self._attributes(pair)) for pair, (u, v, _) in self.edges.items())
+        self.changed.clear()
+
+    def update(self, graph: nx.Graph) -> None:
+        """
+        add or update the edges changed since the last update. Changed edges get new paper dictionaries instead of
+        modified ones, so shallow copies of the graph taken before (graph.copy()) keep their papers
+        :param graph: graph holding the edges as of the last update
+        :return:
+        """
+        for pair in self.changed:
+            u, v, _ = self.edges[pair]
+            graph.add_edge(u, v, **self._attributes(pair))
+        self.changed.clear()
 
 
 def _validate_article(article: dict, by_year: Union[int, None]) -> list:
@@ -160,6 +387,194 @@ def _validate_article(article: dict, by_year: Union[int, None]) -> list:
     return authors
 
 
+def _get_venue(article: dict) -> str:
+    if "booktitle" in article:
+        return article["booktitle"]
+    elif "journal" in article:
+        return article["journal"]
+    return "Others"
+
+
+def profile_pid(profile_data, name: str) -> str:
+    """
+    :param profile_data: profiles in any format returned by fetch_dblp_profile
+    :param name: name of the profile
+    :return: dblp pid of the person
+    """
+    if isinstance(profile_data, StoreProfiles):
+        return profile_data.pid(name)
+    profile = profile_data[name]
+    if isinstance(profile, Profile):
+        return profile.pid
+    return profile['dblpperson']['@pid']
+
+
+def coauthored_papers(profile_data, name: str, by_year: Union[int, None] = None) \
+        -> Iterator[Tuple[str, str, Union[int, None], List[str], List[str]]]:
+    """
+    papers in a profile with at least two authors (editors)
+    :param profile_data: profiles in any format returned by fetch_dblp_profile
+    :param name: name of the profile
+    :param by_year: (included) only papers till this year
+    :return: iterator of (paper key, venue, year, author pids, author names)
+    """
+    if isinstance(profile_data, StoreProfiles):
+        yield from profile_data.coauthored_papers(name, by_year)
+        return
+
+    profile = profile_data[name]
+    if isinstance(profile, Profile):
+        for pub in profile.publications:
+            if by_year is not None and pub.year is not None and pub.year > by_year:
+                continue
+            if len(pub.author_pids) >= 2:
+                yield pub.key, pub.venue, pub.year, list(pub.author_pids), list(pub.author_names)
+        return
+
+    publications = profile['dblpperson']['r']
+    if type(publications) is not list:
+        publications = [publications]
+    for pub in publications:
+        article = pub[next(iter(pub))]
+        authors = _validate_article(article=article, by_year=by_year)
+        if len(authors) >= 2:
+            yield article["@key"], _get_venue(article), int(article['year']) if 'year' in article else None, \
+                [a['@pid'] for a in authors], [a['#text'] for a in authors]
+
+
+class IndexedPaper:
+    """
+    a co-authored paper as first seen in the profiles, with the profiles listing it
+    """
+    __slots__ = ('key', 'venue', 'year', 'author_pids', 'author_names', 'owners')
+
+    def __init__(self, key: str, venue: str, year: Union[int, None], author_pids: list, author_names: list):
+        self.key = key
+        self.venue = venue
+        self.year = year
+        self.author_pids = author_pids
+        self.author_names = author_names
+        self.owners = []  # (name, pid) of the profiles listing the paper, in order
+
+
+class PaperIndex:
+    """
+    co-authored papers of a set of profiles keyed by dblp key, so that a paper listed by several profiles is read
+    once. Papers are kept in the order they are first seen, i.e. profile by profile.
+    """
+
+    def __init__(self, sources: dict):
+        """
+        :param sources: name of each profile, with the profiles (in any format returned by fetch_dblp_profile) to
+         read it from
+        """
+        self.papers = dict()  # type: Dict[str, IndexedPaper]
+        self.num_listings = 0  # papers read profile by profile, duplicates included
+        for name, source in tqdm(sources.items()):
+            pid = profile_pid(source, name)
+            for key, venue, year, author_pids, author_names in coauthored_papers(source, name):
+                paper = self.papers.get(key)
+                if paper is None:
+                    paper = self.papers[key] = IndexedPaper(key, venue, year, author_pids, author_names)
+                paper.owners.append((name, pid))
+                self.num_listings += 1
+        self._by_year = None
+
+    def __len__(self):
+        return len(self.papers)
+
+    def __iter__(self) -> Iterator[IndexedPaper]:
+        return iter(self.papers.values())
+
+    def till(self, by_year: Union[int, None] = None) -> Iterator[IndexedPaper]:
+        """
+        :param by_year: (included) only papers till this year; papers without year are always included
+        :return: iterator of the papers
+        """
+        for paper in self.papers.values():
+            if by_year is None or paper.year is None or paper.year <= by_year:
+                yield paper
+
+    def by_year(self) -> List[IndexedPaper]:
+        """
+        :return: papers sorted by year, in the order they are first seen within a year; papers without year first
+        """
+        if self._by_year is None:
+            self._by_year = sorted(self.papers.values(),
+                                   key=lambda p: p.year if p.year is not None else UNKNOWN_YEAR)
+        return self._by_year
+
+
+_paper_index_cache = dict()
+
+
+def profiles_version(profile_data) -> tuple:
+    """
+    :return: the names with their profiles, which tell a profile replaced in place at the cost of an identity check
+     per profile; only the names for a read-only StoreProfiles, whose profiles are made on access
+    """
+    if profile_data is None:
+        return ()
+    if isinstance(profile_data, StoreProfiles):
+        return tuple(profile_data)
+    return tuple(profile_data.items())
+
+
+def invalidate_paper_index(profile_data=None) -> None:
+    """
+    drop the cached paper indices, to be called after a profile is modified in place (replacing a profile in the
+    dictionary is noticed without it)
+    :param profile_data: (optional) faculty or external profiles whose indices are dropped; all by default
+    """
+    for key in list(_paper_index_cache):
+        if profile_data is None or id(profile_data) in key:
+            del _paper_index_cache[key]
+
+
+def paper_index(profile_data, external_profile_data=None) -> PaperIndex:
+    """
+    index of the co-authored papers of the faculty (and external) profiles, built once for the same profile data
+    :param profile_data: faculty profiles in any format returned by fetch_dblp_profile
+    :param external_profile_data: (optional)profiles of all other non-SCSE co-authors; an external profile overrides
+     the faculty one of the same name
+    :return: paper index
+    """
+    cache_key = (id(profile_data), id(external_profile_data))
+    version = (profiles_version(profile_data), profiles_version(external_profile_data))
+    cached = _paper_index_cache.get(cache_key)
+    # the profiles are kept with the index, so their ids are not reused while it is cached
+    if cached is not None and cached[0] is profile_data and cached[1] is external_profile_data and \
+            cached[2] == version:
+        return cached[3]
+
+    sources = {name: profile_data for name in profile_data}
+    if external_profile_data is not None:
+        sources.update({name: external_profile_data for name in external_profile_data})
+    index = PaperIndex(sources)
+    if len(_paper_index_cache) >= 4:
+        _paper_index_cache.clear()
+    _paper_index_cache[cache_key] = (profile_data, external_profile_data, version, index)
+    return index
+
+
+def _add_nodes(graph: nx.Graph, name_data: pd.DataFrame, profile_data: dict, external_profile_data=None) -> dict:
+    """
+    add the faculty members (and external authors) to the graph
+    :return: pid to name of the nodes
+    """
+    node_attributes = faculty_node_attributes(name_data)
+    graph.add_nodes_from(node_attributes.items())
+    pid_to_name = {profile_pid(profile_data, name): name for name in node_attributes}
+
+    if external_profile_data is not None:
+        for name in external_profile_data.keys():
+            properties = dict(External=True)
+            graph.add_node(name, **properties)
+            pid_to_name[profile_pid(external_profile_data, name)] = name
+
+    return pid_to_name
+
+
 def generate_graph(name_data: pd.DataFrame, profile_data: dict, by_year: int = None,
                    external_profile_data=None) -> nx.Graph:
     """
@@ -171,73 +586,122 @@ def generate_graph(name_data: pd.DataFrame, profile_data: dict, by_year: int = N
     :return: graph
     """
     graph = nx.Graph()
-
-    # add nodes
-    pid_to_name = dict()
-
-    for name in name_data.Faculty.unique():
-        properties = name_data.loc[name_data['Faculty'] == name].drop("Faculty", 1).squeeze().to_dict()
-        graph.add_node(name, **properties)
-        pid_to_name[profile_data[name]['dblpperson']['@pid']] = name
-
-    if external_profile_data is not None:
-        for name in external_profile_data.keys():
-            properties = dict(External=True)
-            graph.add_node(name, **properties)
-            pid_to_name[external_profile_data[name]['dblpperson']['@pid']] = name
-        profile_data = {**profile_data, **external_profile_data}
+    pid_to_name = _add_nodes(graph, name_data, profile_data, external_profile_data)
 
     print("Constructing Graph...")
 
-    with tqdm(total=len(profile_data.items())) as pbar:
-        for k, v in profile_data.items():
-            pid = v['dblpperson']['@pid']
-            publications = v['dblpperson']['r']
-            if type(publications) is not list:
-                article = publications[next(iter(publications))]
-                authors = _validate_article(article=article, by_year=by_year)
-                if len(authors) >= 2:
-                    _append_co_auther_to_graph(authors=authors, pid=pid, pid_to_name=pid_to_name, faculty_member_name=k,
-                                               graph=graph, article=article)
-            else:
-                for pub in publications:
-                    article = pub[next(iter(pub))]
-                    authors = _validate_article(article=article, by_year=by_year)
-                    if len(authors) >= 2:
-                        _append_co_auther_to_graph(authors=authors, pid=pid, pid_to_name=pid_to_name,
-                                                   faculty_member_name=k,
-                                                   graph=graph, article=article)
-            pbar.update(1)
-
-    # remove repeated counting (undirected)
-    for _, _, a in graph.edges(data=True):
-        a['weight'] = len(a['paper'])
+    edges = CoAuthorEdges(pid_to_name)
+    for paper in paper_index(profile_data, external_profile_data).till(by_year):
+        edges.add_paper(paper)
+    edges.add_to(graph)
 
     return graph
 
 
 def generate_graphs(name_data: pd.DataFrame, profile_data: dict, till_year: int = None,
-                    external_profile_data=None) -> Tuple[List[str], List[nx.Graph]]:
+                    external_profile_data=None, workers: int = None) -> Tuple[List[str], List[nx.Graph]]:
     """
     construct a list of graphs in sequence of years (e.g. [graph by 2000, graph by 2001 ..., graph by till_year])
     from the given faculty list and dblp data
+    The papers are read once from the paper index, sorted by year; every year only adds its own papers to the graph
+    of the year before, which is then copied. The copies share the paper dictionaries of unchanged edges.
     :param name_data:
     :param profile_data:
     :param till_year: (included) data till witch year that the graph should present. Default till the latest year.
     :param external_profile_data: (optional)profiles of all other non-SCSE co-authors
+    :param workers: (optional) number of processes to split the years among, each building a run of consecutive
+     years; the profiles (and external profiles) must be from a publication store, which the processes open
+     themselves instead of receiving the profiles. None to build in this process
     :return: list of graphs
     """
     if till_year is None:
         till_year = datetime.datetime.now().year
+    years = list(range(2000, till_year))
+    tags = [str(year) for year in years]
+
+    if years and workers is not None and workers > 1:
+        profile_view, external_view = _store_view(profile_data), _store_view(external_profile_data)
+        if profile_view is None or (external_profile_data is not None and external_view is None):
+            print("Profiles not from a publication store! Constructing the graphs in this process...")
+        else:
+            size = -(-len(years) // workers)
+            runs = [years[i:i + size] for i in range(0, len(years), size)]
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(_build_yearly_graphs_from_stores, name_data, profile_view, external_view,
+                                           run) for run in runs]
+                return tags, [graph for future in futures for graph in future.result()]
+
+    return tags, _build_yearly_graphs(name_data, profile_data, external_profile_data, years)
+
+
+def _build_yearly_graphs(name_data: pd.DataFrame, profile_data, external_profile_data, years: List[int]) \
+        -> List[nx.Graph]:
+    """
+    graphs by each of the consecutive years, see generate_graphs
+    """
+    graph = nx.Graph()
+    pid_to_name = _add_nodes(graph, name_data, profile_data, external_profile_data)
+
+    print("Constructing Graphs...")
+
+    papers = paper_index(profile_data, external_profile_data).by_year()
 
-    tags = []
     graphs = []
-    for year in range(2000, till_year):
-        tags.append(str(year))
-        graphs.append(generate_graph(name_data=name_data, profile_data=profile_data,
-                                     by_year=year, external_profile_data=external_profile_data))
+    edges = CoAuthorEdges(pid_to_name)
+    i = 0
+    for year in years:
+        while i < len(papers) and (papers[i].year is None or papers[i].year <= year):
+            edges.add_paper(papers[i])
+            i += 1
+        edges.update(graph)
+        graphs.append(graph.copy() if year < years[-1] else graph)
+
+    return graphs
+
+
+def _store_view(profile_data) -> Union[Tuple[str, List[str]], None]:
+    """
+    :return: path of the publication store and the names of the profiles, for another process to open the same
+     profiles; None if the profiles are not from a store
+    """
+    if not isinstance(profile_data, StoreProfiles):
+        return None
+    return profile_data.store.path, list(profile_data)
+
+
+def _build_yearly_graphs_from_stores(name_data: pd.DataFrame, profile_view: Tuple[str, List[str]],
+                                     external_view: Union[Tuple[str, List[str]], None], years: List[int]) \
+        -> List[nx.Graph]:
+    """
+    _build_yearly_graphs in a worker process, opening the (memory-mapped) stores of the profiles
+    """
+    profile_data = PublicationStore.open(profile_view[0]).profiles().subset(profile_view[1])
+    external_profile_data = PublicationStore.open(external_view[0]).profiles().subset(external_view[1]) \
+        if external_view is not None else None
+    return _build_yearly_graphs(name_data, profile_data, external_profile_data, years)
+
+
+def generate_temporal_graph(name_data: pd.DataFrame, profile_data: dict,
+                            external_profile_data=None) -> TemporalGraph:
+    """
+    construct the graph of all years once, from which the graph of any year or window of years is taken as a view,
+    e.g. generate_temporal_graph(...).snapshots() in place of generate_graphs(...)
+    :param name_data:
+    :param profile_data:
+    :param external_profile_data: (optional)profiles of all other non-SCSE co-authors
+    :return: temporal graph
+    """
+    graph = nx.Graph()
+    pid_to_name = _add_nodes(graph, name_data, profile_data, external_profile_data)
+
+    print("Constructing Graph...")
+
+    edges = CoAuthorEdges(pid_to_name, with_years=True)
+    for paper in paper_index(profile_data, external_profile_data):
+        edges.add_paper(paper, year=paper.year)
+    edges.add_to(graph)
 
-    return tags, graphs
+    return TemporalGraph(graph)
 
 
 def visualize_graph(graph: nx.Graph, port: int = 8080) -> None:
@@ -258,17 +722,19 @@ def visualize_graph(graph: nx.Graph, port: int = 8080) -> None:
     app.run_server(debug=False, port=port)
 
 
-def visualize_graphs(tags: List[str], graphs: List[nx.Graph], port: int = 8080) -> None:
+def visualize_graphs(tags: List[str], graphs: List[nx.Graph], port: int = 8080, years: List[int] = None) -> None:
     """
     Plot networkx graph with plotly. Modified from the internet
     :param tags: name of the tags
     :param graphs: graph to be plotted
     :param port: port number for the server to be run, default 8080
+    :param years: (optional) with views of a TemporalGraph (or their subgraphs), the year of each graph, so that only
+     the papers till that year are shown
     :return:
     """
     figs = []
-    for graph in graphs:
-        figs.append(_prepare_figure(graph))
+    for i, graph in enumerate(graphs):
+        figs.append(_prepare_figure(graph, years[i] if years is not None else None))
 
     app = dash.Dash(__name__)
 
@@ -282,16 +748,18 @@ def visualize_graphs(tags: List[str], graphs: List[nx.Graph], port: int = 8080)
     app.run_server(debug=False, port=port)
 
 
-def _prepare_figure(graph: nx.Graph) -> go.Figure:
+def _prepare_figure(graph: nx.Graph, till: int = None) -> go.Figure:
     """
     Prepare plotly figure using the given graph
     :param graph:
+    :param till: (optional) year till which the papers are shown, see window_papers
     :return:
     """
     pos = nx.spring_layout(graph)
     edge_x = []
     edge_y = []
-    etext = [f'{k[0]} - {k[1]}: {v} Related Paper(s)' for (k, v) in nx.get_edge_attributes(graph, 'weight').items()]
+    etext = [f'{u} - {v}: {len(window_papers(data, till=till))} Related Paper(s)'
+             for u, v, data in graph.edges(data=True)]
     xtext = []
     ytext = []
     for edge in graph.edges():
@@ -347,7 +815,7 @@ def _prepare_figure(graph: nx.Graph) -> go.Figure:
     for _, adjacencies in enumerate(graph.adjacency()):
         related_papers = set()
         for prop in adjacencies[1].values():
-            related_papers |= set(prop['paper'].keys())
+            related_papers |= set(window_papers(prop, till=till).keys())
         node_total_edge_weight.append(len(related_papers))
         node_property_display = ['%s: %s' % (k, v) for k, v in graph.nodes[adjacencies[0]].items()]
         properties = '<br />'.join(node_property_display)
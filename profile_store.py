@@ -0,0 +1,110 @@
+import os
+import pickle
+from typing import Any, Dict, Tuple
+
+
+class ProfileCheckpoint:
+    """
+    append-only log of fetched profiles, so that an interrupted ingestion can be resumed
+    each record is a pickled (url, profile, meta) tuple flushed to disk as soon as the profile is fetched; records of
+    older logs are (url, profile) tuples, without meta
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: path of the log file
+        """
+        self.path = path
+        self._file = None
+
+    def load(self) -> Tuple[Dict[str, Any], Dict[str, dict]]:
+        """
+        read all complete records; a record truncated by a crash is dropped
+        :return: dictionaries with url as key and profile / meta as value
+        """
+        done, done_meta = dict(), dict()
+        if not os.path.exists(self.path):
+            return done, done_meta
+
+        with open(self.path, 'rb') as f:
+            valid_until = 0
+            while True:
+                try:
+                    record = pickle.load(f)
+                    url, profile, meta = record if len(record) == 3 else (*record, None)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError):
+                    print(f'Corrupted record found in {self.path} at byte {valid_until}! Dropping the rest...')
+                    break
+                done[url] = profile
+                if meta is not None:
+                    done_meta[url] = meta
+                valid_until = f.tell()
+
+        if valid_until != os.path.getsize(self.path):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_until)
+        return done, done_meta
+
+    def append(self, url: str, profile: Any, meta: dict = None) -> None:
+        """
+        persist one fetched profile
+        :param url: url the profile is fetched from
+        :param profile: parsed profile
+        :param meta: validators of the profile for conditional requests
+        :return:
+        """
+        if self._file is None:
+            self._file = open(self.path, 'ab')
+        pickle.dump((url, profile, meta), self._file)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """
+        delete the log once the complete profile pickle is written
+        """
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_pickle(path: str, default: Any = None) -> Any:
+    """
+    read a pickle if it exists
+    :param path: path of the pickle
+    :param default: returned when the pickle does not exist
+    :return: the unpickled object
+    """
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        return default
+
+
+def dump_pickle_atomically(obj: Any, path: str) -> None:
+    """
+    write a pickle to a temporary file first, so that a crash never leaves a half-written pickle behind
+    :param obj: object to be pickled
+    :param path: target path
+    :return:
+    """
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
@@ -9,6 +9,7 @@ from interface import Ui_MainWindow, Ui_Dialog, checkbox_Dialog, \
     newFacultyDialog, propertyDialog, analyzeDialog, facultyMemDialog
 from faculty import Analyzer
 from preprocessing import *
+from session import get_session
 
 
 class MyDialog(QDialog):
@@ -123,11 +124,7 @@ class MyWindow(QMainWindow):
         QDesktopServices.openUrl(QUrl('http://127.0.0.1:' + str(port) + '/'))
 
     def newFacApi(self, p):
-        analyzer = Analyzer()
-        analyzer.use_external_collaborators_profiles()
-        sorted_namelist, external_profiles = analyzer.get_new_member_profile(based_on_excellece=True)
-        G_new = generate_graph(name_data=analyzer.auth_name_data, profile_data=analyzer.auth_profiles,
-                               external_profile_data=external_profiles)
+        G_new = get_session().new_member_graph()
         visualize_graph(graph=G_new, port=p)
 
     def facultyMemD(self):
@@ -157,8 +154,7 @@ class MyWindow(QMainWindow):
         self.cb.show()
 
     def update(self,year,p):
-        analyzer = Analyzer()
-        G = generate_graph(analyzer.auth_name_data, analyzer.auth_profiles, by_year=year)
+        G = get_session().graph(by_year=year)
         visualize_graph(graph=G,port=p)
 
     def updateGraph(self, i):
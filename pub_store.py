@@ -0,0 +1,325 @@
+import os
+import os.path as osp
+import shutil
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+from dblp_parser import Profile, Publication, as_profile
+
+ROLES = ['author', 'editor']
+
+
+class StringColumn:
+    """
+    list of strings stored as one utf-8 blob plus an offset array, so that it can be memory-mapped
+    """
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self._strings = None
+        self._index = None
+
+    @classmethod
+    def from_strings(cls, strings: Sequence[str]):
+        encoded = [s.encode() for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        if self._strings is not None:
+            return self._strings[i]
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode()
+
+    def tolist(self) -> List[str]:
+        """
+        decode all strings once; the list is kept for later accesses
+        """
+        if self._strings is None:
+            data = bytes(self.blob)
+            offsets = self.offsets.tolist()
+            self._strings = [data[offsets[i]:offsets[i + 1]].decode() for i in range(len(self))]
+        return self._strings
+
+    def index(self, s: str) -> int:
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.tolist())}
+        return self._index[s]
+
+    def save(self, path: str, name: str) -> None:
+        np.save(osp.join(path, f'{name}.blob.npy'), self.blob)
+        np.save(osp.join(path, f'{name}.offsets.npy'), self.offsets)
+
+    @classmethod
+    def load(cls, path: str, name: str, mmap_mode='r'):
+        return cls(_load_array(osp.join(path, f'{name}.blob.npy'), mmap_mode),
+                   _load_array(osp.join(path, f'{name}.offsets.npy'), mmap_mode))
+
+
+def _load_array(path: str, mmap_mode) -> np.ndarray:
+    try:
+        return np.load(path, mmap_mode=mmap_mode)
+    except ValueError:  # an empty array cannot be memory-mapped
+        return np.load(path)
+
+
+class _Vocabulary:
+    def __init__(self):
+        self.ids = dict()
+
+    def __call__(self, s: Union[str, None]) -> int:
+        if s is None:
+            return -1
+        if s not in self.ids:
+            self.ids[s] = len(self.ids)
+        return self.ids[s]
+
+    def column(self) -> StringColumn:
+        return StringColumn.from_strings(list(self.ids))
+
+
+class PublicationStore:
+    """
+    columnar on-disk store of dblp profiles. Every paper is stored once, however many profiles it appears in:
+     pub_*: year, kind, booktitle / journal (venue ids), role, and the author person ids as an offset array
+     profile_*: person of each profile and its paper ids as an offset array
+    strings (paper keys, venues, pids, names) are kept in StringColumns. All arrays are .npy files opened as
+    memory maps, so opening costs almost nothing and the pages are shared between processes by the OS.
+    """
+    _ARRAYS = ['pub_year', 'pub_kind', 'pub_booktitle', 'pub_journal', 'pub_role', 'pub_author_offsets',
+               'pub_authors', 'pub_author_names', 'profile_person', 'profile_person_name', 'profile_pub_offsets',
+               'profile_pubs']
+    _STRINGS = ['pub_key', 'kind', 'venue', 'person_pid', 'name', 'profile_name']
+
+    def __init__(self, path: str, arrays: Dict[str, np.ndarray], strings: Dict[str, StringColumn]):
+        self.path = path
+        for k, v in arrays.items():
+            setattr(self, k, v)
+        for k, v in strings.items():
+            setattr(self, k, v)
+
+    @classmethod
+    def build(cls, profile_data: dict, path: str):
+        """
+        write the profiles to a store; a paper appearing in several profiles is stored once (the first version seen)
+        :param profile_data: dictionary with name as key and profile (xmltodict or compact) as value
+        :param path: directory of the store, replaced if it exists
+        :return: the opened store
+        """
+        keys, kinds, venues, pids, names = _Vocabulary(), _Vocabulary(), _Vocabulary(), _Vocabulary(), _Vocabulary()
+        pub_year, pub_kind, pub_booktitle, pub_journal, pub_role = [], [], [], [], []
+        pub_author_offsets, pub_authors, pub_author_names = [0], [], []
+        profile_person, profile_person_name, profile_pub_offsets, profile_pubs = [], [], [0], []
+
+        for profile_name, v in profile_data.items():
+            profile = as_profile(v)
+            profile_person.append(pids(profile.pid))
+            profile_person_name.append(names(profile.name))
+            for pub in profile.publications:
+                pub_id = keys.ids.get(pub.key)
+                if pub_id is None:
+                    pub_id = keys(pub.key)
+                    pub_year.append(pub.year if pub.year is not None else -1)
+                    pub_kind.append(kinds(pub.kind))
+                    pub_booktitle.append(venues(pub.booktitle))
+                    pub_journal.append(venues(pub.journal))
+                    pub_role.append(ROLES.index(pub.role) if pub.role is not None else -1)
+                    pub_authors.extend(pids(pid) for pid in pub.author_pids)
+                    pub_author_names.extend(names(name) for name in pub.author_names)
+                    pub_author_offsets.append(len(pub_authors))
+                profile_pubs.append(pub_id)
+            profile_pub_offsets.append(len(profile_pubs))
+
+        arrays = dict(pub_year=np.array(pub_year, dtype=np.int16),
+                      pub_kind=np.array(pub_kind, dtype=np.int8),
+                      pub_booktitle=np.array(pub_booktitle, dtype=np.int32),
+                      pub_journal=np.array(pub_journal, dtype=np.int32),
+                      pub_role=np.array(pub_role, dtype=np.int8),
+                      pub_author_offsets=np.array(pub_author_offsets, dtype=np.int64),
+                      pub_authors=np.array(pub_authors, dtype=np.int32),
+                      pub_author_names=np.array(pub_author_names, dtype=np.int32),
+                      profile_person=np.array(profile_person, dtype=np.int32),
+                      profile_person_name=np.array(profile_person_name, dtype=np.int32),
+                      profile_pub_offsets=np.array(profile_pub_offsets, dtype=np.int64),
+                      profile_pubs=np.array(profile_pubs, dtype=np.int32))
+        strings = dict(pub_key=keys.column(), kind=kinds.column(), venue=venues.column(), person_pid=pids.column(),
+                       name=names.column(), profile_name=StringColumn.from_strings(list(profile_data)))
+
+        tmp_path = f'{path}.tmp'
+        if osp.exists(tmp_path):
+            shutil.rmtree(tmp_path)
+        os.makedirs(tmp_path)
+        for k, v in arrays.items():
+            np.save(osp.join(tmp_path, f'{k}.npy'), v)
+        for k, v in strings.items():
+            v.save(tmp_path, k)
+        if osp.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp_path, path)
+
+        return cls.open(path)
+
+    @classmethod
+    def open(cls, path: str, mmap_mode='r'):
+        """
+        :param path: directory of the store
+        :param mmap_mode: 'r' to memory-map the arrays; None to read them into memory
+        :return: the store
+        """
+        if not osp.isdir(path):
+            raise FileNotFoundError(f"the publication store {path} does not exist!")
+        arrays = {k: _load_array(osp.join(path, f'{k}.npy'), mmap_mode) for k in cls._ARRAYS}
+        strings = {k: StringColumn.load(path, k, mmap_mode) for k in cls._STRINGS}
+        return cls(path, arrays, strings)
+
+    @property
+    def num_profiles(self) -> int:
+        return len(self.profile_person)
+
+    @property
+    def num_publications(self) -> int:
+        return len(self.pub_year)
+
+    def profiles(self) -> 'StoreProfiles':
+        return StoreProfiles(self)
+
+    def pub_ids(self, i: int) -> np.ndarray:
+        """
+        :param i: index of the profile
+        :return: ids of the papers in the profile
+        """
+        return self.profile_pubs[self.profile_pub_offsets[i]:self.profile_pub_offsets[i + 1]]
+
+    def author_ids(self, pub_id: int) -> np.ndarray:
+        return self.pub_authors[self.pub_author_offsets[pub_id]:self.pub_author_offsets[pub_id + 1]]
+
+    def venue_of(self, pub_id: int) -> str:
+        """
+        venue as used on the graph edges
+        """
+        if self.pub_booktitle[pub_id] >= 0:
+            return self.venue[self.pub_booktitle[pub_id]]
+        elif self.pub_journal[pub_id] >= 0:
+            return self.venue[self.pub_journal[pub_id]]
+        return "Others"
+
+    def publication(self, pub_id: int) -> Publication:
+        return self.publications([pub_id])[0]
+
+    def publications(self, pub_ids: Sequence[int]) -> List[Publication]:
+        """
+        :param pub_ids: ids of the papers
+        :return: the papers, read from the arrays in bulk
+        """
+        pub_ids = np.asarray(pub_ids, dtype=np.int64)
+        offsets = np.asarray(self.pub_author_offsets)
+        authors, author_names = np.asarray(self.pub_authors), np.asarray(self.pub_author_names)
+        keys, kinds, venues = self.pub_key.tolist(), self.kind.tolist(), self.venue.tolist()
+        pids, names = self.person_pid.tolist(), self.name.tolist()
+        columns = zip(pub_ids.tolist(), np.asarray(self.pub_year)[pub_ids].tolist(),
+                      np.asarray(self.pub_kind)[pub_ids].tolist(), np.asarray(self.pub_booktitle)[pub_ids].tolist(),
+                      np.asarray(self.pub_journal)[pub_ids].tolist(), np.asarray(self.pub_role)[pub_ids].tolist(),
+                      offsets[pub_ids].tolist(), offsets[pub_ids + 1].tolist())
+        return [Publication(key=keys[pub_id], kind=kinds[kind],
+                            year=year if year >= 0 else None,
+                            booktitle=venues[booktitle] if booktitle >= 0 else None,
+                            journal=venues[journal] if journal >= 0 else None,
+                            role=ROLES[role] if role >= 0 else None,
+                            author_pids=tuple(pids[a] for a in authors[start:end].tolist()),
+                            author_names=tuple(names[a] for a in author_names[start:end].tolist()))
+                for pub_id, year, kind, booktitle, journal, role, start, end in columns]
+
+    def profile(self, i: int) -> Profile:
+        return Profile(pid=self.person_pid.tolist()[self.profile_person[i]],
+                       name=self.name.tolist()[self.profile_person_name[i]],
+                       publications=self.publications(self.pub_ids(i)))
+
+    def coauthored_papers(self, i: int, by_year: Union[int, None] = None) \
+            -> Iterator[Tuple[str, str, Union[int, None], List[str], List[str]]]:
+        """
+        papers of a profile with at least two authors (editors), like generate_graph reads them
+        :param i: index of the profile
+        :param by_year: (included) only papers till this year
+        :return: iterator of (paper key, venue, year, author pids, author names)
+        """
+        keys, venues, pids, names = self.pub_key.tolist(), self.venue.tolist(), self.person_pid.tolist(), \
+            self.name.tolist()
+        offsets = np.asarray(self.pub_author_offsets)
+        authors, author_names = np.asarray(self.pub_authors), np.asarray(self.pub_author_names)
+        pub_ids = np.asarray(self.pub_ids(i), dtype=np.int64)
+        columns = zip(pub_ids.tolist(), np.asarray(self.pub_year)[pub_ids].tolist(),
+                      np.asarray(self.pub_booktitle)[pub_ids].tolist(), np.asarray(self.pub_journal)[pub_ids].tolist(),
+                      offsets[pub_ids].tolist(), offsets[pub_ids + 1].tolist())
+        for pub_id, year, booktitle, journal, start, end in columns:
+            if by_year is not None and year > by_year:
+                continue
+            if end - start < 2:
+                continue
+            venue = venues[booktitle] if booktitle >= 0 else (venues[journal] if journal >= 0 else "Others")
+            yield keys[pub_id], venue, year if year >= 0 else None, \
+                [pids[a] for a in authors[start:end].tolist()], \
+                [names[a] for a in author_names[start:end].tolist()]
+
+    def count_publications(self, venue_mask: np.ndarray, min_year: int) -> np.ndarray:
+        """
+        count the papers of every profile published at a booktitle selected by the mask since the given year
+        :param venue_mask: boolean array over the venue ids
+        :param min_year: (included) earliest year
+        :return: number of matching papers of each profile
+        """
+        venue_mask = np.append(venue_mask, False)  # papers without booktitle (-1) pick the last, False
+        matched = venue_mask[self.pub_booktitle] & (np.asarray(self.pub_year) >= min_year)
+        cumulated = np.concatenate([[0], np.cumsum(matched[self.profile_pubs])])
+        return cumulated[self.profile_pub_offsets[1:]] - cumulated[self.profile_pub_offsets[:-1]]
+
+
+class StoreProfiles(Mapping):
+    """
+    read-only dictionary view of a PublicationStore with name as key, replacing the profile dictionary loaded from
+    the pickle; profiles are assembled on access. Functions aware of the store read its arrays directly instead.
+    """
+
+    def __init__(self, store: PublicationStore, names: List[str] = None):
+        """
+        :param store: the store
+        :param names: (optional) names of the profiles in the view, in order; all profiles of the store by default
+        """
+        self.store = store
+        index = {name: i for i, name in enumerate(store.profile_name.tolist())}
+        self._names = list(names) if names is not None else list(index)
+        self._index = index if names is None else {name: index[name] for name in self._names}
+
+    def __getitem__(self, name: str) -> Profile:
+        return self.store.profile(self._index[name])
+
+    def __iter__(self):
+        return iter(self._names)
+
+    def __len__(self):
+        return len(self._names)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def subset(self, names: List[str]) -> 'StoreProfiles':
+        """
+        :param names: names of the profiles to keep, in order
+        :return: view of the same store restricted to the names
+        """
+        return StoreProfiles(self.store, names)
+
+    def index(self, name: str) -> int:
+        return self._index[name]
+
+    def pid(self, name: str) -> str:
+        return self.store.person_pid[self.store.profile_person[self._index[name]]]
+
+    def coauthored_papers(self, name: str, by_year: Union[int, None] = None) \
+            -> Iterator[Tuple[str, str, Union[int, None], List[str], List[str]]]:
+        return self.store.coauthored_papers(self._index[name], by_year)
@@ -0,0 +1,142 @@
+import os.path as osp
+import threading
+from typing import List, Tuple, Union
+
+import networkx as nx
+
+from colab_stats import CollaborationStats
+from data import DATA_PATH
+from faculty import Analyzer
+from graph_cache import cached_graph, cached_temporal_graph
+from preprocessing import generate_graph, generate_temporal_graph
+from sparse_graph import SparseTimeline
+from temporal_graph import TemporalGraph
+from temporal_metrics import TemporalMetrics
+from venue_cube import VenueCube, cached_venue_cube
+
+
+class AnalysisSession:
+    """
+    analysis state shared by the whole GUI: the inputs are loaded by a single Analyzer, and the graphs and other
+    derived data are computed on first access and kept for the later ones. It is safe to use from several threads:
+    a value asked for by several threads at once is computed by one of them while the others wait, and the graphs
+    handed out are frozen, as they are shared.
+    """
+
+    def __init__(self, disk_cache: bool = False, **analyzer_kwargs):
+        """
+        :param disk_cache: True if to read and write the graphs in the cache under the data directory
+         (data/graph_cache, see graph_cache.GraphCache), and the venue cube in data/venue_cube.npz; False to build
+         them in memory only
+        :param analyzer_kwargs: arguments of the Analyzer, created on first access; use_store=True reads the profiles
+         from a publication store written under the data directory (data/profiles_store)
+        """
+        self._disk_cache = disk_cache
+        self._analyzer_kwargs = analyzer_kwargs
+        self._values = dict()
+        self._key_locks = dict()
+        self._lock = threading.Lock()
+
+    def _memoized(self, key, compute):
+        if key in self._values:
+            return self._values[key]
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:  # only those waiting for the same value are blocked
+            if key not in self._values:
+                self._values[key] = compute()
+        return self._values[key]
+
+    @property
+    def analyzer(self) -> Analyzer:
+        return self._memoized('analyzer', lambda: Analyzer(**self._analyzer_kwargs))
+
+    def graph(self, by_year: int = None) -> nx.Graph:
+        """
+        :param by_year: (included) data till which year that the graph should present
+        :return: faculty graph, see generate_graph
+        """
+        return self._memoized(('graph', by_year), lambda: nx.freeze(
+            self._build_graph(self.analyzer.auth_name_data, self.analyzer.auth_profiles, by_year=by_year)))
+
+    def temporal_graph(self) -> TemporalGraph:
+        build = cached_temporal_graph if self._disk_cache else generate_temporal_graph
+        return self._memoized('temporal_graph', lambda: build(self.analyzer.auth_name_data,
+                                                              self.analyzer.auth_profiles))
+
+    def _build_graph(self, *args, **kwargs) -> nx.Graph:
+        return cached_graph(*args, **kwargs) if self._disk_cache else generate_graph(*args, **kwargs)
+
+    def yearly_graphs(self) -> Tuple[List[str], List[nx.Graph]]:
+        """
+        :return: tags of the years and the faculty graph by each year, see TemporalGraph.snapshots
+        """
+        return self._memoized('yearly_graphs', lambda: self.temporal_graph().snapshots())
+
+    def timeline(self) -> SparseTimeline:
+        """
+        :return: the yearly graphs as a SparseTimeline
+        """
+        return self._memoized('timeline', lambda: SparseTimeline.from_temporal_graph(self.temporal_graph()))
+
+    def metrics(self) -> TemporalMetrics:
+        """
+        :return: metrics of the yearly graphs, kept once computed so that a dialog reopens instantly
+        """
+        return self._memoized('metrics', lambda: TemporalMetrics(self.timeline()))
+
+    def colab_stats(self) -> CollaborationStats:
+        """
+        :return: collaboration properties of the yearly graphs, for any group of nodes
+        """
+        return self._memoized('colab_stats', lambda: CollaborationStats(self.temporal_graph(),
+                                                                        [int(tag) for tag in self.yearly_graphs()[0]]))
+
+    def venue_cube(self) -> VenueCube:
+        """
+        :return: papers of the faculty members by year, area, member and venue, for the most frequent venues of any
+         group of them
+        """
+        def compute():
+            if self._disk_cache:
+                return cached_venue_cube(self.analyzer.auth_name_data, self.analyzer.auth_profiles,
+                                         osp.join(DATA_PATH, 'venue_cube.npz'))
+            return VenueCube.build(self.analyzer.auth_name_data, self.analyzer.auth_profiles)
+
+        return self._memoized('venue_cube', compute)
+
+    def new_member_profile(self) -> Tuple[List[str], Union[dict, object]]:
+        """
+        :return: names and profiles of the new faculty candidates, see Analyzer.get_new_member_profile
+        """
+        def compute():
+            self.analyzer.use_external_collaborators_profiles()
+            return self.analyzer.get_new_member_profile(based_on_excellece=True)
+
+        return self._memoized('new_member_profile', compute)
+
+    def new_member_graph(self) -> nx.Graph:
+        """
+        :return: faculty graph with the new faculty candidates
+        """
+        return self._memoized('new_member_graph', lambda: nx.freeze(
+            self._build_graph(self.analyzer.auth_name_data, self.analyzer.auth_profiles,
+                              external_profile_data=self.new_member_profile()[1])))
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session(use_store: bool = False, disk_cache: bool = False) -> AnalysisSession:
+    """
+    :param use_store: True if to read the profiles from a publication store, written to data/profiles_store
+    :param disk_cache: True if to keep the graphs built in data/graph_cache, and the venue cube, across runs
+    :return: the session of the process, created on first call (the arguments of the later calls are ignored); by
+     default nothing is written under the data directory besides what Analyzer writes itself
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = AnalysisSession(disk_cache=disk_cache, use_store=use_store)
+    return _session
@@ -0,0 +1,276 @@
+from typing import Dict, List, Tuple, Union
+
+import networkx as nx
+import numpy as np
+import scipy.sparse as sp
+
+from temporal_graph import TemporalGraph, UNKNOWN_YEAR
+
+
+class SparseTimeline:
+    """
+    yearly graphs as scipy.sparse CSR adjacency matrices over one fixed node index, so that the whole-timeline metrics
+    are computed with matrix operations for all years at once. The matrices keep the structure of the graphs only
+    (which nodes are connected, not the papers); to_graph converts a year back to a networkx graph.
+    """
+
+    def __init__(self, nodes: list, node_attributes: List[dict], matrices: List[sp.csr_matrix],
+                 present: np.ndarray, tags: List[str] = None, edges: np.ndarray = None,
+                 edge_first_years: np.ndarray = None):
+        """
+        :param nodes: node of every index
+        :param node_attributes: attributes of every node
+        :param matrices: symmetric 0/1 adjacency matrix of every year
+        :param present: boolean array (years x nodes), whether the node is in the graph of the year
+        :param tags: name of every year
+        :param edges: (optional) all edges (edges x 2) of graphs that only gain edges over the years, e.g. snapshots
+        :param edge_first_years: (optional) index of the first year of every edge, len(matrices) if none
+        """
+        self.nodes = nodes
+        self.index = {node: i for i, node in enumerate(nodes)}
+        self.node_attributes = node_attributes
+        self.matrices = matrices
+        self.present = present
+        self.tags = tags if tags is not None else [str(i) for i in range(len(matrices))]
+        self.edges = edges
+        self.edge_first_years = edge_first_years
+        self._degrees = None
+
+    @classmethod
+    def from_graphs(cls, graphs: List[nx.Graph], tags: List[str] = None):
+        """
+        :param graphs: graphs in sequence of years, e.g. from generate_graphs
+        :param tags: year of each graph
+        :return: timeline of the graphs
+        """
+        index = dict()
+        node_attributes = []
+        for graph in graphs:
+            for node, attributes in graph.nodes(data=True):
+                if node not in index:
+                    index[node] = len(index)
+                    node_attributes.append(dict(attributes))
+
+        matrices, present = [], np.zeros((len(graphs), len(index)), dtype=bool)
+        for t, graph in enumerate(graphs):
+            present[t, [index[node] for node in graph]] = True
+            edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+            matrices.append(cls._adjacency(edges, len(index)))
+        return cls(list(index), node_attributes, matrices, present, tags)
+
+    @classmethod
+    def from_temporal_graph(cls, temporal: TemporalGraph, since: int = 2000, till_year: int = None):
+        """
+        the snapshots of a temporal graph, read from its edges directly
+        :param temporal: temporal graph, e.g. from generate_temporal_graph
+        :param since: first year
+        :param till_year: (excluded) last year, as in TemporalGraph.snapshots
+        :return: timeline of the snapshots
+        """
+        tags = temporal.snapshots(since, till_year)[0]
+        nodes = list(temporal.graph.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        edges, first_years = [], []
+        for u, v, data in temporal.graph.edges(data=True):
+            edges.append((index[u], index[v]))
+            first_years.append(min(data['year'].values()))
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        first_years = np.array(first_years, dtype=np.int64)
+        first_years[first_years == UNKNOWN_YEAR] = np.iinfo(np.int64).min  # in every snapshot
+
+        matrices = [cls._adjacency(edges[first_years <= int(tag)], len(nodes)) for tag in tags]
+        present = np.ones((len(tags), len(nodes)), dtype=bool)
+        return cls(nodes, [dict(a) for _, a in temporal.graph.nodes(data=True)], matrices, present, tags, edges,
+                   np.searchsorted([int(tag) for tag in tags], first_years, side='left'))
+
+    @staticmethod
+    def _adjacency(edges: np.ndarray, n: int) -> sp.csr_matrix:
+        rows = np.concatenate([edges[:, 0], edges[:, 1]])
+        cols = np.concatenate([edges[:, 1], edges[:, 0]])
+        matrix = sp.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=(n, n))
+        matrix.data[:] = 1  # a self-loop is added twice above
+        return matrix
+
+    def __len__(self):
+        return len(self.matrices)
+
+    def to_graph(self, t: int) -> nx.Graph:
+        """
+        :param t: index of the year
+        :return: networkx graph of the year, with the node attributes and without edge attributes
+        """
+        graph = nx.Graph()
+        graph.add_nodes_from((self.nodes[i], self.node_attributes[i]) for i in np.flatnonzero(self.present[t]))
+        rows, cols = sp.triu(self.matrices[t]).nonzero()
+        graph.add_edges_from((self.nodes[i], self.nodes[j]) for i, j in zip(rows.tolist(), cols.tolist()))
+        return graph
+
+    def to_graphs(self) -> List[nx.Graph]:
+        return [self.to_graph(t) for t in range(len(self))]
+
+    def subset(self, nodes) -> 'SparseTimeline':
+        """
+        :param nodes: nodes to be kept, those not in the timeline being ignored
+        :return: timeline of the subgraphs on the nodes, as Analyzer.filter_graph_by_names of the graphs, the nodes
+         staying in the order of the timeline
+        """
+        kept = np.zeros(len(self.nodes), dtype=bool)
+        kept[[self.index[node] for node in nodes if node in self.index]] = True
+        indices = np.flatnonzero(kept)
+        edges, edge_first_years = None, None
+        if self.edges is not None:  # the matrices are built from the edges within, much faster than sliced
+            within = kept[self.edges[:, 0]] & kept[self.edges[:, 1]]
+            edges, edge_first_years = (np.cumsum(kept) - 1)[self.edges[within]], self.edge_first_years[within]
+            matrices = [self._adjacency(edges[edge_first_years <= t], len(indices)) for t in range(len(self))]
+        else:
+            matrices = [sp.csr_matrix(matrix[indices][:, indices]) for matrix in self.matrices]
+        return SparseTimeline([self.nodes[i] for i in indices.tolist()],
+                              [self.node_attributes[i] for i in indices.tolist()], matrices,
+                              self.present[:, indices], self.tags, edges, edge_first_years)
+
+    def _stacked(self, loops: bool = True) -> sp.csr_matrix:
+        """
+        all years as one block-diagonal matrix
+        """
+        stacked = sp.block_diag(self.matrices, format='csr')
+        if not loops:
+            stacked = stacked - sp.diags(stacked.diagonal(), format='csr')
+            stacked.eliminate_zeros()
+        return stacked
+
+    def degrees(self) -> np.ndarray:
+        """
+        :return: degree of every node in every year (years x nodes), counting a self-loop twice like networkx
+        """
+        if self._degrees is None:
+            n = len(self.nodes)
+            if self.edge_first_years is not None:  # every edge adds to the degrees from its first year on
+                years = np.repeat(self.edge_first_years, 2)
+                counted = years < len(self)
+                added = np.bincount(years[counted] * n + self.edges.reshape(-1)[counted], minlength=len(self) * n)
+                self._degrees = np.cumsum(added.reshape(len(self), n), axis=0)
+            else:
+                stacked = self._stacked()
+                degrees = stacked.getnnz(axis=1) + (stacked.diagonal() != 0)
+                self._degrees = degrees.reshape(len(self), n)
+        return self._degrees
+
+    def first_years(self) -> np.ndarray:
+        """
+        :return: index of the first year in which every node has a collaborator, len(self) if none
+        """
+        connected = self.degrees() > 0
+        return np.where(connected.any(axis=0), connected.argmax(axis=0), len(self))
+
+    def avg_degrees(self) -> np.ndarray:
+        """
+        :return: average degree of every year, see Analyzer.get_avg_degree
+        """
+        return (self.degrees() * self.present).sum(axis=1) / self.present.sum(axis=1)
+
+    def clustering(self) -> np.ndarray:
+        """
+        :return: clustering coefficient of every node in every year (years x nodes), ignoring self-loops as networkx
+        """
+        stacked = self._stacked(loops=False)
+        triangles = np.asarray((stacked @ stacked).multiply(stacked).sum(axis=1)).ravel()
+        degrees = stacked.getnnz(axis=1)
+        pairs = degrees * (degrees - 1)
+        coefficients = np.divide(triangles, pairs, out=np.zeros(len(degrees)), where=pairs > 0)
+        return coefficients.reshape(len(self), len(self.nodes))
+
+    def avg_clustering(self) -> np.ndarray:
+        """
+        :return: average clustering coefficient of every year, see Analyzer.get_clustering_coeff
+        """
+        return (self.clustering() * self.present).sum(axis=1) / self.present.sum(axis=1)
+
+    def degree_increase(self) -> List[Dict[int, List[int]]]:
+        """
+        the degree increase of the nodes of every year, grouped by their degree, for all years at once
+        :return: the same as Analyzer.get_degree_increase on the graphs
+        """
+        if len(self) < 2:
+            return []
+        degrees = self.degrees()
+        years, nodes = np.nonzero(self.present[:-1])  # by year, then in node order
+        current = degrees[years, nodes]
+        delta = degrees[years + 1, nodes] - current
+        order = np.lexsort((current, years))  # stable: nodes in their order within every year and degree
+        years, nodes, current, delta = years[order], nodes[order], current[order], delta[order]
+        boundaries = np.ones(len(years), dtype=bool)
+        boundaries[1:] = (years[1:] != years[:-1]) | (current[1:] != current[:-1])
+        starts = np.flatnonzero(boundaries)
+        groups = np.split(delta, starts[1:])
+        delta_degrees = [dict() for _ in range(len(self) - 1)]
+        # degrees in order of appearance, i.e. of the first node of every group
+        for g in np.lexsort((nodes[starts], years[starts])).tolist():
+            delta_degrees[years[starts[g]]][int(current[starts[g]])] = groups[g].tolist()
+        return delta_degrees
+
+    def preferential_attachment(self) -> List[Dict[int, int]]:
+        """
+        the number of newcomers attached to the nodes of every year, grouped by their degree, for all years at once
+        :return: the same as Analyzer.detect_preferential_attachment on the graphs
+        """
+        if len(self) < 2:
+            return []
+        degrees = self.degrees()
+        n = len(self.nodes)
+        newcomers = self.present[:-1] & (degrees[:-1] == 0) & (degrees[1:] != 0)
+        if self.edge_first_years is not None:  # all edges of a newcomer are new the year after
+            new = (self.edge_first_years >= 1) & (self.edge_first_years < len(self))
+            edges, years = self.edges[new], self.edge_first_years[new] - 1
+            from_u = newcomers[years, edges[:, 0]]
+            from_v = newcomers[years, edges[:, 1]] & (edges[:, 0] != edges[:, 1])  # a self-loop is attached once
+            years, attached = np.concatenate([years[from_u], years[from_v]]), \
+                np.concatenate([edges[from_u, 1], edges[from_v, 0]])
+        else:
+            years, nodes = np.nonzero(newcomers)
+            neighbours = self._stacked()[(years + 1) * n + nodes]  # neighbours of the newcomers the year after
+            years, attached = np.repeat(years, np.diff(neighbours.indptr)), neighbours.indices % n
+        attached_degrees = degrees[years, attached]
+        width = int(attached_degrees.max()) + 1 if len(attached_degrees) else 1
+        counts = np.bincount(years * width + attached_degrees, minlength=(len(self) - 1) * width)
+        return [{int(d): int(row[d]) for d in np.flatnonzero(row)} for row in counts.reshape(len(self) - 1, width)]
+
+
+def as_timeline(graphs: Union[SparseTimeline, List[nx.Graph]]) -> SparseTimeline:
+    return graphs if isinstance(graphs, SparseTimeline) else SparseTimeline.from_graphs(graphs)
+
+
+def adjacency(graph: nx.Graph) -> Tuple[list, sp.csr_matrix]:
+    """
+    :return: nodes of the graph, and its symmetric 0/1 adjacency matrix in the same order
+    """
+    nodes = list(graph.nodes)
+    index = {node: i for i, node in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in graph.edges()], dtype=np.int64).reshape(-1, 2)
+    return nodes, SparseTimeline._adjacency(edges, len(nodes))
+
+
+def bfs_distances(matrix: sp.csr_matrix, sources: np.ndarray) -> np.ndarray:
+    """
+    breadth-first searches from all sources at once, a level at a time: the next level of every search is the
+    product of the adjacency matrix and the current levels. Much faster than scipy.sparse.csgraph.shortest_path,
+    which runs Dijkstra's algorithm from one source after the other, on graphs of small diameter
+    :param matrix: symmetric adjacency matrix
+    :param sources: nodes to search from
+    :return: distances (sources x nodes) from every source, inf for the nodes not reached
+    """
+    n, k = matrix.shape[0], len(sources)
+    matrix = matrix.astype(np.float32)
+    frontier = np.zeros((n, k), dtype=np.float32)
+    frontier[sources, np.arange(k)] = 1
+    visited = frontier > 0
+    distances = np.full((n, k), np.inf)
+    distances[visited] = 0
+    level = 0
+    while True:
+        level += 1
+        reached = (matrix @ frontier > 0) & ~visited
+        if not reached.any():
+            return distances.T
+        visited |= reached
+        distances[reached] = level
+        frontier = reached.astype(np.float32)
@@ -0,0 +1,90 @@
+import datetime
+from bisect import bisect_left
+from typing import List, Tuple, Union
+
+import networkx as nx
+
+UNKNOWN_YEAR = -1  # year of papers without one; they are counted in every window without a lower bound
+
+
+class _Window:
+    def __init__(self, since: Union[int, None], till: Union[int, None], edge_years: dict):
+        self.since = since if since is not None else float('-inf')
+        self.till = till if till is not None else float('inf')
+        self.edge_years = edge_years
+
+    def contains(self, u, v) -> bool:
+        """
+        whether the edge has a paper in the window
+        """
+        years = self.edge_years[u][v]
+        if years[0] >= self.since:  # always so for the snapshots, without a lower bound
+            return years[0] <= self.till
+        i = bisect_left(years, self.since)
+        return i < len(years) and years[i] <= self.till
+
+
+def window_papers(data: dict, since: int = None, till: int = None) -> dict:
+    """
+    :param data: attributes of an edge of a TemporalGraph or of its views
+    :param since: (included) first year of the window; None for no lower bound
+    :param till: (included) last year of the window; None for no upper bound
+    :return: papers of the edge (key -> venue) published in the window, the 'paper' attribute generate_graph would
+     give; all the papers for an edge without years, e.g. of a graph from generate_graph
+    """
+    if 'year' not in data or (since is None and till is None):
+        return data['paper']
+    since = since if since is not None else float('-inf')
+    till = till if till is not None else float('inf')
+    return {key: venue for key, venue in data['paper'].items() if since <= data['year'][key] <= till}
+
+
+class TemporalGraph:
+    """
+    collaboration graph of all years in which every edge keeps the year of each paper. The graph of a year, or of any
+    window of years, is a read-only view on it created on demand (nx.subgraph_view): it has all the nodes and the
+    edges with at least one paper in the window, so memory grows with the number of papers, however many views are
+    taken. The edges of a view share the attributes of the whole graph, i.e. the papers of all years; window_papers
+    gives those of the window. The graph is not to be modified once the views are taken.
+    """
+
+    def __init__(self, graph: nx.Graph):
+        """
+        :param graph: undirected graph of all years whose edges also have a 'year' attribute (paper key -> year), see
+         preprocessing.generate_temporal_graph
+        """
+        assert not graph.is_directed() and not graph.is_multigraph(), 'Only a simple undirected graph is supported!'
+        self.graph = graph
+        self._edge_years = {node: dict() for node in graph}  # years of the papers of every edge, by both its ends
+        for u, v, data in graph.edges(data=True):
+            self._edge_years[u][v] = self._edge_years[v][u] = sorted(set(data['year'].values()))
+        self.years = sorted({y for nbr_years in self._edge_years.values() for years in nbr_years.values()
+                             for y in years} - {UNKNOWN_YEAR})
+
+    def window(self, since: int = None, till: int = None) -> nx.Graph:
+        """
+        :param since: (included) first year of the window; None for no lower bound
+        :param till: (included) last year of the window; None for no upper bound
+        :return: read-only view of the graph of the papers published in the window
+        """
+        return nx.subgraph_view(self.graph, filter_edge=_Window(since, till, self._edge_years).contains)
+
+    def snapshot(self, by_year: int) -> nx.Graph:
+        """
+        :param by_year: (included) data till which year that the graph should present
+        :return: read-only view with the nodes and edges of generate_graph(..., by_year=by_year)
+        """
+        return self.window(till=by_year)
+
+    def snapshots(self, since: int = 2000, till_year: int = None) -> Tuple[List[str], List[nx.Graph]]:
+        """
+        in place of generate_graphs: views of the graph by every year from since to till_year (excluded), whose papers
+         are given by window_papers(data, till=int(tag))
+        :param since: first year
+        :param till_year: (excluded) last year; the current year by default
+        :return: tags of the years, and the views
+        """
+        if till_year is None:
+            till_year = datetime.datetime.now().year
+        years = range(since, till_year)
+        return [str(year) for year in years], [self.snapshot(year) for year in years]
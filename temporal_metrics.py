@@ -0,0 +1,158 @@
+import threading
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+
+from diameter import component_diameter
+from sparse_graph import SparseTimeline
+
+METRICS = ('avg_degree', 'avg_clustering', 'diameter')
+
+
+class _YearState:
+    """
+    state carried from one year to the next: the neighbours (without self-loops) and triangles of every node, and
+    the components as a union-find forest
+    """
+
+    def __init__(self, n: int):
+        self.neighbours = [set() for _ in range(n)]
+        self.triangles = np.zeros(n, dtype=np.int64)
+        self.parent = np.arange(n)
+        self.size = np.ones(n, dtype=np.int64)
+
+    def root(self, u: int) -> int:
+        parent = self.parent
+        while parent[u] != u:
+            parent[u] = parent[parent[u]]
+            u = parent[u]
+        return u
+
+    def add_edge(self, u: int, v: int, triangles: bool, components: bool) -> None:
+        if triangles:
+            common = self.neighbours[u] & self.neighbours[v]
+            self.triangles[u] += len(common)
+            self.triangles[v] += len(common)
+            for w in common:
+                self.triangles[w] += 1
+        self.neighbours[u].add(v)
+        self.neighbours[v].add(u)
+        if components:
+            u, v = self.root(u), self.root(v)
+            if u != v:
+                if self.size[u] < self.size[v]:
+                    u, v = v, u
+                self.parent[v] = u
+                self.size[u] += self.size[v]
+
+    def roots(self) -> np.ndarray:
+        return np.array([self.root(u) for u in range(len(self.parent))])
+
+
+class TemporalMetrics:
+    """
+    metrics of every year of a timeline, all computed in one pass over the years. The yearly graphs of the timeline
+    are cumulative, so the triangles and components of a year are those of the previous year updated with the new
+    edges only, and the diameter is only computed again when the largest component has changed, bounded by that of
+    the year before when it has only gained edges. Results are kept, and a metric asked for again is read from them.
+    """
+
+    def __init__(self, timeline: SparseTimeline, diameter_tolerance: int = 0):
+        """
+        :param timeline: yearly graphs, see SparseTimeline
+        :param diameter_tolerance: 0 for the exact diameters; otherwise each diameter may be underestimated by up to
+         this much, see component_diameter
+        """
+        self.timeline = timeline
+        self.diameter_tolerance = diameter_tolerance
+        self._columns = dict()
+        self._lock = threading.Lock()
+
+    def table(self, metrics: Sequence[str] = METRICS) -> pd.DataFrame:
+        """
+        :param metrics: metrics to be computed, any of METRICS:
+         avg_degree: average degree, see Analyzer.get_avg_degree
+         avg_clustering: average clustering coefficient, see Analyzer.get_clustering_coeff
+         diameter: diameter of the largest component, see Analyzer.get_largest_component_diameter
+        :return: table with a row per year: the year, its number of nodes and edges, and the metrics
+        """
+        unexpected_metrics = set(metrics) - set(METRICS)
+        if len(unexpected_metrics) != 0:
+            raise ValueError(f'Unexpected Metric(s) {unexpected_metrics}, Expecting Any of {METRICS}')
+        with self._lock:
+            missing = [m for m in metrics if m not in self._columns]
+            if missing:
+                self._columns.update(self._compute(missing))
+        timeline = self.timeline
+        return pd.DataFrame(dict(year=[int(tag) if tag.lstrip('-').isdigit() else tag for tag in timeline.tags],
+                                 nodes=timeline.present.sum(axis=1),
+                                 edges=[sp.triu(matrix).nnz for matrix in timeline.matrices],
+                                 **{m: self._columns[m] for m in metrics}))
+
+    def series(self, metric: str) -> List:
+        """
+        :return: the metric of every year
+        """
+        return self.table([metric])[metric].tolist()
+
+    def _compute(self, metrics: List[str]) -> Dict[str, list]:
+        timeline = self.timeline
+        triangles, components = 'avg_clustering' in metrics, 'diameter' in metrics
+        degrees = timeline.degrees()
+        columns = {m: [] for m in metrics}
+        state, previous = None, None
+        diameter, diameter_component = None, None  # of the latest year computed
+        for t, matrix in enumerate(timeline.matrices):
+            upper = sp.triu(matrix, k=1, format='csr')
+            present = timeline.present[t]
+            if previous is not None and self._extends(previous, upper) and \
+                    not (timeline.present[t - 1] & ~present).any():
+                new_edges = (upper - previous).tocoo()  # only edges are added since the previous year
+            else:
+                state, new_edges = _YearState(len(timeline.nodes)), upper.tocoo()
+                diameter_component = None
+            for u, v in zip(new_edges.row.tolist(), new_edges.col.tolist()):
+                state.add_edge(u, v, triangles, components)
+            previous = upper
+            nodes = np.flatnonzero(present)
+
+            if 'avg_degree' in metrics:
+                columns['avg_degree'].append(float(degrees[t, nodes].sum()) / len(nodes))
+            if triangles:
+                plain_degrees = np.array([len(state.neighbours[u]) for u in nodes])
+                pairs = plain_degrees * (plain_degrees - 1)
+                coefficients = np.divide(2 * state.triangles[nodes], pairs, out=np.zeros(len(nodes)),
+                                         where=pairs > 0)
+                columns['avg_clustering'].append(float(coefficients.sum()) / len(nodes))
+            if components:
+                component = self._largest_component(state, nodes)
+                touched = diameter_component is not None and len(new_edges.row) and \
+                    np.isin(new_edges.row, diameter_component).any()
+                same_nodes = diameter_component is not None and np.array_equal(component, diameter_component)
+                if not same_nodes or touched:
+                    # new edges among the same nodes cannot make the diameter longer than the year before
+                    diameter = component_diameter(matrix, component, self.diameter_tolerance,
+                                                  warm_start=diameter if same_nodes else None)
+                    diameter_component = component
+                columns['diameter'].append(diameter.lower)
+        return columns
+
+    @staticmethod
+    def _extends(previous: sp.csr_matrix, upper: sp.csr_matrix) -> bool:
+        """
+        whether all edges of the previous year are still there
+        """
+        return previous.shape == upper.shape and previous.multiply(upper).nnz == previous.nnz
+
+    @staticmethod
+    def _largest_component(state: _YearState, nodes: np.ndarray) -> np.ndarray:
+        """
+        :return: nodes of the largest component, the first one in node order among those of the same size, as
+         max(nx.connected_components(graph), key=len)
+        """
+        roots = state.roots()[nodes]
+        sizes = state.size[roots]
+        largest = roots[np.flatnonzero(sizes == sizes.max())[0]]
+        return nodes[roots == largest]
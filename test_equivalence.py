@@ -0,0 +1,172 @@
+"""
+The optimized code paths give the same results as the plain ones they replace, on a small synthetic dblp (see
+benchmark.py for their timings). Run with `python -m pytest test_equivalence.py`
+"""
+import collections
+
+import networkx as nx
+import pytest
+
+import preprocessing
+from benchmark import AREAS, _auth_excellence_by_regex, _generate_graph_by_edge_lookups, _parse_xmltodict, \
+    _synthetic_profiles, _SyntheticAnalyzer
+from colab_stats import CollaborationStats
+from faculty import Analyzer
+from node_index import where
+from pub_store import PublicationStore
+from sparse_graph import SparseTimeline
+from temporal_graph import window_papers
+from temporal_metrics import TemporalMetrics
+from venue_cube import VenueCube, cached_venue_cube
+
+TILL_YEAR = 2021
+
+
+def _edges(graph: nx.Graph) -> dict:
+    return {frozenset(e[:2]): e[2] for e in graph.edges(data=True)}
+
+
+def _same_graph(a: nx.Graph, b: nx.Graph) -> bool:
+    return list(a.nodes(data=True)) == list(b.nodes(data=True)) and _edges(a) == _edges(b)
+
+
+@pytest.fixture(scope='module')
+def profiles():
+    return _synthetic_profiles(30, 300, 60, n_papers=800, n_external_papers=1500)
+
+
+@pytest.fixture(scope='module')
+def temporal(profiles):
+    name_data, profile_data, external_data = profiles
+    return preprocessing.generate_temporal_graph(name_data, profile_data, external_profile_data=external_data)
+
+
+def test_generate_graph(profiles):
+    name_data, profile_data, external_data = profiles
+    for external in [None, external_data]:
+        assert _same_graph(preprocessing.generate_graph(name_data, profile_data, external_profile_data=external),
+                           _generate_graph_by_edge_lookups(name_data, profile_data, external_profile_data=external))
+
+
+def test_generate_graphs(profiles):
+    name_data, profile_data, external_data = profiles
+    tags, graphs = preprocessing.generate_graphs(name_data, profile_data, till_year=TILL_YEAR,
+                                                 external_profile_data=external_data)
+    for tag, graph in zip(tags, graphs):
+        assert _same_graph(graph, preprocessing.generate_graph(name_data, profile_data, by_year=int(tag),
+                                                               external_profile_data=external_data))
+
+
+def test_temporal_views(profiles, temporal):
+    name_data, profile_data, external_data = profiles
+    tags, graphs = preprocessing.generate_graphs(name_data, profile_data, till_year=TILL_YEAR,
+                                                 external_profile_data=external_data)
+    half = list(name_data.Faculty)[::2]
+    for tag, view, graph in zip(tags, temporal.snapshots(till_year=TILL_YEAR)[1], graphs):
+        for a, b in [(view, graph), (view.subgraph(half), graph.subgraph(half))]:
+            assert list(a.nodes(data=True)) == list(b.nodes(data=True))
+            assert {edge: window_papers(data, till=int(tag)) for edge, data in _edges(a).items()} == \
+                {edge: data['paper'] for edge, data in _edges(b).items()}
+
+
+def test_faculty_node_attributes(profiles):
+    name_data = profiles[0]
+    preprocessing._node_attributes_cache.clear()
+    expected = {name: name_data.loc[name_data['Faculty'] == name].drop(columns="Faculty").squeeze().to_dict()
+                for name in name_data.Faculty.unique()}
+    assert preprocessing.faculty_node_attributes(name_data) == expected
+    assert preprocessing.faculty_node_attributes(name_data) == expected
+
+
+def test_sparse_timeline(temporal):
+    graphs = temporal.snapshots(till_year=TILL_YEAR)[1]
+    timeline = SparseTimeline.from_temporal_graph(temporal, till_year=TILL_YEAR)
+    assert timeline.avg_degrees().tolist() == pytest.approx([Analyzer.get_avg_degree(g) for g in graphs], abs=1e-12)
+    assert timeline.avg_clustering().tolist() == pytest.approx([Analyzer.get_clustering_coeff(g) for g in graphs],
+                                                               abs=1e-12)
+    assert timeline.degree_increase() == Analyzer.get_degree_increase(graphs)
+    assert timeline.preferential_attachment() == Analyzer.detect_preferential_attachment(graphs)
+
+    metrics = TemporalMetrics(timeline).table()
+    assert metrics.diameter.tolist() == [Analyzer.get_largest_component_diameter(g) for g in graphs]
+
+
+def test_parallel_graphs(profiles, tmp_path):
+    name_data, profile_data, external_data = profiles
+    profile_store = PublicationStore.build(profile_data, str(tmp_path / 'profiles_store')).profiles()
+    external_store = PublicationStore.build(external_data, str(tmp_path / 'external_store')).profiles()
+    for external in [None, external_store]:
+        preprocessing.invalidate_paper_index()
+        expected = preprocessing.generate_graphs(name_data, profile_store, till_year=TILL_YEAR,
+                                                 external_profile_data=external)[1]
+        graphs = preprocessing.generate_graphs(name_data, profile_store, till_year=TILL_YEAR,
+                                               external_profile_data=external, workers=2)[1]
+        assert [_edges(g) for g in graphs] == [_edges(g) for g in expected]
+
+
+def test_excellence(tmp_path):
+    name_data, profile_data, external_data = _synthetic_profiles(20, 200, n_papers=600, n_external_papers=1000,
+                                                                 parse=_parse_xmltodict)
+    profile_store = PublicationStore.build(profile_data, str(tmp_path / 'profiles_store')).profiles()
+    external_store = PublicationStore.build(external_data, str(tmp_path / 'external_store')).profiles()
+    legacy = _SyntheticAnalyzer(name_data, profile_data, external_data)
+    for external in [False, True]:
+        expected = _auth_excellence_by_regex(legacy, external)
+        for analyzer in [_SyntheticAnalyzer(name_data, profile_data, external_data),
+                         _SyntheticAnalyzer(name_data, profile_store, external_store)]:
+            assert analyzer._get_auth_excellence(external) == expected
+
+
+def test_filter_graphs(profiles, temporal):
+    name_data, profile_data, _ = profiles
+    graphs = temporal.snapshots(till_year=TILL_YEAR)[1]
+    analyzer = _SyntheticAnalyzer(name_data, profile_data, None)
+    for attribute, values in [('Position', {'Professor', 'Associate Professor'}), ('Area', {'AI/ML'}),
+                              ('Management', {'Y'})]:
+        names = {name for name, attributes in graphs[-1].nodes(data=True) if attributes.get(attribute) in values}
+        expected = [nx.subgraph(g, names) for g in graphs]
+        filtered = analyzer.filter_graphs(graphs, where(attribute, values))
+        assert [sorted(map(sorted, g.edges)) for g in filtered] == [sorted(map(sorted, g.edges)) for g in expected]
+
+
+def test_colab_stats(profiles, temporal):
+    name_data = profiles[0]
+    tags, graphs = temporal.snapshots(till_year=TILL_YEAR)
+    years = [int(tag) for tag in tags]
+    stats = CollaborationStats(temporal, years)
+    for area in AREAS:
+        group = set(name_data.Faculty[name_data.Area == area])
+        subgraphs = [nx.subgraph(g, group) for g in graphs]
+        expected = Analyzer.get_colab_properties(subgraphs, years=years)
+        result = Analyzer.get_colab_properties(stats, group)
+        assert result[:3] == expected[:3]
+        assert [dict(venues) for venues in result[3]] == [dict(venues) for venues in expected[3]]
+        assert Analyzer.get_relative_colab_weight(group, stats) == \
+            Analyzer.get_relative_colab_weight(subgraphs, graphs, years=years)
+
+
+def test_venue_cube(profiles, tmp_path):
+    name_data, profile_data, _ = profiles
+    profile_data = dict(profile_data)
+    temporal = preprocessing.generate_temporal_graph(name_data, profile_data)
+    years = [int(tag) for tag in temporal.snapshots(till_year=TILL_YEAR)[0]]
+    stats = CollaborationStats(temporal, years)
+    path = str(tmp_path / 'venue_cube.npz')
+    cube = cached_venue_cube(name_data, profile_data, path)
+    for area in AREAS:
+        group = set(name_data.Faculty[name_data.Area == area])
+        assert cube.most_frequent_venues(group, years) == stats.properties(group)[3]
+        for year in years[::5]:
+            papers = dict()
+            for _, _, data in temporal.graph.subgraph(group).edges(data=True):
+                papers.update(window_papers(data, since=year, till=year))
+            assert cube.top_venues(areas=[area], since=year, till=year) == \
+                sorted(collections.Counter(papers.values()).items(), key=lambda x: (-x[1], x[0]))
+
+    changed = next(iter(profile_data))
+    profile = profile_data[changed]
+    profile_data[changed] = type(profile)(profile.pid, profile.name, profile.publications[1:])
+    updated = cached_venue_cube(name_data, profile_data, path, [changed])
+    rebuilt = VenueCube.build(name_data, profile_data)
+    assert updated.most_frequent_venues(None, years) == rebuilt.most_frequent_venues(None, years)
+    assert VenueCube.load(path).members == rebuilt.members
@@ -0,0 +1,365 @@
+import hashlib
+import os
+import threading
+from typing import Iterable, List, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from graph_cache import profile_content
+from preprocessing import coauthored_papers, faculty_node_attributes, profile_pid
+from temporal_graph import UNKNOWN_YEAR
+
+
+def _profile_digest(profile) -> str:
+    return hashlib.sha1(repr(profile_content(profile)).encode()).hexdigest()
+
+
+def _ids(values: list, index: dict, items: Iterable) -> List[int]:
+    """
+    :return: ids of the items in the values, added to them (and to their index) if new
+    """
+    ids = []
+    for item in items:
+        i = index.get(item)
+        if i is None:
+            i = index[item] = len(values)
+            values.append(item)
+        ids.append(i)
+    return ids
+
+
+class VenueCube:
+    """
+    number of co-authored papers by year, area, member and venue, counted as on the graph edges: a paper is counted
+    for a group of members when it is on an edge between two of them, and once however many of them wrote it. The
+    co-authored papers are kept as listed by every profile, as parallel arrays, from which the papers of each (year,
+    area, venue) cell are counted once, and the papers of any members or areas are a masked count instead of a scan of
+    the profiles. The cube is saved to a single .npz file and brought up to date by reading only the profiles that have
+    changed since.
+    """
+
+    def __init__(self, members: List[str], digests: List[str], pids: List[str], keys: List[str], venues: List[str],
+                 member_pid: np.ndarray, listing: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+                 author_offsets: np.ndarray, author_pid: np.ndarray):
+        """
+        :param members: names of the profiles counted
+        :param digests: digest of every profile, to tell the changed ones
+        :param pids: dblp pids of the members and of their co-authors
+        :param keys: dblp keys of the papers
+        :param venues: names of the venues
+        :param member_pid: pid of every member (ids into pids)
+        :param listing: the papers as listed by every profile: member, paper, venue (ids into members, keys and
+         venues) and year
+        :param author_offsets: start of the authors of every listing in author_pid, and their end
+        :param author_pid: authors of the listings (ids into pids)
+        """
+        self.members = list(members)
+        self.digests = list(digests)
+        self.pids, self.keys, self.venues = list(pids), list(keys), list(venues)
+        self._pid_index = {pid: i for i, pid in enumerate(self.pids)}
+        self._key_index = {key: i for i, key in enumerate(self.keys)}
+        self._venue_index = {venue: i for i, venue in enumerate(self.venues)}
+        self.member_pid = member_pid
+        self.listing_member, self.listing_paper, self.listing_venue, self.listing_year = listing
+        self.author_offsets, self.author_pid = author_offsets, author_pid
+        self._member_index = {name: i for i, name in enumerate(self.members)}
+        self.areas = []
+        self._area_codes = np.full(len(self.members), -1, dtype=np.int64)
+        self._incidence = None
+        self._cells = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, name_data: pd.DataFrame, profile_data) -> 'VenueCube':
+        """
+        :param name_data: a name list in the format of read_faculty, giving the nodes of the graph and their area
+        :param profile_data: profiles in any format returned by fetch_dblp_profile
+        :return: cube of the profiles
+        """
+        empty = np.zeros(0, dtype=np.int64)
+        cube = cls([], [], [], [], [], empty, (empty, empty, empty, empty), np.zeros(1, dtype=np.int64), empty)
+        cube.update(name_data, profile_data)
+        return cube
+
+    def update(self, name_data: pd.DataFrame, profile_data, changed: Iterable[str] = None) -> int:
+        """
+        read the papers of the new and changed profiles again, and drop the profiles that are gone
+        :param name_data: a name list in the format of read_faculty, giving the nodes of the graph and their area
+        :param profile_data: profiles in any format returned by fetch_dblp_profile
+        :param changed: (optional) names of the changed profiles, e.g. from refresh_dblp_profile; by default the
+         profiles whose digest differs
+        :return: number of profiles read again
+        """
+        with self._lock:
+            names = list(profile_data)
+            known = dict(zip(self.members, self.digests))
+            if changed is not None:
+                changed = set(changed)
+                recount = [name for name in names if name in changed or name not in known]
+                digests = {name: known.get(name) for name in names}
+                digests.update({name: _profile_digest(profile_data[name]) for name in recount})
+            else:
+                digests = {name: _profile_digest(profile_data[name]) for name in names}
+                recount = [name for name in names if known.get(name) != digests[name]]
+
+            # listings of the other profiles still there, under their ids in the new member list
+            position = {name: i for i, name in enumerate(names)}
+            dropped = set(recount)
+            new_ids = np.array([position[name] if name in position and name not in dropped else -1
+                                for name in self.members], dtype=np.int64)
+            kept = new_ids[self.listing_member] >= 0
+            lengths = np.diff(self.author_offsets)
+            member_pid = np.full(len(names), -1, dtype=np.int64)
+            member_pid[new_ids[new_ids >= 0]] = self.member_pid[new_ids >= 0]
+            members, papers, venues, years = [new_ids[self.listing_member[kept]]], [self.listing_paper[kept]], \
+                [self.listing_venue[kept]], [self.listing_year[kept]]
+            author_lengths, authors = [lengths[kept]], [self.author_pid[np.repeat(kept, lengths)]]
+
+            for name in recount:
+                member_pid[position[name]] = _ids(self.pids, self._pid_index, [profile_pid(profile_data, name)])[0]
+                listed = list(coauthored_papers(profile_data, name))
+                members.append(np.full(len(listed), position[name], dtype=np.int64))
+                papers.append(np.array(_ids(self.keys, self._key_index, (key for key, _, _, _, _ in listed)),
+                                       dtype=np.int64))
+                venues.append(np.array(_ids(self.venues, self._venue_index, (venue for _, venue, _, _, _ in listed)),
+                                       dtype=np.int64))
+                years.append(np.array([year if year is not None else UNKNOWN_YEAR for _, _, year, _, _ in listed],
+                                      dtype=np.int64))
+                author_lengths.append(np.array([len(author_pids) for _, _, _, author_pids, _ in listed],
+                                               dtype=np.int64))
+                authors.append(np.array(_ids(self.pids, self._pid_index, (pid for _, _, _, author_pids, _ in listed
+                                                                          for pid in author_pids)), dtype=np.int64))
+
+            self.members, self.digests = names, [digests[name] for name in names]
+            self._member_index = position
+            self.member_pid = member_pid
+            self.listing_member, self.listing_paper, self.listing_venue, self.listing_year = \
+                [np.concatenate(a) for a in (members, papers, venues, years)]
+            self.author_offsets = np.concatenate([[0], np.cumsum(np.concatenate(author_lengths))]).astype(np.int64)
+            self.author_pid = np.concatenate(authors)
+            self._set_name_list(name_data)
+            return len(recount)
+
+    def set_name_list(self, name_data: pd.DataFrame) -> None:
+        """
+        :param name_data: a name list in the format of read_faculty, giving the nodes of the graph and their area;
+         members not in it have no area, and are no co-author of the others
+        """
+        with self._lock:
+            self._set_name_list(name_data)
+
+    def _set_name_list(self, name_data: pd.DataFrame) -> None:
+        node_attributes = faculty_node_attributes(name_data)
+        areas = [node_attributes.get(name, dict()).get('Area') for name in self.members]
+        self.areas = sorted({area for area in areas if isinstance(area, str)})
+        codes = {area: i for i, area in enumerate(self.areas)}
+        self._area_codes = np.array([codes.get(area, -1) for area in areas], dtype=np.int64)
+        self._index([self._member_index[name] for name in node_attributes if name in self._member_index])
+        self._cells = None
+
+    def _index(self, nodes: List[int]) -> None:
+        """
+        the papers on every edge as generate_graph adds them: a paper is read from the first profile listing it, and
+        connects every profile listing it with each of its authors that is a node
+        :param nodes: members that are nodes of the graph
+        """
+        n_listings, n_papers = len(self.listing_member), len(self.keys)
+        order = np.lexsort((np.arange(n_listings), self.listing_member))
+        papers, first = np.unique(self.listing_paper[order], return_index=True)
+        first_listing = np.full(n_papers, -1, dtype=np.int64)
+        first_listing[papers] = order[first]
+        self._paper_year = np.full(n_papers, UNKNOWN_YEAR, dtype=np.int64)
+        self._paper_venue = np.zeros(n_papers, dtype=np.int64)
+        self._paper_year[papers] = self.listing_year[first_listing[papers]]
+        self._paper_venue[papers] = self.listing_venue[first_listing[papers]]
+
+        # every listing with the authors of the first listing of its paper
+        source = first_listing[self.listing_paper]
+        lengths = np.diff(self.author_offsets)[source]
+        rows = np.repeat(np.arange(n_listings), lengths)
+        starts = np.concatenate([[0], np.cumsum(lengths)[:-1]]).astype(np.int64)
+        authors = self.author_pid[self.author_offsets[source][rows] + np.arange(len(rows)) - starts[rows]]
+        pid_node = np.full(len(self.pids), -1, dtype=np.int64)
+        pid_node[self.member_pid[nodes]] = nodes
+        owners = self.listing_member[rows]
+        co_authors = pid_node[authors]
+        edges = (co_authors >= 0) & (authors != self.member_pid[owners])
+        self._incidence = (self.listing_paper[rows][edges], owners[edges], co_authors[edges])
+
+    def _papers(self, mask: np.ndarray) -> np.ndarray:
+        """
+        :param mask: the members of the group
+        :return: ids of the papers on an edge within the group, each once
+        """
+        papers, owners, co_authors = self._incidence
+        return np.unique(papers[mask[owners] & mask[co_authors]])
+
+    def _mask(self, members: Union[Iterable[str], None], areas: Union[Iterable[str], None]) -> np.ndarray:
+        mask = np.ones(len(self.members), dtype=bool)
+        if members is not None:
+            mask[:] = False
+            mask[[self._member_index[name] for name in members if name in self._member_index]] = True
+        if areas is not None:
+            mask &= np.isin(self._area_codes, [self.areas.index(area) for area in areas if area in self.areas])
+        return mask
+
+    def _area_cells(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        :return: the cells of the areas: year, area, venue and number of papers on the edges within the area
+        """
+        with self._lock:
+            if self._cells is None:
+                n_venues = len(self.venues)
+                cells = []
+                for code in range(len(self.areas)):
+                    papers = self._papers(self._area_codes == code)
+                    keys, counts = np.unique(self._paper_year[papers] * n_venues + self._paper_venue[papers],
+                                             return_counts=True)
+                    cells.append((keys // n_venues, np.full(len(keys), code, dtype=np.int64), keys % n_venues,
+                                  counts))
+                self._cells = tuple(np.concatenate([cell[i] for cell in cells]) if cells else
+                                    np.zeros(0, dtype=np.int64) for i in range(4))
+            return self._cells
+
+    def venue_papers(self, members: Iterable[str] = None, areas: Iterable[str] = None, since: int = None,
+                     till: int = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        :param members: (optional) names of the members of the group; all by default
+        :param areas: (optional) areas of the members of the group; all by default
+        :param since: (optional, included) first year counted; papers without a year are only counted without it
+        :param till: (optional, included) last year counted
+        :return: number of papers on the edges within the group by venue, and the year of the first of them (that of
+         the venues without papers is undefined)
+        """
+        n_venues = len(self.venues)
+        if members is None and areas is not None and len(set(areas) & set(self.areas)) == 1:
+            # papers of a single area are read from its cells
+            years, codes, venues, counts = self._area_cells()
+            cells = codes == self.areas.index(next(iter(set(areas) & set(self.areas))))
+        else:
+            papers = self._papers(self._mask(members, areas))
+            years, venues, counts = self._paper_year[papers], self._paper_venue[papers], None
+            cells = np.ones(len(papers), dtype=bool)
+        if since is not None:
+            cells &= years >= since
+        if till is not None:
+            cells &= years <= till
+        first_years = np.full(n_venues, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_years, venues[cells], years[cells])
+        weights = counts[cells] if counts is not None else None
+        return np.bincount(venues[cells], weights=weights, minlength=n_venues).astype(np.int64), first_years
+
+    def _ordered(self, counts: np.ndarray, first_years: np.ndarray) -> List[Tuple[str, int]]:
+        """
+        :return: venues with papers and their number, most papers first, then by the year of their first paper and
+         by name, as Analyzer.get_colab_properties gives them with CollaborationStats
+        """
+        published = np.flatnonzero(counts)
+        names = [self.venues[i] for i in published.tolist()]
+        order = sorted(range(len(published)), key=lambda i: (-counts[published[i]], first_years[published[i]],
+                                                             names[i]))
+        return [(names[i], int(counts[published[i]])) for i in order]
+
+    def top_venues(self, top: int = None, members: Iterable[str] = None, areas: Iterable[str] = None,
+                   since: int = None, till: int = None) -> List[Tuple[str, int]]:
+        """
+        e.g. top_venues(10, areas=['AI/ML'], since=2020, till=2020) for the top 10 venues of the area in 2020
+        :param top: (optional) number of venues; all venues with papers by default
+        :return: venues with their number of papers, see venue_papers and _ordered
+        """
+        return self._ordered(*self.venue_papers(members, areas, since, till))[:top]
+
+    def most_frequent_venues(self, members: Iterable[str] = None, years: Iterable[int] = None) \
+            -> List[List[Tuple[str, int]]]:
+        """
+        :param members: (optional) names of the members of the group; all by default
+        :param years: years of the graphs, each counting the papers till that year (included)
+        :return: venues of the papers on the edges within the group by every year, as the most frequent venues of
+         Analyzer.get_colab_properties
+        """
+        years = [int(year) for year in years]
+        n_venues = len(self.venues)
+        papers = self._papers(self._mask(members, None))
+        paper_years, paper_venues = self._paper_year[papers], self._paper_venue[papers]
+        bins = np.searchsorted(years, paper_years, side='left')
+        counts = np.bincount(bins * n_venues + paper_venues, minlength=(len(years) + 1) * n_venues)
+        counts = np.cumsum(counts.reshape(len(years) + 1, n_venues)[:-1], axis=0)
+        first_years = np.full(n_venues, np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(first_years, paper_venues, paper_years)
+        return [self._ordered(row, first_years) for row in counts]
+
+    def to_frame(self, by: str = 'area') -> pd.DataFrame:
+        """
+        :param by: 'area' for the cells of the areas, 'member' for those of the members, counting the papers on the
+         edges within the area, or on those of the member
+        :return: the cells as a compact table of year, area or member, venue and papers, for roll-ups by pandas; a
+         paper is counted once in a cell, and in the cells of all its areas or members
+        """
+        if by == 'area':
+            years, codes, venues, counts = self._area_cells()
+            groups = pd.Categorical.from_codes(codes, self.areas)
+        elif by == 'member':
+            papers, owners, co_authors = self._incidence
+            n_members = len(self.members)
+            pairs = np.unique(np.concatenate([papers * n_members + owners, papers * n_members + co_authors]))
+            papers, members = pairs // n_members, pairs % n_members
+            keys, counts = np.unique(np.stack([self._paper_year[papers], members, self._paper_venue[papers]], axis=1),
+                                     axis=0, return_counts=True)
+            years, codes, venues = keys.reshape(-1, 3).T
+            groups = pd.Categorical.from_codes(codes, self.members)
+        else:
+            raise ValueError(f'Unknown axis {by}!')
+        return pd.DataFrame({'year': years.astype(np.int16), by: groups,
+                             'venue': pd.Categorical.from_codes(venues, self.venues),
+                             'papers': counts.astype(np.int32)})
+
+    def save(self, path: str) -> None:
+        """
+        :param path: .npz file, written atomically
+        """
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp.npz'
+        with self._lock:
+            np.savez_compressed(tmp_path, members=np.array(self.members, dtype=str),
+                                digests=np.array(self.digests, dtype=str), pids=np.array(self.pids, dtype=str),
+                                keys=np.array(self.keys, dtype=str), venues=np.array(self.venues, dtype=str),
+                                member_pid=self.member_pid, listing_member=self.listing_member,
+                                listing_paper=self.listing_paper, listing_venue=self.listing_venue,
+                                listing_year=self.listing_year, author_offsets=self.author_offsets,
+                                author_pid=self.author_pid)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Union['VenueCube', None]:
+        """
+        :return: the cube saved at the path, or None if there is none; it is queried once set_name_list (or update)
+         is called
+        """
+        try:
+            with np.load(path) as f:
+                return cls(f['members'].tolist(), f['digests'].tolist(), f['pids'].tolist(), f['keys'].tolist(),
+                           f['venues'].tolist(), f['member_pid'],
+                           (f['listing_member'], f['listing_paper'], f['listing_venue'], f['listing_year']),
+                           f['author_offsets'], f['author_pid'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, OSError) as e:
+            print(f'Corrupted venue cube {path} dropped! {str(e)}')
+            return None
+
+
+def cached_venue_cube(name_data: pd.DataFrame, profile_data, path: str, changed: Iterable[str] = None) -> VenueCube:
+    """
+    VenueCube of the profiles, read from the path and brought up to date, or built and saved there
+    :param changed: (optional) names of the changed profiles, see VenueCube.update
+    :return: cube
+    """
+    cube = VenueCube.load(path)
+    if cube is None:
+        cube = VenueCube.build(name_data, profile_data)
+        cube.save(path)
+        return cube
+    members = cube.members
+    if cube.update(name_data, profile_data, changed) or members != cube.members:
+        cube.save(path)
+    return cube